@@ -0,0 +1,127 @@
+"""
+Measures how long the render operators spent saving and restoring the user's
+mode and selection around every render, as the number of selected objects grows,
+against what Satellite does now.
+
+The editor type was also switched to the 3D View, which can't be measured here
+as a background Blender has no editors (and is why the old operators failed
+when run from the command line).
+
+Run it from the folder Satellite is installed in with a background Blender:
+
+    blender -b --factory-startup --python benchmarks/context_overhead.py -- --counts 100 1000 5000
+"""
+
+import bpy
+
+import os
+import sys
+import time
+import argparse
+import importlib
+
+# Satellite is imported as a package using the name of the folder it's in.
+ADDON_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ADDON_PATH))
+render = importlib.import_module(os.path.basename(ADDON_PATH) + ".render")
+
+
+def CreateArgumentParser():
+    parser = argparse.ArgumentParser(prog = "context_overhead")
+    parser.add_argument("--counts", type = int, nargs = "+", default = [100, 1000, 5000],
+        help = "The number of selected objects to measure with.")
+    parser.add_argument("--repeats", type = int, default = 20,
+        help = "How many renders to measure the overhead of.")
+
+    return parser
+
+
+def CreateObjects(count):
+    """
+    Fills a new collection in the current scene with selected mesh objects, with
+    the last one active.
+    """
+
+    collection = bpy.data.collections.new("Satellite Benchmark")
+    bpy.context.scene.collection.children.link(collection)
+
+    mesh = bpy.data.meshes.new("Satellite Benchmark Mesh")
+
+    for i in range(count):
+        obj = bpy.data.objects.new("Satellite Benchmark Object", mesh)
+        collection.objects.link(obj)
+        obj.select_set(state = True)
+        bpy.context.view_layer.objects.active = obj
+
+    return collection
+
+
+def RemoveObjects(collection):
+    mesh = collection.objects[0].data
+
+    for obj in list(collection.objects):
+        bpy.data.objects.remove(obj)
+
+    bpy.data.meshes.remove(mesh)
+    bpy.data.collections.remove(collection)
+
+
+def LegacyContext(context):
+    """
+    What the render operators used to do around every render, other than
+    switching the editor type.
+    """
+
+    old_mode = context.active_object.mode
+    bpy.ops.object.mode_set(mode = 'OBJECT')
+
+    old_selected_objects = context.selected_objects
+    old_active_object = context.active_object
+
+    bpy.ops.object.select_all(action = 'DESELECT')
+    context.view_layer.objects.active = old_active_object
+
+    for sel_obj in old_selected_objects:
+        sel_obj.select_set(state = True)
+
+    bpy.ops.object.mode_set(mode = old_mode)
+
+
+def CurrentContext(context):
+    render.UpdateEditModeObjects(None, context)
+
+
+def MeasureContext(args, count, save_restore):
+    """
+    Returns the average time saving and restoring the context took for one render, in seconds.
+    """
+
+    collection = CreateObjects(count)
+
+    try:
+        start = time.perf_counter()
+        for i in range(args.repeats):
+            save_restore(bpy.context)
+        finish = time.perf_counter()
+
+    finally:
+        RemoveObjects(collection)
+
+    return (finish - start) / args.repeats
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+    args = CreateArgumentParser().parse_args(argv)
+
+    print("{:>10} {:>12} {:>12}".format("Objects", "Current", "Old"))
+
+    for count in args.counts:
+        current_time = MeasureContext(args, count, CurrentContext)
+        legacy_time = MeasureContext(args, count, LegacyContext)
+
+        print("{:>10} {:>11.3f}ms {:>11.3f}ms".format(count, current_time * 1000, legacy_time * 1000))
+
+
+if __name__ == "__main__":
+    main()
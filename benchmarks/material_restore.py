@@ -0,0 +1,169 @@
+"""
+Measures how long it takes to replace and restore the materials of a scene as
+the number of objects grows, comparing how Satellite does it against the
+object by object, operator-based approach it replaced.
+
+Run it from the folder Satellite is installed in with a background Blender:
+
+    blender -b --factory-startup --python benchmarks/material_restore.py -- --counts 100 1000 5000
+"""
+
+import bpy
+
+import os
+import sys
+import time
+import argparse
+import importlib
+
+# Satellite is imported as a package using the name of the folder it's in.
+ADDON_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ADDON_PATH))
+render = importlib.import_module(os.path.basename(ADDON_PATH) + ".render")
+
+
+def CreateArgumentParser():
+    parser = argparse.ArgumentParser(prog = "material_restore")
+    parser.add_argument("--counts", type = int, nargs = "+", default = [100, 1000, 5000],
+        help = "The number of objects to measure with.")
+    parser.add_argument("--slotless", type = float, default = 0.5,
+        help = "The fraction of objects that start without any material slots.")
+    parser.add_argument("--shared", type = int, default = 1,
+        help = "How many objects share each mesh, like linked duplicates.")
+
+    return parser
+
+
+def CreateObjects(count, slotless, shared):
+    """
+    Fills a new collection in the current scene with objects, some with a material
+    slot and some without.  Operators only work on the current scene, so the
+    objects can't be kept in a scene of their own.
+    """
+
+    collection = bpy.data.collections.new("Satellite Benchmark")
+    bpy.context.scene.collection.children.link(collection)
+
+    material = bpy.data.materials.new("Satellite Benchmark Material")
+    slotless_count = int(count * slotless)
+
+    for i in range(count):
+        if i % shared == 0:
+            mesh = bpy.data.meshes.new("Satellite Benchmark Mesh")
+            if i >= slotless_count:
+                mesh.materials.append(material)
+
+        obj = bpy.data.objects.new("Satellite Benchmark Object", mesh)
+        collection.objects.link(obj)
+
+    return collection
+
+
+def RemoveObjects(collection):
+    meshes = {obj.data.as_pointer(): obj.data for obj in collection.objects}
+
+    for obj in list(collection.objects):
+        bpy.data.objects.remove(obj)
+    
+    for mesh in meshes.values():
+        bpy.data.meshes.remove(mesh)
+
+    bpy.data.collections.remove(collection)
+
+    for material in list(bpy.data.materials):
+        if material.name.startswith("Satellite Benchmark"):
+            bpy.data.materials.remove(material)
+
+
+def LegacyReplace(objects, target_mat):
+    """
+    The previous replacement, which recorded and replaced the slots of every object
+    one at a time.
+    """
+
+    saved_object_mats = []
+
+    for obj in objects:
+        mat_data = {}
+        mat_data['object'] = obj
+        mat_data['has_slots'] = len(obj.material_slots) > 0
+
+        if mat_data['has_slots'] == True:
+            mat_data['slots'] = [slot.name for slot in obj.material_slots]
+            mat_data['link_type'] = [slot.link for slot in obj.material_slots]
+
+            for slot in obj.material_slots:
+                slot.material = target_mat
+        else:
+            obj.active_material = target_mat
+        
+        saved_object_mats.append(mat_data)
+    
+    return saved_object_mats
+
+
+def LegacyRestore(saved_object_mats):
+    """
+    The previous restore, which looked materials up by name and used operators to
+    remove the slots added to objects that had none.
+    """
+
+    for mat_data in saved_object_mats:
+        obj = mat_data['object']
+
+        if mat_data['has_slots'] == True:
+            materials = [bpy.data.materials[name] for name in mat_data['slots']]
+
+            for slot, link, material in zip(obj.material_slots, mat_data['link_type'], materials):
+                slot.link = link
+                slot.material = material
+
+        else:
+            bpy.ops.object.select_all(action = 'DESELECT')
+            bpy.context.view_layer.objects.active = obj
+            obj.select_set(state = True)
+            bpy.ops.object.material_slot_remove()
+
+
+def MeasureRestore(args, count, replace, restore):
+    """
+    Returns how long replacing and restoring the materials of new objects took, in seconds.
+    """
+
+    collection = CreateObjects(count, args.slotless, args.shared)
+
+    try:
+        target_mat = bpy.data.materials.new("Satellite Benchmark Replacement")
+
+        start = time.perf_counter()
+        saved = replace(list(collection.objects), target_mat)
+        replaced = time.perf_counter()
+
+        restore(saved)
+        restored = time.perf_counter()
+
+    finally:
+        RemoveObjects(collection)
+
+    return replaced - start, restored - replaced
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+    args = CreateArgumentParser().parse_args(argv)
+
+    print("{:>10} {:>12} {:>12} {:>12} {:>12}".format(
+        "Objects", "Replace", "Restore", "Old Replace", "Old Restore"))
+
+    for count in args.counts:
+        replace_time, restore_time = MeasureRestore(args, count,
+            lambda objects, target_mat: render.ReplaceMaterialSlots(None, bpy.context, objects, target_mat),
+            lambda saved: render.RestoreMaterialSlots(None, bpy.context, saved))
+        legacy_replace_time, legacy_restore_time = MeasureRestore(args, count, LegacyReplace, LegacyRestore)
+
+        print("{:>10} {:>11.3f}s {:>11.3f}s {:>11.3f}s {:>11.3f}s".format(count, 
+            replace_time, restore_time, legacy_replace_time, legacy_restore_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,633 @@
+import bpy
+
+import os
+import json
+import hashlib
+from array import array
+
+# Bump this whenever the fingerprint changes, so older renders aren't trusted.
+CACHE_VERSION = 5
+
+# The file extension Blender gives each file format Satellite can render.
+FILE_EXTENSIONS = {
+    'PNG': ".png",
+    'JPEG': ".jpg",
+    'TARGA': ".tga",
+    'TARGA_RAW': ".tga",
+    'HDR': ".hdr",
+    'OPEN_EXR': ".exr",
+}
+
+# Datablock properties that change between sessions or as Blender is used,
+# without changing what gets rendered.
+VOLATILE_PROPERTIES = {
+    'session_uid', 'users', 'tag', 'is_evaluated', 'original', 'is_runtime_data',
+    'use_fake_user', 'is_editmode', 'select',
+}
+
+# The scene settings hashed as a whole, found by their RNA path from the scene.
+SCENE_SETTING_PATHS = (
+    'render',
+    'render.image_settings',
+    'cycles',
+    'eevee',
+    'view_settings',
+    'display_settings',
+)
+
+# Render settings that only change how fast a render is made, not how it looks.
+# Workers in a render farm are each given a share of the CPU threads.
+PERFORMANCE_PROPERTIES = {
+    'threads', 'threads_mode', 'use_lock_interface', 'use_persistent_data',
+    'use_save_buffers', 'tile_x', 'tile_y', 'tile_size', 'use_auto_tile',
+    'preview_pixel_size',
+}
+
+# Object properties that change how (or if) an object appears in a render.
+OBJECT_RENDER_PROPERTIES = (
+    'visible_camera',
+    'visible_diffuse',
+    'visible_glossy',
+    'visible_transmission',
+    'visible_volume_scatter',
+    'visible_shadow',
+    'is_holdout',
+    'is_shadow_catcher',
+    'color',
+    'pass_index',
+)
+
+# Set on objects Satellite creates to render with, which never appear in a render.
+RIG_PROPERTY = "satellite_rig"
+
+# Objects whose geometry is hashed from what they evaluate to, which includes
+# their modifiers, shape keys and anything deforming them.
+GEOMETRY_TYPES = {'MESH', 'CURVE', 'SURFACE', 'META', 'FONT'}
+
+# Objects that are fully hashed by their properties (and any node trees they have).
+PROPERTY_TYPES = {'EMPTY', 'LIGHT', 'CAMERA', 'LIGHT_PROBE', 'SPEAKER', 'LATTICE', 'ARMATURE'}
+
+# How to read each type of mesh attribute, as the property name, the number of
+# values per element and the array type they're read into.
+ATTRIBUTE_LAYOUTS = {
+    'FLOAT': ('value', 1, 'f'),
+    'INT': ('value', 1, 'i'),
+    'INT8': ('value', 1, 'i'),
+    'BOOLEAN': ('value', 1, 'b'),
+    'FLOAT2': ('vector', 2, 'f'),
+    'INT32_2D': ('value', 2, 'i'),
+    'FLOAT_VECTOR': ('vector', 3, 'f'),
+    'FLOAT_COLOR': ('color', 4, 'f'),
+    'BYTE_COLOR': ('color', 4, 'f'),
+    'QUATERNION': ('value', 4, 'f'),
+}
+
+# Node properties that only change how the node editor looks.
+NODE_UI_PROPERTIES = {
+    'location', 'width', 'width_hidden', 'height', 'dimensions', 'select', 'hide',
+    'show_options', 'show_preview', 'show_texture', 'label', 'color', 'use_custom_color',
+}
+
+
+def GetOutputFilepath(destination, file_format):
+    """
+    Returns the absolute path of the file Blender will write for a destination.
+    """
+
+    return bpy.path.abspath(destination) + FILE_EXTENSIONS.get(file_format, "")
+
+
+def GetFingerprintFilepath(destination):
+    """
+    Returns the path of the file that stores a render's fingerprint, which sits next to the render.
+    """
+
+    return bpy.path.abspath(destination) + ".satellite.json"
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+def FlattenValue(value):
+    """
+    Turns a property value into something that always has the same repr, as
+    arrays, vectors and matrices may not.
+    """
+
+    if isinstance(value, str):
+        return value
+
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+
+    if isinstance(value, bpy.types.ID):
+        return value.name_full
+
+    if isinstance(value, dict):
+        return [[key, FlattenValue(value[key])] for key in sorted(value.keys())]
+
+    if hasattr(value, '__len__'):
+        return [FlattenValue(v) for v in value]
+
+    if isinstance(value, float):
+        return repr(value)
+
+    return value
+
+
+def HashValue(hasher, value):
+    hasher.update(repr(FlattenValue(value)).encode('utf-8'))
+    hasher.update(b'\0')
+
+
+def HashRNAProperties(hasher, struct, skip = ()):
+    """
+    Hashes every property of a struct that can be read as a value.  Datablocks
+    it points to are hashed by name only, collections are skipped.
+    """
+
+    for prop in struct.bl_rna.properties:
+        if prop.identifier == 'rna_type' or prop.type == 'COLLECTION':
+            continue
+
+        if prop.identifier in skip or prop.identifier in VOLATILE_PROPERTIES:
+            continue
+
+        value = getattr(struct, prop.identifier, None)
+
+        if prop.type == 'POINTER' and not isinstance(value, bpy.types.ID):
+            continue
+
+        HashValue(hasher, (prop.identifier, value))
+
+
+def GetCustomProperties(id):
+    """
+    Returns the custom properties of a datablock as plain values.
+    """
+
+    properties = []
+
+    for key in sorted(id.keys()):
+        value = id[key]
+
+        if hasattr(value, 'to_dict'):
+            value = value.to_dict()
+        elif hasattr(value, 'to_list'):
+            value = value.to_list()
+
+        properties.append((key, value))
+
+    return properties
+
+
+def HashSceneSettings(hasher, scene, view_layer, skip_paths = ()):
+    """
+    Hashes the render, color management and View Layer settings of a scene.  Any
+    setting whose RNA path is in skip_paths is left out, for the render settings 
+    Satellite changes that are hashed separately.
+    """
+
+    for owner_path in SCENE_SETTING_PATHS:
+
+        # Render engines that aren't enabled have no settings.
+        try:
+            owner = scene.path_resolve(owner_path)
+        except ValueError:
+            continue
+
+        skip = set(PERFORMANCE_PROPERTIES)
+        for path in skip_paths:
+            path_owner, attribute = path.rsplit('.', 1)
+            if path_owner == owner_path:
+                skip.add(attribute)
+
+        HashValue(hasher, owner_path)
+        HashRNAProperties(hasher, owner, skip)
+
+    HashValue(hasher, view_layer.name)
+    HashRNAProperties(hasher, view_layer)
+
+    for engine in ('cycles', 'eevee'):
+        settings = getattr(view_layer, engine, None)
+        if settings is not None:
+            HashRNAProperties(hasher, settings)
+
+
+def HashObjectRenderSettings(hasher, obj):
+    """
+    Hashes the ray visibility, holdout, pass and custom properties of an object,
+    which can change how it renders without changing the object itself.
+    """
+
+    HashValue(hasher, [(name, getattr(obj, name)) for name in OBJECT_RENDER_PROPERTIES
+        if hasattr(obj, name)])
+
+    # Older versions of Cycles keep ray visibility in settings of their own.
+    for engine in ('cycles', 'cycles_visibility'):
+        settings = getattr(obj, engine, None)
+        if settings is not None:
+            HashRNAProperties(hasher, settings)
+
+    HashValue(hasher, GetCustomProperties(obj))
+
+
+def HashOutputVariants(hasher, render_options):
+    """
+    Hashes every output variant of a Direct Camera, which HashRNAProperties skips
+    as they're a collection.
+    """
+
+    for variant in render_options.output_variants:
+        HashRNAProperties(hasher, variant)
+
+
+def HashImage(hasher, image):
+    """
+    Hashes an image by where it comes from, as the pixels may be too large to read.
+    """
+
+    HashValue(hasher, (image.name_full, image.source, image.filepath, image.is_dirty))
+
+    filepath = bpy.path.abspath(image.filepath)
+    if image.packed_file is None and os.path.exists(filepath):
+        stat = os.stat(filepath)
+        HashValue(hasher, (stat.st_size, stat.st_mtime_ns))
+
+
+def HashNodeTree(hasher, node_tree, visited):
+    """
+    Hashes the nodes, inputs and links of a node tree, following any node groups used.
+    """
+
+    if node_tree is None or node_tree in visited:
+        return
+    visited.add(node_tree)
+
+    HashValue(hasher, node_tree.name_full)
+
+    for node in sorted(node_tree.nodes, key = lambda n: n.name):
+        HashValue(hasher, (node.bl_idname, node.name))
+        HashRNAProperties(hasher, node, NODE_UI_PROPERTIES)
+
+        for socket in node.inputs:
+            if hasattr(socket, 'default_value') and socket.is_linked is False:
+                HashValue(hasher, (socket.identifier, socket.default_value))
+
+        image = getattr(node, 'image', None)
+        if image is not None:
+            HashImage(hasher, image)
+
+        HashNodeTree(hasher, getattr(node, 'node_tree', None), visited)
+
+    for link in node_tree.links:
+        HashValue(hasher, (link.from_node.name, link.from_socket.identifier,
+            link.to_node.name, link.to_socket.identifier, link.is_muted))
+
+
+def HashMaterial(hasher, material, visited):
+    if material is None or material in visited:
+        return
+    visited.add(material)
+
+    HashRNAProperties(hasher, material)
+    HashNodeTree(hasher, material.node_tree, visited)
+
+
+def HashWorld(hasher, world, visited):
+    if world is None:
+        HashValue(hasher, None)
+        return
+
+    HashRNAProperties(hasher, world)
+    HashNodeTree(hasher, world.node_tree, visited)
+
+
+def HashCollectionValues(hasher, collection, key, components, typecode):
+    """
+    Hashes one property of every item in a collection, returning False if it can't be read.
+    """
+
+    values = array(typecode, [0]) * (len(collection) * components)
+
+    try:
+        collection.foreach_get(key, values)
+    except (AttributeError, TypeError, RuntimeError):
+        return False
+
+    hasher.update(values.tobytes())
+    return True
+
+
+def HashMesh(hasher, mesh):
+    """
+    Hashes the vertex positions, topology, UVs and every attribute of a mesh.
+    Returns False if it has an attribute that can't be hashed.
+    """
+
+    HashCollectionValues(hasher, mesh.vertices, 'co', 3, 'f')
+    HashCollectionValues(hasher, mesh.loops, 'vertex_index', 1, 'i')
+    HashCollectionValues(hasher, mesh.polygons, 'loop_start', 1, 'i')
+    HashCollectionValues(hasher, mesh.polygons, 'material_index', 1, 'i')
+    HashCollectionValues(hasher, mesh.polygons, 'use_smooth', 1, 'b')
+
+    # UVs and vertex colors are also attributes in newer versions of Blender.
+    for uv_layer in mesh.uv_layers:
+        HashValue(hasher, uv_layer.name)
+        HashCollectionValues(hasher, uv_layer.data, 'uv', 2, 'f')
+
+    for attribute in mesh.attributes:
+        HashValue(hasher, (attribute.name, attribute.domain, attribute.data_type))
+        layout = ATTRIBUTE_LAYOUTS.get(attribute.data_type, None)
+
+        if layout is None or HashCollectionValues(hasher, attribute.data, *layout) is False:
+            return False
+
+    return True
+
+
+def HashGeometry(hasher, obj, depsgraph):
+    """
+    Hashes the geometry an object evaluates to, returning False if it couldn't be.
+    """
+
+    evaluated_obj = obj.evaluated_get(depsgraph)
+
+    # Objects the depsgraph doesn't evaluate (like ones hidden in the viewport)
+    # can't be hashed with their modifiers and deformations applied.
+    if evaluated_obj.is_evaluated is False:
+        return False
+
+    mesh = evaluated_obj.to_mesh()
+
+    try:
+        if mesh is None:
+            HashValue(hasher, None)
+            return True
+
+        return HashMesh(hasher, mesh)
+
+    finally:
+        evaluated_obj.to_mesh_clear()
+
+
+def HashPose(hasher, obj):
+    """
+    Hashes the pose of an armature, which moves whatever it deforms or parents.
+    """
+
+    for bone in obj.pose.bones:
+        HashValue(hasher, (bone.name, bone.matrix))
+
+
+def HashObject(hasher, obj, visited, depsgraph, hash_materials = True):
+    """
+    Hashes an object's transform, data, modifiers and (optionally) materials,
+    following any collection it instances.
+
+    Returns False if the object is a type whose render can't be fingerprinted
+    (like grease pencil or volumes), in which case it always has to be rendered.
+    """
+
+    if obj in visited:
+        return True
+    visited.add(obj)
+
+    if obj.type not in GEOMETRY_TYPES and obj.type not in PROPERTY_TYPES:
+        return False
+
+    HashValue(hasher, (obj.name_full, obj.type, obj.matrix_world, obj.hide_render))
+    HashObjectRenderSettings(hasher, obj)
+
+    data = obj.data
+    if data is not None and data not in visited:
+        visited.add(data)
+        HashValue(hasher, data.name_full)
+        HashRNAProperties(hasher, data)
+
+        # Lights and other data with their own node trees.
+        HashNodeTree(hasher, getattr(data, 'node_tree', None), visited)
+
+    # Evaluated geometry is different for every object using the data.
+    if obj.type in GEOMETRY_TYPES and HashGeometry(hasher, obj, depsgraph) is False:
+        return False
+
+    if obj.type == 'ARMATURE':
+        HashPose(hasher, obj)
+
+    for md in obj.modifiers:
+        HashRNAProperties(hasher, md)
+        HashNodeTree(hasher, getattr(md, 'node_group', None), visited)
+
+        if md.type == 'NODES':
+            HashValue(hasher, [(key, md[key]) for key in md.keys()])
+
+    if hash_materials is True:
+        for slot in obj.material_slots:
+            HashValue(hasher, (slot.link, slot.material))
+            HashMaterial(hasher, slot.material, visited)
+
+    if obj.instance_type == 'COLLECTION' and obj.instance_collection is not None:
+        for instanced_obj in obj.instance_collection.all_objects:
+            if HashObject(hasher, instanced_obj, visited, depsgraph, hash_materials) is False:
+                return False
+
+    return True
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+def GetUserVisibleObjects(self, context, view_layer):
+    """
+    Returns every object a View Layer renders with the render visibility the user has set.
+    """
+
+    # Objects in the Scene Collection can't be hidden by a collection.
+    visible_objects = set(view_layer.layer_collection.collection.objects)
+    search_layers = [(col, False) for col in view_layer.layer_collection.children]
+
+    while len(search_layers) > 0:
+        col, parent_hidden = search_layers.pop()
+        hidden = parent_hidden or col.exclude or col.collection.hide_render
+
+        if hidden is False:
+            visible_objects.update(col.collection.objects)
+        
+        search_layers += [(child, hidden) for child in col.children]
+    
+    return [obj for obj in visible_objects if obj.hide_render is False]
+
+
+def GetRenderedObjects(self, context, satellite):
+    """
+    Returns every object that could appear in a Satellite's render.  A missing
+    object would let a stale render be reused, so collection and object render
+    visibility are both followed.
+    """
+
+    scene = context.scene
+
+    if satellite.render_type == 'Skybox':
+        render_options = satellite.data_skybox
+
+        # Without a View Layer everything is hidden and only the world renders.
+        if render_options.view_layer == "":
+            return []
+
+    else:
+        render_options = satellite.data_camera
+
+    if render_options.view_layer != "":
+        view_layer = scene.view_layers[render_options.view_layer]
+        objects = [obj for obj in view_layer.objects if obj.hide_get(view_layer = view_layer) is False]
+
+    else:
+        view_layer = context.view_layer
+        if context.window is not None:
+            view_layer = context.window.view_layer
+
+        objects = GetUserVisibleObjects(self, context, view_layer)
+
+    return [obj for obj in objects if obj.get(RIG_PROPERTY) is None]
+
+
+def GetRenderViewLayer(self, context, satellite):
+    """
+    Returns the View Layer a Satellite renders with, which is the one shown in
+    the window if it doesn't pick one.
+    """
+
+    if satellite.render_type == 'Skybox':
+        layer_name = satellite.data_skybox.view_layer
+    else:
+        layer_name = satellite.data_camera.view_layer
+
+    if layer_name != "":
+        return context.scene.view_layers[layer_name]
+
+    if context.window is not None:
+        return context.window.view_layer
+
+    return context.view_layer
+
+
+def GetFingerprintDepsgraph(self, context, satellite):
+    """
+    Returns an evaluated depsgraph of the View Layer a Satellite renders with, so
+    objects only that View Layer can see are evaluated.
+    """
+
+    if satellite.render_type == 'Skybox':
+        layer_name = satellite.data_skybox.view_layer
+    else:
+        layer_name = satellite.data_camera.view_layer
+
+    if layer_name != "":
+        depsgraph = context.scene.view_layers[layer_name].depsgraph
+
+        # A View Layer that's never been shown may not have one yet.
+        if depsgraph is not None:
+            depsgraph.update()
+            return depsgraph
+
+    return context.evaluated_depsgraph_get()
+
+
+def ComputeSatelliteFingerprint(self, context, satellite, render_settings):
+    """
+    Returns a fingerprint of everything that decides how a Satellite's render will
+    look - the render settings it will be rendered with, the Satellite's own
+    settings and the datablocks seen in the render.
+
+    Returns None if something in the render can't be fingerprinted, so the
+    Satellite is always rendered.
+    """
+
+    scene = context.scene
+    hasher = hashlib.sha256()
+    visited = set()
+    depsgraph = GetFingerprintDepsgraph(self, context, satellite)
+
+    HashValue(hasher, CACHE_VERSION)
+    HashValue(hasher, sorted(render_settings.items()))
+    HashValue(hasher, scene.frame_current)
+
+    # Mid-batch the settings Satellite changes still hold the last Satellite's
+    # values, so they're only hashed from the render settings given.
+    HashSceneSettings(hasher, scene, GetRenderViewLayer(self, context, satellite),
+        render_settings.keys())
+
+    HashRNAProperties(hasher, satellite)
+
+    if satellite.render_type == 'Skybox':
+        render_options = satellite.data_skybox
+        HashRNAProperties(hasher, render_options)
+        replacement_material = None
+
+    else:
+        render_options = satellite.data_camera
+        HashRNAProperties(hasher, render_options)
+        HashOutputVariants(hasher, render_options)
+        HashObject(hasher, render_options.target_camera, visited, depsgraph)
+        replacement_material = render_options.replacement_material
+
+    world = render_options.world_material
+    if world is None:
+        world = scene.world
+    HashWorld(hasher, world, visited)
+
+    HashMaterial(hasher, replacement_material, visited)
+
+    # Objects are hashed in a fixed order, so only what's in the scene matters.
+    objects = GetRenderedObjects(self, context, satellite)
+    for obj in sorted(objects, key = lambda o: o.name_full):
+        if HashObject(hasher, obj, visited, depsgraph, hash_materials = (replacement_material is None)) is False:
+            return None
+
+    return hasher.hexdigest()
+
+
+def IsRenderCached(destination, filepaths, fingerprint):
+    """
+    Returns True if every file a render leaves behind exists and the render was
+    made with the same fingerprint.
+    """
+
+    if any(os.path.exists(filepath) is False for filepath in filepaths):
+        return False
+
+    fingerprint_path = GetFingerprintFilepath(destination)
+    if os.path.exists(fingerprint_path) is False:
+        return False
+
+    try:
+        with open(fingerprint_path, 'r') as fingerprint_file:
+            stored = json.load(fingerprint_file)
+    except (OSError, ValueError):
+        return False
+
+    return stored.get('fingerprint') == fingerprint
+
+
+def WriteRenderFingerprint(destination, fingerprint):
+    """
+    Stores the fingerprint of a render next to it so later batches can reuse it.
+    """
+
+    stored = {}
+    stored['version'] = CACHE_VERSION
+    stored['fingerprint'] = fingerprint
+
+    with open(GetFingerprintFilepath(destination), 'w') as fingerprint_file:
+        json.dump(stored, fingerprint_file, indent = 4)
+
+
+def ClearRenderFingerprint(destination):
+    """
+    Removes the fingerprint stored next to a render, so it can't be reused.
+    """
+
+    fingerprint_path = GetFingerprintFilepath(destination)
+    if os.path.exists(fingerprint_path):
+        os.remove(fingerprint_path)
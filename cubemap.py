@@ -0,0 +1,115 @@
+import bpy
+
+import os
+import numpy
+from math import radians
+from mathutils import Matrix, Vector
+
+from .cache import GetOutputFilepath
+from .imaging import LoadImagePixels, SaveImagePixels
+
+# The direction each face looks in and which way is up, using Blender's axes (Z is up).
+# Faces are ordered as most engines expect them.
+CUBEMAP_FACES = {
+    'px': (Vector((1.0, 0.0, 0.0)), Vector((0.0, 0.0, 1.0))),
+    'nx': (Vector((-1.0, 0.0, 0.0)), Vector((0.0, 0.0, 1.0))),
+    'py': (Vector((0.0, 1.0, 0.0)), Vector((0.0, 0.0, 1.0))),
+    'ny': (Vector((0.0, -1.0, 0.0)), Vector((0.0, 0.0, 1.0))),
+    'pz': (Vector((0.0, 0.0, 1.0)), Vector((0.0, -1.0, 0.0))),
+    'nz': (Vector((0.0, 0.0, -1.0)), Vector((0.0, 1.0, 0.0))),
+}
+
+# The size of each layout in faces, and the (row, column) each face is placed at
+# counting from the top left.  Faces meet along matching edges in the cross.
+CUBEMAP_LAYOUTS = {
+    'CROSS': (3, 4, {
+        'pz': (0, 1),
+        'nx': (1, 0), 'py': (1, 1), 'px': (1, 2), 'ny': (1, 3),
+        'nz': (2, 1),
+    }),
+    'STRIP': (1, 6, {face: (0, i) for i, face in enumerate(CUBEMAP_FACES)}),
+}
+
+
+def GetFaceRotation(face):
+    """
+    Returns the rotation a camera needs to look down one face of the cubemap.
+    """
+
+    forward, up = CUBEMAP_FACES[face]
+    right = forward.cross(up)
+
+    # Cameras look down their -Z axis with Y pointing up.
+    rotation = Matrix((right, up, -forward)).transposed()
+    return rotation.to_euler()
+
+
+def GetFaceDestination(destination, face):
+    """
+    Returns the path a single face is rendered to (without a file extension).
+    """
+
+    return destination + "_" + face
+
+
+def GetCubemapOutputFiles(destination, layout):
+    """
+    Returns the files a cubemap will leave behind once it's finished.
+    """
+
+    if layout == 'FACES':
+        return [GetOutputFilepath(GetFaceDestination(destination, face), 'HDR') for face in CUBEMAP_FACES]
+
+    return [GetOutputFilepath(destination, 'HDR')]
+
+
+def SetupCubemapCamera(camera_data):
+    """
+    Gives camera data a square 90 degree field of view for rendering cubemap faces.
+    """
+
+    camera_data.type = 'PERSP'
+    camera_data.lens_unit = 'FOV'
+    camera_data.sensor_fit = 'HORIZONTAL'
+    camera_data.angle = radians(90)
+
+
+def LoadCubemapFaces(destination):
+    """
+    Loads the six faces rendered for a cubemap as pixel arrays, keyed by face.
+    """
+
+    return {face: LoadImagePixels(GetOutputFilepath(GetFaceDestination(destination, face), 'HDR'))
+        for face in CUBEMAP_FACES}
+
+
+def SaveCubemap(faces, destination, layout):
+    """
+    Saves six cubemap faces using the given layout.
+    """
+
+    if layout == 'FACES':
+        for face, pixels in faces.items():
+            SaveImagePixels(GetOutputFilepath(GetFaceDestination(destination, face), 'HDR'), pixels)
+        return
+
+    rows, columns, placements = CUBEMAP_LAYOUTS[layout]
+    size = faces['px'].shape[0]
+    assembled = numpy.zeros((rows * size, columns * size, 4), dtype = numpy.float32)
+
+    for face, (row, column) in placements.items():
+        assembled[row * size : (row + 1) * size, column * size : (column + 1) * size] = faces[face]
+
+    SaveImagePixels(GetOutputFilepath(destination, 'HDR'), assembled)
+
+
+def AssembleCubemap(destination, layout):
+    """
+    Combines the six rendered faces of a cubemap into a single image using the
+    given layout, removing the individual faces once it's been saved.
+    """
+
+    SaveCubemap(LoadCubemapFaces(destination), destination, layout)
+
+    for face in CUBEMAP_FACES:
+        os.remove(GetOutputFilepath(GetFaceDestination(destination, face), 'HDR'))
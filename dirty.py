@@ -0,0 +1,320 @@
+import bpy
+from bpy.app.handlers import persistent
+
+import hashlib
+
+from .cache import (
+    GetRenderedObjects, 
+    GetRenderViewLayer, 
+    HashSceneSettings, 
+    HashObjectRenderSettings, 
+    HashRNAProperties, 
+    HashOutputVariants, 
+    HashValue,
+)
+from .node_inputs import GetIDKey
+
+# How long to wait after the scene changes before checking which Satellites it affected.
+SCENE_CHECK_DELAY = 0.5
+
+# The tracking state for each scene, keyed by scene name.  Satellites that aren't
+# tracked yet count as dirty, as we don't know what they were last rendered with.
+tracked_scenes = {}
+
+# While above zero, Satellite is changing the scene itself and updates are ignored.
+suspend_count = 0
+
+
+def GetSceneTracking(scene):
+    """
+    Returns the tracking state for a scene, creating it if needed.
+    """
+
+    if scene.name not in tracked_scenes:
+        tracking = {}
+        tracking['signatures'] = {}
+        tracking['dependencies'] = {}
+        tracking['dirty'] = set()
+        tracking['needs_scene_check'] = False
+        tracked_scenes[scene.name] = tracking
+
+    return tracked_scenes[scene.name]
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+def CollectNodeTreeDependencies(node_tree, keys):
+    if node_tree is None:
+        return
+
+    # Embedded node trees (like a World's) are updated through their owner.
+    if node_tree.is_embedded_data is False:
+        if GetIDKey(node_tree) in keys:
+            return
+        keys.add(GetIDKey(node_tree))
+
+    for node in node_tree.nodes:
+        image = getattr(node, 'image', None)
+        if image is not None:
+            keys.add(GetIDKey(image))
+
+        CollectNodeTreeDependencies(getattr(node, 'node_tree', None), keys)
+
+
+def CollectObjectDependencies(obj, keys, include_materials):
+    if GetIDKey(obj) in keys:
+        return
+    keys.add(GetIDKey(obj))
+
+    if obj.data is not None:
+        keys.add(GetIDKey(obj.data))
+        CollectNodeTreeDependencies(getattr(obj.data, 'node_tree', None), keys)
+
+    for collection in obj.users_collection:
+        keys.add(GetIDKey(collection))
+
+    for md in obj.modifiers:
+        CollectNodeTreeDependencies(getattr(md, 'node_group', None), keys)
+
+    if include_materials is True:
+        for slot in obj.material_slots:
+            if slot.material is not None:
+                keys.add(GetIDKey(slot.material))
+                CollectNodeTreeDependencies(slot.material.node_tree, keys)
+
+    if obj.instance_type == 'COLLECTION' and obj.instance_collection is not None:
+        keys.add(GetIDKey(obj.instance_collection))
+        for instanced_obj in obj.instance_collection.all_objects:
+            CollectObjectDependencies(instanced_obj, keys, include_materials)
+
+
+def CollectSatelliteDependencies(self, context, satellite, rendered_objects):
+    """
+    Returns the keys of every datablock that can change how a Satellite's render looks.
+    """
+
+    scene = context.scene
+    keys = set()
+
+    if satellite.render_type == 'Skybox':
+        render_options = satellite.data_skybox
+        replacement_material = None
+    else:
+        render_options = satellite.data_camera
+        replacement_material = render_options.replacement_material
+
+        if render_options.target_camera is not None:
+            CollectObjectDependencies(render_options.target_camera, keys, False)
+
+    world = render_options.world_material
+    if world is None:
+        world = scene.world
+
+    if world is not None:
+        keys.add(GetIDKey(world))
+        CollectNodeTreeDependencies(world.node_tree, keys)
+
+    if replacement_material is not None:
+        keys.add(GetIDKey(replacement_material))
+        CollectNodeTreeDependencies(replacement_material.node_tree, keys)
+
+    for obj in rendered_objects:
+        CollectObjectDependencies(obj, keys, replacement_material is None)
+
+    return keys
+
+
+def GetSatelliteSignature(self, context, satellite, rendered_objects):
+    """
+    Returns a cheap signature of a Satellite's own settings, the scene's render
+    settings and which objects it will render (along with their render settings),
+    used to catch changes that only show up as a scene update.
+    """
+
+    hasher = hashlib.sha256()
+    HashRNAProperties(hasher, satellite)
+    HashRNAProperties(hasher, satellite.data_skybox)
+    HashRNAProperties(hasher, satellite.data_camera)
+    HashOutputVariants(hasher, satellite.data_camera)
+    HashSceneSettings(hasher, context.scene, GetRenderViewLayer(self, context, satellite))
+
+    for obj in sorted(rendered_objects, key = lambda o: o.name_full):
+        HashValue(hasher, obj.name_full)
+        HashObjectRenderSettings(hasher, obj)
+
+    return hasher.hexdigest()
+
+
+def TrackSatellite(self, context, satellite):
+    """
+    Records what a Satellite currently depends on, as of it's last render.
+    """
+
+    tracking = GetSceneTracking(context.scene)
+    rendered_objects = GetRenderedObjects(self, context, satellite)
+
+    tracking['signatures'][satellite.name] = GetSatelliteSignature(self, context,
+        satellite, rendered_objects)
+    tracking['dependencies'][satellite.name] = CollectSatelliteDependencies(self, context,
+        satellite, rendered_objects)
+
+
+def MarkSatellitesRendered(self, context, names):
+    """
+    Marks Satellites as clean, tracking their dependencies from this point on.
+    """
+
+    tracking = GetSceneTracking(context.scene)
+    sat_presets = context.scene.SATL_SceneData.sat_presets
+
+    for name in names:
+        if sat_presets.find(name) == -1:
+            continue
+
+        TrackSatellite(self, context, sat_presets[name])
+        tracking['dirty'].discard(name)
+
+
+def CheckSceneChanges(self, context):
+    """
+    Compares every tracked Satellite's signature against the scene, marking any that
+    differ as dirty.  Also catches Satellites that were renamed, added or removed.
+    """
+
+    scene = context.scene
+    tracking = GetSceneTracking(scene)
+    tracking['needs_scene_check'] = False
+
+    sat_presets = scene.SATL_SceneData.sat_presets
+
+    for name in list(tracking['signatures'].keys()):
+        if sat_presets.find(name) == -1:
+            tracking['signatures'].pop(name)
+            tracking['dependencies'].pop(name, None)
+            tracking['dirty'].discard(name)
+            continue
+
+        satellite = sat_presets[name]
+
+        try:
+            rendered_objects = GetRenderedObjects(self, context, satellite)
+        except KeyError:
+            # The View Layer it uses doesn't exist anymore.
+            tracking['dirty'].add(name)
+            continue
+
+        if GetSatelliteSignature(self, context, satellite, rendered_objects) != tracking['signatures'][name]:
+            tracking['dirty'].add(name)
+
+
+def GetDirtySatellites(self, context):
+    """
+    Returns every Satellite that needs rendering again, in list order.
+    """
+
+    scene = context.scene
+    tracking = GetSceneTracking(scene)
+
+    if tracking['needs_scene_check'] is True:
+        CheckSceneChanges(self, context)
+
+    dirty = []
+    for sat in scene.SATL_SceneData.sat_presets:
+        if sat.name in tracking['dirty'] or sat.name not in tracking['signatures']:
+            dirty.append(sat)
+
+    return dirty
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+def SuspendTracking():
+    """
+    Stops scene updates from marking Satellites as dirty while Satellite makes it's own changes.
+    """
+
+    global suspend_count
+    suspend_count += 1
+
+
+def ResumeTracking():
+    global suspend_count
+    suspend_count = max(0, suspend_count - 1)
+
+
+def RunSceneCheck():
+    """
+    Timer that checks for scene-level changes once the user has stopped making them.
+    """
+
+    context = bpy.context
+    if context.scene is not None and suspend_count == 0:
+        tracking = GetSceneTracking(context.scene)
+        if tracking['needs_scene_check'] is True:
+            CheckSceneChanges(None, context)
+
+    return None
+
+
+@persistent
+def OnDepsgraphUpdate(scene, depsgraph):
+    """
+    Marks the Satellites depending on whatever datablocks were just changed as dirty.
+    """
+
+    if suspend_count > 0:
+        return
+
+    tracking = GetSceneTracking(scene)
+    dependencies = tracking['dependencies']
+    needs_scene_check = False
+
+    for update in depsgraph.updates:
+        id = update.id.original
+
+        # Visibility, new objects and Satellite settings all show up as scene
+        # or collection updates, so they're checked once things settle down.
+        if isinstance(id, (bpy.types.Scene, bpy.types.Collection)):
+            needs_scene_check = True
+
+        key = GetIDKey(id)
+        for name, keys in dependencies.items():
+            if key in keys:
+                tracking['dirty'].add(name)
+
+    if needs_scene_check is True:
+        tracking['needs_scene_check'] = True
+
+        if bpy.app.timers.is_registered(RunSceneCheck):
+            bpy.app.timers.unregister(RunSceneCheck)
+        bpy.app.timers.register(RunSceneCheck, first_interval = SCENE_CHECK_DELAY)
+
+
+@persistent
+def OnLoadPost(*args):
+    # Nothing is known about a newly loaded file.
+    tracked_scenes.clear()
+
+
+@persistent
+def OnUndoRedo(*args):
+    for tracking in tracked_scenes.values():
+        tracking['needs_scene_check'] = True
+
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(OnDepsgraphUpdate)
+    bpy.app.handlers.load_post.append(OnLoadPost)
+    bpy.app.handlers.undo_post.append(OnUndoRedo)
+    bpy.app.handlers.redo_post.append(OnUndoRedo)
+
+def unregister():
+    bpy.app.handlers.depsgraph_update_post.remove(OnDepsgraphUpdate)
+    bpy.app.handlers.load_post.remove(OnLoadPost)
+    bpy.app.handlers.undo_post.remove(OnUndoRedo)
+    bpy.app.handlers.redo_post.remove(OnUndoRedo)
+
+    if bpy.app.timers.is_registered(RunSceneCheck):
+        bpy.app.timers.unregister(RunSceneCheck)
@@ -0,0 +1,95 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .imaging import SaveImagePixels
+
+# How many images can be waiting to be encoded at once.  Each one holds a full
+# pixel array in memory, so rendering pauses when the queue is full.
+MAX_PENDING_ENCODES = 2
+
+
+def CreateEncodeQueue():
+    """
+    Creates a queue that encodes and saves images on background threads while
+    the next Satellite renders.
+    """
+
+    queue = {}
+    queue['executor'] = ThreadPoolExecutor(max_workers = MAX_PENDING_ENCODES)
+    queue['pending'] = deque()
+    queue['errors'] = []
+
+    return queue
+
+
+def WaitForEncode(queue):
+    """
+    Waits for the oldest image in the queue to finish saving.
+    """
+
+    filepath, future = queue['pending'].popleft()
+
+    try:
+        future.result()
+    except Exception as error:
+        queue['errors'].append((filepath, error))
+
+
+def WaitForPathEncodes(queue, filepaths):
+    """
+    Waits for any image queued to be saved to one of the filepaths, so a save that
+    finishes late can't replace a newer image at the same path.
+    """
+
+    filepaths = set(os.path.normpath(filepath) for filepath in filepaths)
+
+    while any(os.path.normpath(filepath) in filepaths for filepath, future in queue['pending']):
+        WaitForEncode(queue)
+
+
+def EncodeImage(filepath, pixels, image_format):
+    """
+    Saves an image next to where it belongs and then moves it into place, so a
+    failed or unfinished save never replaces a good image.
+    """
+
+    temp_filepath = filepath + ".encoding"
+
+    try:
+        SaveImagePixels(temp_filepath, pixels, image_format)
+        os.replace(temp_filepath, filepath)
+
+    finally:
+        if os.path.exists(temp_filepath):
+            os.remove(temp_filepath)
+
+
+def QueueImageEncode(queue, filepath, pixels, image_format):
+    """
+    Saves an image on a background thread, waiting for an earlier one to finish
+    first if the queue is full or it's being saved to the same path.  Only formats Satellite can encode itself can be queued.
+    """
+
+    WaitForPathEncodes(queue, [filepath])
+
+    while len(queue['pending']) >= MAX_PENDING_ENCODES:
+        WaitForEncode(queue)
+
+    future = queue['executor'].submit(EncodeImage, filepath, pixels, image_format)
+    queue['pending'].append((filepath, future))
+
+
+def FinishEncodeQueue(queue):
+    """
+    Waits for every queued image to be saved, returning the filepath and error of
+    any that couldn't be.
+    """
+
+    try:
+        while len(queue['pending']) > 0:
+            WaitForEncode(queue)
+    finally:
+        queue['executor'].shutdown(wait = True)
+
+    return queue['errors']
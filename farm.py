@@ -0,0 +1,336 @@
+import bpy
+from bpy.types import Operator
+
+import os
+import json
+import shutil
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from .render import (
+    VerifyRenderSettings,
+    BeginRenderBatch,
+    EndRenderBatch,
+    CheckSatelliteCache,
+    GetSatelliteParts,
+    GetSatelliteDestination,
+    FinalizeSatellite,
+)
+from .cache import WriteRenderFingerprint
+from .scheduler import ScheduleSatellites, PrintSchedule
+from .dirty import MarkSatellitesRendered
+
+# The addon package name, needed for workers to find the headless entry point.
+ADDON_PACKAGE = __package__
+
+
+def ShardSatellites(units, worker_count, contiguous = False):
+    """
+    Splits a list of units to render between workers as evenly as possible.  If
+    contiguous, each worker gets a continuous run of the list so that Satellites
+    grouped together by the scheduler stay together.
+    """
+
+    shards = [[] for i in range(worker_count)]
+
+    for i, unit in enumerate(units):
+        if contiguous is True:
+            shards[i * worker_count // len(units)].append(unit)
+        else:
+            shards[i % worker_count].append(unit)
+
+    return [shard for shard in shards if len(shard) > 0]
+
+
+def GetRenderUnits(satellites):
+    """
+    Returns the units of work the farm hands out to workers, as (name, part) pairs.
+    Satellites rendered in several parts (like cubemap faces) are split so each 
+    part can go to a different worker, otherwise the part is None.
+    """
+
+    units = []
+
+    for satellite in satellites:
+        for part in GetSatelliteParts(satellite):
+            units.append((satellite.name, part))
+
+    return units
+
+
+def GetWorkerThreads(worker_count):
+    """
+    Returns the number of CPU threads each worker should render with so that
+    workers don't fight each other for the same cores.
+    """
+
+    return max(1, (os.cpu_count() or 1) // worker_count)
+
+
+def BuildWorkerCommand(farm, units, report_path):
+    """
+    Builds the command used to launch a background Blender worker for a set of units.
+    """
+
+    names = [name for name, part in units if part is None]
+    part_arguments = []
+    for name, part in units:
+        if part is not None:
+            part_arguments += ["--part", name, part]
+
+    expression = "import importlib; importlib.import_module('" + ADDON_PACKAGE + ".headless').main()"
+
+    command = [
+        bpy.app.binary_path,
+        "--background", farm['blend_path'],
+        "--addons", ADDON_PACKAGE,
+        "--python-exit-code", "1",
+        "--python-expr", expression,
+        "--",
+        "--threads", str(farm['threads']),
+        "--report", report_path,
+    ]
+
+    if len(names) > 0:
+        command += ["--presets", *names]
+
+    command += part_arguments
+
+    if farm['output_root'] is not None:
+        command += ["--output-root", farm['output_root']]
+
+    if farm['use_cache'] is True:
+        command += ["--skip-unchanged"]
+
+    if farm['force'] is True:
+        command += ["--force"]
+
+    return command
+
+
+def RunWorker(farm, worker_id, units):
+    """
+    Runs a single worker process to completion, returning the reports it produced
+    and its exit code.  Satellites the worker never reported on are left out.
+    """
+
+    report_path = os.path.join(farm['temp_dir'], "worker_" + str(worker_id) + ".json")
+    log_path = os.path.join(farm['temp_dir'], "worker_" + str(worker_id) + ".log")
+
+    command = BuildWorkerCommand(farm, units, report_path)
+
+    with open(log_path, 'w') as log_file:
+        result = subprocess.run(command, stdout = log_file, stderr = subprocess.STDOUT)
+
+    reports = []
+    if os.path.exists(report_path):
+        with open(report_path, 'r') as report_file:
+            reports = json.load(report_file)['presets']
+
+    for report in reports:
+        report['worker'] = worker_id
+        report['log'] = log_path
+
+    return reports, result.returncode, log_path
+
+
+def RunShard(farm, shard_id, units):
+    """
+    Renders a shard of units, launching new workers for any units that didn't 
+    get a report because their worker crashed or was killed.  Returns the reports
+    keyed by unit.
+    """
+
+    results = {}
+    remaining = list(units)
+    attempt = 0
+    exit_code = None
+    log_path = None
+
+    while len(remaining) > 0 and attempt <= farm['retries']:
+        worker_id = str(shard_id) + "_" + str(attempt)
+        reports, exit_code, log_path = RunWorker(farm, worker_id, remaining)
+
+        for report in reports:
+            for part in report.get('parts', [None]):
+                results[(report['name'], part)] = report
+
+        remaining = [unit for unit in remaining if unit not in results]
+        attempt += 1
+
+        if len(remaining) > 0 and attempt <= farm['retries']:
+            print("Satellite - Worker " + worker_id + " exited with code " + str(exit_code)
+                + ", retrying " + str(len(remaining)) + " Satellites.")
+
+    for unit in remaining:
+        report = {}
+        report['name'] = unit[0]
+        report['status'] = 'FAILED'
+        report['info'] = ("The worker rendering the Satellite " + unit[0] + " exited with code "
+            + str(exit_code) + " before finishing.")
+        report['log'] = log_path
+        results[unit] = report
+
+    return results
+
+
+def FinishSplitSatellite(self, context, satellite, batch, unit_reports, fingerprint):
+    """
+    Combines the reports for every part of a Satellite rendered across workers,
+    finalizing it here once all the parts have rendered.
+    """
+
+    failed = [r for r in unit_reports if r['status'] != 'FINISHED']
+    if len(failed) > 0:
+        report = dict(failed[0])
+        report.pop('parts', None)
+        return report
+
+    destination = GetSatelliteDestination(satellite, batch['output_root'])
+
+    report = {}
+    report['name'] = satellite.name
+    report['destination'] = destination
+
+    try:
+        FinalizeSatellite(self, context, satellite, destination)
+        if fingerprint is not None:
+            WriteRenderFingerprint(destination, fingerprint)
+        report['status'] = 'FINISHED'
+
+    except Exception as error:
+        report['status'] = 'FAILED'
+        report['info'] = "The Satellite " + satellite.name + " couldn't be finished - " + str(error)
+
+    return report
+
+
+def RunRenderFarm(self, context, satellites, worker_count, output_root = None, retries = 1, 
+        contiguous = False, use_cache = False, force = False):
+    """
+    Renders Satellites across several background Blender processes that each open
+    the saved .blend file, returning a report for every Satellite in the order given.
+    """
+
+    satellites = list(satellites)
+    reports = {}
+    fingerprints = {}
+    split_names = [sat.name for sat in satellites if len(GetSatelliteParts(sat)) > 1]
+
+    # Workers only ever see part of a split Satellite, so the cache is checked here.
+    batch = BeginRenderBatch(self, context, output_root, use_cache, force)
+    try:
+        for satellite in satellites:
+            if satellite.name not in split_names:
+                continue
+
+            fingerprint, cached_report = CheckSatelliteCache(self, context, satellite, batch)
+            fingerprints[satellite.name] = fingerprint
+
+            if cached_report is not None:
+                cached_report['name'] = satellite.name
+                reports[satellite.name] = cached_report
+    finally:
+        EndRenderBatch(self, context, batch)
+
+    units = GetRenderUnits([sat for sat in satellites if sat.name not in reports])
+    results = {}
+
+    if len(units) > 0:
+        worker_count = max(1, min(worker_count, len(units)))
+
+        farm = {}
+        farm['blend_path'] = bpy.data.filepath
+        farm['threads'] = GetWorkerThreads(worker_count)
+        farm['output_root'] = output_root
+        farm['retries'] = retries
+        farm['use_cache'] = use_cache
+        farm['force'] = force
+        farm['temp_dir'] = tempfile.mkdtemp(prefix = "satellite_farm_")
+
+        shards = ShardSatellites(units, worker_count, contiguous)
+
+        with ThreadPoolExecutor(max_workers = worker_count) as executor:
+            futures = [executor.submit(RunShard, farm, i, shard) for i, shard in enumerate(shards)]
+
+            for future in futures:
+                results.update(future.result())
+
+    for satellite in satellites:
+        if satellite.name in reports:
+            continue
+
+        if satellite.name in split_names:
+            unit_reports = [results[(satellite.name, part)] for part in GetSatelliteParts(satellite)]
+            reports[satellite.name] = FinishSplitSatellite(self, context, satellite, batch,
+                unit_reports, fingerprints[satellite.name])
+        else:
+            reports[satellite.name] = results[(satellite.name, None)]
+
+    reports = [reports[sat.name] for sat in satellites]
+
+    if len(units) == 0:
+        return reports
+
+    # Keep the worker logs around if something went wrong.
+    if all(report['status'] in ('FINISHED', 'CACHED') for report in reports):
+        shutil.rmtree(farm['temp_dir'], ignore_errors = True)
+        for report in reports:
+            report.pop('log', None)
+
+    return reports
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+class SATELLITE_OT_RenderFarm(Operator):
+    """Renders all active Satellites using several background Blender processes at once.  The .blend file must be saved first, as each worker renders the saved file"""
+
+    bl_idname = "satl.render_farm"
+    bl_label = "Render All Active (Workers)"
+
+    def execute(self, context):
+
+        sat_data = context.scene.SATL_SceneData
+        active_satellites = [sat for sat in sat_data.sat_presets if sat.is_active is True]
+
+        if len(active_satellites) == 0:
+            self.report({'WARNING'}, "No Satellites are currently active.  Please tick at least one Satellite from the list to make it active")
+            return {'FINISHED'}
+
+        if bpy.data.filepath == "" or bpy.data.is_dirty:
+            self.report({'WARNING'}, "Please save the file before rendering with workers, as each worker renders the saved .blend file")
+            return {'FINISHED'}
+
+        # Perform some safety checks to ensure we have what we need
+        verify_settings = VerifyRenderSettings(self, context, True)
+        if verify_settings['status'] != 'SUCCESS':
+            self.report({'WARNING'}, verify_settings['info'])
+            return {'FINISHED'}
+
+        if sat_data.optimize_order is True:
+            active_satellites, schedule = ScheduleSatellites(active_satellites)
+            PrintSchedule(schedule)
+
+        reports = RunRenderFarm(self, context, active_satellites, sat_data.farm_workers,
+            retries = sat_data.farm_retries, contiguous = sat_data.optimize_order,
+            use_cache = sat_data.skip_unchanged)
+
+        failed = [r for r in reports if r['status'] not in ('FINISHED', 'CACHED')]
+        MarkSatellitesRendered(self, context, 
+            [r['name'] for r in reports if r['status'] in ('FINISHED', 'CACHED')])
+
+        if len(failed) > 0:
+            self.report({'WARNING'}, failed[0]['info'])
+
+        else:
+            info_txt = "Rendered "
+            info_txt += str(len(reports))
+            info_txt += " Satellites across "
+            info_txt += str(min(sat_data.farm_workers, len(reports)))
+            info_txt += " workers"
+            self.report({'INFO'}, info_txt)
+
+        return {'FINISHED'}
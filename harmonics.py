@@ -0,0 +1,77 @@
+import json
+import numpy
+from math import pi
+
+from .projection import GetChunkRows, EquirectToDirections
+
+# The real spherical harmonic basis up to band 2, ordered by band then by m from -l to l.
+SH_COEFFICIENT_COUNT = 9
+
+
+def GetHarmonicsBasis(directions):
+    """
+    Returns the value of all nine L2 spherical harmonic basis functions for each direction.
+    """
+
+    x, y, z = directions[..., 0], directions[..., 1], directions[..., 2]
+    basis = numpy.empty(directions.shape[:-1] + (SH_COEFFICIENT_COUNT,))
+
+    basis[..., 0] = 0.282095
+    basis[..., 1] = 0.488603 * y
+    basis[..., 2] = 0.488603 * z
+    basis[..., 3] = 0.488603 * x
+    basis[..., 4] = 1.092548 * x * y
+    basis[..., 5] = 1.092548 * y * z
+    basis[..., 6] = 0.315392 * (3.0 * z * z - 1.0)
+    basis[..., 7] = 1.092548 * x * z
+    basis[..., 8] = 0.546274 * (x * x - y * y)
+
+    return basis
+
+
+def ProjectEquirectToHarmonics(equirect):
+    """
+    Projects an equirectangular image onto the L2 spherical harmonics, returning
+    nine RGB coefficients.  Each pixel is weighted by the solid angle it covers,
+    which shrinks towards the top and bottom of the image.
+    """
+
+    height, width = equirect.shape[:2]
+    chunk_rows = GetChunkRows(width)
+
+    coefficients = numpy.zeros((SH_COEFFICIENT_COUNT, 3))
+    total_weight = 0.0
+
+    for start in range(0, height, chunk_rows):
+        rows = numpy.arange(start, min(start + chunk_rows, height))
+        directions = EquirectToDirections(rows, width, height)
+
+        latitude = (0.5 - (rows + 0.5) / height) * pi
+        solid_angle = (2.0 * pi / width) * (pi / height) * numpy.cos(latitude)
+
+        basis = GetHarmonicsBasis(directions) * solid_angle[:, None, None]
+        coefficients += numpy.einsum('rwk,rwc->kc', basis, equirect[start : start + len(rows), :, :3])
+        total_weight += solid_angle.sum() * width
+
+    # The pixels only approximately cover the sphere, so the total is corrected to exactly 4 pi.
+    return coefficients * (4.0 * pi / total_weight)
+
+
+def SaveHarmonics(filepath, coefficients, file_format):
+    """
+    Saves spherical harmonic coefficients as JSON, or as binary (27 little-endian
+    32-bit floats, RGB for each coefficient in order).
+    """
+
+    if file_format == 'BINARY':
+        with open(filepath, 'wb') as sh_file:
+            sh_file.write(numpy.asarray(coefficients, dtype = '<f4').tobytes())
+        return
+
+    harmonics = {}
+    harmonics['order'] = 2
+    harmonics['axes'] = "Z up, +Y forward (Blender)"
+    harmonics['coefficients'] = [[float(c) for c in rgb] for rgb in coefficients]
+
+    with open(filepath, 'w') as sh_file:
+        json.dump(harmonics, sh_file, indent = 4)
@@ -0,0 +1,219 @@
+"""
+The command-line entry point for rendering Satellites without the Blender UI.
+
+Run it from a background Blender process once the addon is enabled, using the
+name of the folder Satellite is installed under:
+
+    blender -b scene.blend --python-exit-code 1 --python-expr "import Satellite.headless as h; h.main()" -- --output-root //renders
+
+Every Satellite prints a single SATELLITE_REPORT line of JSON when it finishes
+(with a status of FINISHED, CACHED or FAILED),
+and Blender exits with 0 if everything rendered, 1 if any Satellite failed and
+2 if the arguments couldn't be used.
+"""
+
+import bpy
+
+import os
+import sys
+import json
+import fnmatch
+import argparse
+
+from .render import RenderSatellites
+from .farm import RunRenderFarm
+from .scheduler import ScheduleSatellites, PrintSchedule
+
+EXIT_SUCCESS = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+REPORT_PREFIX = "SATELLITE_REPORT "
+
+
+def CreateArgumentParser():
+    """
+    Builds the parser used to read the arguments given after "--".
+    """
+
+    parser = argparse.ArgumentParser(
+        prog = "satellite",
+        description = "Render Satellite presets from the command line.",
+    )
+    parser.add_argument("--presets", nargs = "+", default = [], metavar = "NAME",
+        help = "The names of the Satellites to render.  If not provided every active Satellite is used")
+    parser.add_argument("--part", nargs = 2, action = "append", default = [], metavar = ("NAME", "PART"),
+        dest = "parts", help = "Renders only one part of a Satellite (like a single cubemap face), leaving "
+        "it unfinished.  Used by workers, can be given more than once")
+    parser.add_argument("--filter", nargs = "+", default = [], metavar = "PATTERN", dest = "filters",
+        help = "Only render Satellites whose name matches one of these wildcard patterns (e.g. 'Sky*')")
+    parser.add_argument("--include-inactive", action = "store_true",
+        help = "Allow Satellites that aren't ticked as active to be rendered")
+    parser.add_argument("--output-root", default = None, metavar = "DIR",
+        help = "Replaces the Output Directory of every Satellite rendered")
+    parser.add_argument("--report", default = None, metavar = "FILE",
+        help = "Writes the status of every Satellite to a JSON file once finished")
+    parser.add_argument("--timings", default = None, metavar = "FILE",
+        help = "Writes how long each phase of every Satellite took to a JSON file once finished.  Not used "
+        "with --workers, where every Satellite's report has its timings instead")
+    parser.add_argument("--skip-unchanged", action = "store_true",
+        help = "Skips Satellites whose last render was made with the same settings and scene contents")
+    parser.add_argument("--force", action = "store_true",
+        help = "Renders every Satellite even when --skip-unchanged is used, updating their fingerprints")
+    parser.add_argument("--optimize-order", action = "store_true",
+        help = "Reorders the Satellites to avoid switching Render Engine, View Layer and materials between renders")
+    parser.add_argument("--workers", type = int, default = 1, metavar = "N",
+        help = "Splits the Satellites between this many background Blender processes")
+    parser.add_argument("--retries", type = int, default = 1, metavar = "N",
+        help = "How many times a Satellite is given to a new worker if its worker crashes")
+    parser.add_argument("--threads", type = int, default = None, metavar = "N",
+        help = "The number of CPU threads to render with")
+
+    return parser
+
+
+def GetScriptArguments(argv = None):
+    """
+    Returns the arguments meant for Satellite, which Blender expects to come after "--".
+    """
+
+    if argv is not None:
+        return argv
+
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+
+    return []
+
+
+def FindSatellites(scene, names, filters, include_inactive):
+    """
+    Returns the Satellites matching the given names and filters, as well as any
+    names that couldn't be found.
+    """
+
+    sat_data = scene.SATL_SceneData
+    satellites = []
+
+    missing = [name for name in names if sat_data.sat_presets.find(name) == -1]
+
+    for sat in sat_data.sat_presets:
+        if len(names) > 0 and sat.name not in names:
+            continue
+
+        if len(filters) > 0 and not any(fnmatch.fnmatchcase(sat.name, f) for f in filters):
+            continue
+
+        # Presets named explicitly don't need to be active.
+        if sat.is_active is False and include_inactive is False and sat.name not in names:
+            continue
+
+        satellites.append(sat)
+
+    # Named presets are rendered in the order given, which may have already been scheduled.
+    if len(names) > 0:
+        satellites.sort(key = lambda sat: names.index(sat.name))
+
+    return satellites, missing
+
+
+def PrintReport(report):
+    """
+    Prints a report as a single line so it can be picked out of Blender's own output.
+    """
+
+    print(REPORT_PREFIX + json.dumps(report, sort_keys = True), flush = True)
+
+
+def WriteBatchReport(filepath, scene, reports):
+    """
+    Writes every report from a batch to a JSON file.
+    """
+
+    batch_report = {}
+    batch_report['blend'] = bpy.data.filepath
+    batch_report['scene'] = scene.name
+    batch_report['presets'] = reports
+
+    filepath = bpy.path.abspath(filepath)
+    report_dir = os.path.dirname(filepath)
+    if report_dir != "":
+        os.makedirs(report_dir, exist_ok = True)
+
+    with open(filepath, 'w') as report_file:
+        json.dump(batch_report, report_file, indent = 4)
+
+
+def Finish(code):
+    """
+    Exits Blender with the given code when running in the background, otherwise
+    it's just returned so scripts inside the UI can use it.
+    """
+
+    if bpy.app.background:
+        sys.exit(code)
+
+    return code
+
+
+def main(argv = None):
+    """
+    Renders the Satellites requested by the command-line arguments.
+    """
+
+    parser = CreateArgumentParser()
+    args = parser.parse_args(GetScriptArguments(argv))
+
+    context = bpy.context
+    scene = context.scene
+
+    # Satellites given parts are rendered as named presets too.
+    parts = {}
+    for name, part in args.parts:
+        parts.setdefault(name, []).append(part)
+    
+    names = args.presets + [name for name in parts if name not in args.presets]
+    satellites, missing = FindSatellites(scene, names, args.filters, args.include_inactive)
+
+    if len(missing) > 0:
+        print("Satellite - These presets couldn't be found: " + ", ".join(missing), file = sys.stderr)
+        return Finish(EXIT_USAGE)
+
+    if len(satellites) == 0:
+        print("Satellite - No presets matched the given arguments.", file = sys.stderr)
+        return Finish(EXIT_USAGE)
+
+    if args.optimize_order is True:
+        satellites, schedule = ScheduleSatellites(satellites, args.output_root)
+        PrintSchedule(schedule)
+
+    # The file is never saved by a headless render so this doesn't need restoring.
+    if args.threads is not None:
+        scene.render.threads_mode = 'FIXED'
+        scene.render.threads = args.threads
+
+    if args.workers > 1:
+        reports = RunRenderFarm(None, context, satellites, args.workers, 
+            args.output_root, args.retries, args.optimize_order, 
+            args.skip_unchanged, args.force)
+    else:
+        reports = RenderSatellites(None, context, satellites, args.output_root, 
+            args.skip_unchanged, args.force, parts, args.timings)
+
+    for report in reports:
+        if 'destination' in report:
+            report['destination'] = bpy.path.abspath(report['destination'])
+        PrintReport(report)
+
+    if args.report is not None:
+        WriteBatchReport(args.report, scene, reports)
+
+    cached = [report for report in reports if report['status'] == 'CACHED']
+    if len(cached) > 0:
+        print("Satellite - Skipped " + str(len(cached)) + " unchanged Satellites: "
+            + ", ".join(report['name'] for report in cached))
+
+    if any(report['status'] not in ('FINISHED', 'CACHED') for report in reports):
+        return Finish(EXIT_FAILED)
+
+    return Finish(EXIT_SUCCESS)
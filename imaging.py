@@ -0,0 +1,258 @@
+import bpy
+
+import zlib
+import struct
+import numpy
+
+# Pixel arrays used by Satellite are float32 with a shape of (height, width, 4),
+# with the first row being the top of the image.  Blender stores images from
+# the bottom up, so rows are flipped when moving between the two.
+
+# Image formats are dictionaries matching the properties of Blender's ImageFormatSettings.
+HDR_FORMAT = {
+    'file_format': 'HDR',
+    'color_mode': 'RGB',
+}
+
+# Roughly how many pixels are encoded at once when streaming an image to disk.
+STREAM_CHUNK_PIXELS = 1 << 20
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_COLOR_TYPES = {'BW': 0, 'RGB': 2, 'RGBA': 6}
+PNG_CHANNELS = {'BW': 1, 'RGB': 3, 'RGBA': 4}
+
+# Radiance HDR scanlines can only be run-length encoded between these widths.
+HDR_RLE_MIN_WIDTH = 8
+HDR_RLE_MAX_WIDTH = 32767
+
+
+def LoadImagePixels(filepath):
+    """
+    Loads an image from disk as a pixel array.  The image is read as Non-Color
+    data so the pixels are exactly what's stored in the file.
+    """
+
+    image = bpy.data.images.load(filepath, check_existing = False)
+
+    try:
+        image.colorspace_settings.name = 'Non-Color'
+        width, height = image.size
+
+        pixels = numpy.empty(width * height * 4, dtype = numpy.float32)
+        image.pixels.foreach_get(pixels)
+
+    finally:
+        bpy.data.images.remove(image)
+
+    return pixels.reshape(height, width, 4)[::-1]
+
+
+def IterateRowChunks(pixels):
+    """
+    Yields an image a few rows at a time.  Works just as well for memory-mapped
+    images, which only load the rows being read.
+    """
+
+    height, width = pixels.shape[:2]
+    chunk_rows = max(1, STREAM_CHUNK_PIXELS // width)
+
+    for start in range(0, height, chunk_rows):
+        yield numpy.asarray(pixels[start : start + chunk_rows], dtype = numpy.float32)
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+def WritePNGChunk(png_file, chunk_type, data):
+    png_file.write(struct.pack('>I', len(data)))
+    png_file.write(chunk_type)
+    png_file.write(data)
+    png_file.write(struct.pack('>I', zlib.crc32(chunk_type + data) & 0xFFFFFFFF))
+
+
+def EncodePNGRows(rows, color_mode, bit_depth):
+    """
+    Converts rows of pixels into filtered PNG scanlines.  Every row uses the Sub
+    filter, which stores the difference from the pixel to the left.
+    """
+
+    channels = PNG_CHANNELS[color_mode]
+    values = numpy.clip(rows[..., :channels], 0.0, 1.0)
+
+    if bit_depth == 16:
+        data = numpy.rint(values * 65535.0).astype('>u2')
+    else:
+        data = numpy.rint(values * 255.0).astype(numpy.uint8)
+
+    data = data.reshape(len(rows), -1).view(numpy.uint8)
+    pixel_bytes = channels * bit_depth // 8
+
+    filtered = data.copy()
+    filtered[:, pixel_bytes:] -= data[:, :-pixel_bytes]
+
+    filter_types = numpy.ones((len(rows), 1), dtype = numpy.uint8)
+    return numpy.concatenate((filter_types, filtered), axis = 1).tobytes()
+
+
+def WritePNGStream(filepath, row_chunks, width, height, image_format):
+    """
+    Writes a PNG a few rows at a time, so the whole image never has to be encoded at once.
+    """
+
+    color_mode = image_format.get('color_mode', 'RGB')
+    bit_depth = 16 if image_format.get('color_depth', '8') == '16' else 8
+    level = round(image_format.get('compression', 15) * 9 / 100)
+
+    header = struct.pack('>IIBBBBB', width, height, bit_depth, PNG_COLOR_TYPES[color_mode], 0, 0, 0)
+    compressor = zlib.compressobj(level)
+
+    with open(filepath, 'wb') as png_file:
+        png_file.write(PNG_SIGNATURE)
+        WritePNGChunk(png_file, b'IHDR', header)
+
+        for rows in row_chunks:
+            compressed = compressor.compress(EncodePNGRows(rows, color_mode, bit_depth))
+            if len(compressed) > 0:
+                WritePNGChunk(png_file, b'IDAT', compressed)
+
+        WritePNGChunk(png_file, b'IDAT', compressor.flush())
+        WritePNGChunk(png_file, b'IEND', b'')
+
+
+def EncodeRGBE(rows):
+    """
+    Converts rows of pixels into Radiance RGBE values, a shared exponent for all
+    three channels.
+    """
+
+    colors = numpy.maximum(rows[..., :3], 0.0)
+    brightest = colors.max(axis = -1)
+
+    mantissa, exponent = numpy.frexp(brightest)
+    visible = brightest > 1e-32
+    scale = numpy.where(visible, mantissa * 256.0 / numpy.where(visible, brightest, 1.0), 0.0)
+
+    rgbe = numpy.empty(rows.shape[:-1] + (4,), dtype = numpy.uint8)
+    rgbe[..., :3] = numpy.clip(colors * scale[..., None], 0, 255).astype(numpy.uint8)
+    rgbe[..., 3] = numpy.where(visible, exponent + 128, 0).astype(numpy.uint8)
+
+    return rgbe
+
+
+def EncodeHDRScanlines(rgbe):
+    """
+    Run-length encodes RGBE rows using literal runs only, with each channel stored
+    separately.  Runs of up to 128 bytes are stored after a byte giving their length.
+    """
+
+    rows, width = rgbe.shape[:2]
+    full_runs, remainder = divmod(width, 128)
+
+    scanline_header = numpy.array([2, 2, width >> 8, width & 0xFF], dtype = numpy.uint8)
+    parts = [numpy.broadcast_to(scanline_header, (rows, 4))]
+
+    for channel in range(4):
+        values = rgbe[..., channel]
+
+        if full_runs > 0:
+            runs = values[:, : full_runs * 128].reshape(rows, full_runs, 128)
+            counts = numpy.full((rows, full_runs, 1), 128, dtype = numpy.uint8)
+            parts.append(numpy.concatenate((counts, runs), axis = 2).reshape(rows, -1))
+
+        if remainder > 0:
+            parts.append(numpy.full((rows, 1), remainder, dtype = numpy.uint8))
+            parts.append(values[:, full_runs * 128 :])
+
+    return numpy.concatenate(parts, axis = 1).tobytes()
+
+
+def WriteHDRStream(filepath, row_chunks, width, height, image_format):
+    """
+    Writes a Radiance HDR a few rows at a time, so the whole image never has to be
+    encoded at once.
+    """
+
+    use_rle = HDR_RLE_MIN_WIDTH <= width <= HDR_RLE_MAX_WIDTH
+
+    with open(filepath, 'wb') as hdr_file:
+        hdr_file.write(b"#?RADIANCE\nFORMAT=32-bit_rle_rgbe\n\n")
+        hdr_file.write(("-Y " + str(height) + " +X " + str(width) + "\n").encode('ascii'))
+
+        for rows in row_chunks:
+            if image_format.get('color_mode', 'RGB') == 'BW':
+                rows = numpy.repeat(rows[..., :1], 4, axis = -1)
+
+            rgbe = EncodeRGBE(rows)
+
+            if use_rle is True:
+                hdr_file.write(EncodeHDRScanlines(rgbe))
+            else:
+                hdr_file.write(rgbe.tobytes())
+
+
+# Formats Satellite can encode itself, a few rows at a time.
+STREAM_WRITERS = {
+    'PNG': WritePNGStream,
+    'HDR': WriteHDRStream,
+}
+
+
+def SaveImageWithBlender(filepath, pixels, image_format, view_settings = None):
+    """
+    Saves a pixel array using Blender's own image writers, for formats Satellite
+    can't encode itself.  The whole image is held in memory while it's saved.
+
+    If view settings are given the pixels are treated as linear scene colors and
+    transformed with them, like a render would be.
+    """
+
+    height, width = pixels.shape[:2]
+    image = bpy.data.images.new("Satellite Image", width, height, alpha = True, float_buffer = True)
+
+    # Image format settings can only be given through a scene.
+    settings_scene = bpy.data.scenes.new("Satellite Image Settings")
+
+    try:
+        if view_settings is None:
+            image.colorspace_settings.name = 'Non-Color'
+        image.pixels.foreach_set(numpy.ascontiguousarray(pixels[::-1], dtype = numpy.float32).ravel())
+
+        image_settings = settings_scene.render.image_settings
+        image_settings.file_format = image_format['file_format']
+        settings_scene.view_settings.view_transform = 'Standard'
+
+        if view_settings is not None:
+            for key, value in view_settings.items():
+                setattr(settings_scene.view_settings, key, value)
+
+        for key, value in image_format.items():
+            if key == 'file_format':
+                continue
+
+            # Some settings aren't valid for every format.
+            try:
+                setattr(image_settings, key, value)
+            except TypeError:
+                continue
+
+        image.save_render(filepath, scene = settings_scene)
+
+    finally:
+        bpy.data.scenes.remove(settings_scene)
+        bpy.data.images.remove(image)
+
+
+def SaveImagePixels(filepath, pixels, image_format = HDR_FORMAT, view_settings = None):
+    """
+    Saves a pixel array (or a memory-mapped one) to disk in the given format.  Without
+    view settings there's no color conversion, and PNG and HDR images are streamed to
+    disk a few rows at a time so a memory-mapped image is never fully loaded.
+    """
+
+    height, width = pixels.shape[:2]
+    writer = STREAM_WRITERS.get(image_format['file_format'], None)
+
+    if writer is not None and view_settings is None:
+        writer(filepath, IterateRowChunks(pixels), width, height, image_format)
+    else:
+        SaveImageWithBlender(filepath, numpy.asarray(pixels), image_format, view_settings)
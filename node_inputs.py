@@ -0,0 +1,97 @@
+import bpy
+from bpy.app.handlers import persistent
+
+# The Material inputs of every Geometry Nodes group looked at so far, keyed by
+# the group's ID key.  An entry is removed whenever it's node group changes.
+material_input_cache = {}
+
+
+def GetIDKey(id):
+    """
+    Returns a key for a datablock that is the same for the original and evaluated copies.
+    """
+
+    return (id.bl_rna.identifier, id.name_full)
+
+
+def FindMaterialInputs(node_group):
+    """
+    Returns the identifiers of every Material input of a node group, which are
+    also the names of the modifier properties that hold their values.
+    """
+
+    # big thanks to the modifier list addon author for cracking
+    # the code on this seemingly undocumented area
+    input_node = next((node for node in node_group.nodes if node.type == 'GROUP_INPUT'),
+                None)
+
+    if not input_node:
+        return []
+
+    # The last output is skipped because it's a placeholder.
+    return [node_output.identifier for node_output in input_node.outputs[:-1]
+        if node_output.type == 'MATERIAL']
+
+
+def GetNodeGroupMaterialInputs(node_group):
+    """
+    Returns the identifiers of every Material input of a node group, reusing the
+    ones found last time if the node group hasn't changed since.
+    """
+
+    key = GetIDKey(node_group)
+    entry = material_input_cache.get(key, None)
+
+    # A node group made with the name of a removed one is a different datablock.
+    if entry is None or entry['pointer'] != node_group.as_pointer():
+        entry = {}
+        entry['pointer'] = node_group.as_pointer()
+        entry['inputs'] = FindMaterialInputs(node_group)
+        material_input_cache[key] = entry
+
+    return entry['inputs']
+
+
+def GetModifierMaterialInputs(md):
+    """
+    Returns the property ids of every Material input on a Geometry Nodes modifier.
+    """
+
+    if not md.node_group:
+        return []
+
+    return [key for key in GetNodeGroupMaterialInputs(md.node_group) if key in md]
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+@persistent
+def OnDepsgraphUpdate(scene, depsgraph):
+    """
+    Forgets the Material inputs of any node group that was just changed.
+    """
+
+    for update in depsgraph.updates:
+        id = update.id.original
+
+        if isinstance(id, bpy.types.NodeTree):
+            material_input_cache.pop(GetIDKey(id), None)
+
+
+@persistent
+def OnLoadPost(*args):
+    material_input_cache.clear()
+
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(OnDepsgraphUpdate)
+    bpy.app.handlers.load_post.append(OnLoadPost)
+    bpy.app.handlers.undo_post.append(OnLoadPost)
+    bpy.app.handlers.redo_post.append(OnLoadPost)
+
+def unregister():
+    bpy.app.handlers.depsgraph_update_post.remove(OnDepsgraphUpdate)
+    bpy.app.handlers.load_post.remove(OnLoadPost)
+    bpy.app.handlers.undo_post.remove(OnLoadPost)
+    bpy.app.handlers.redo_post.remove(OnLoadPost)
@@ -0,0 +1,153 @@
+import bpy
+
+from .cache import GetOutputFilepath
+from .cubemap import GetCubemapOutputFiles, LoadCubemapFaces, SaveCubemap
+from .imaging import LoadImagePixels, SaveImagePixels
+from .projection import EquirectToCubemap, CubemapToEquirect
+from .prefilter import GenerateSkyboxLighting
+from .harmonics import ProjectEquirectToHarmonics, SaveHarmonics
+
+# Added to the Output Name of images converted to the other projection.
+CONVERTED_CUBEMAP_SUFFIX = "_cubemap"
+CONVERTED_EQUIRECT_SUFFIX = "_equirect"
+
+# Added to the Output Name of the lighting generated from a skybox.
+SPECULAR_SUFFIX = "_specular_"
+IRRADIANCE_SUFFIX = "_irradiance"
+HARMONICS_SUFFIX = "_sh"
+
+HARMONICS_EXTENSIONS = {
+    'JSON': ".json",
+    'BINARY': ".bin",
+}
+
+
+def CreateSkyboxSource(satellite, destination):
+    """
+    Returns the rendered skybox that post-processing stages work from.  It's loaded
+    the first time a stage needs it and converted between projections as needed, 
+    so every stage can share a single copy.
+    """
+
+    source = {}
+    source['render_options'] = satellite.data_skybox
+    source['destination'] = destination
+    source['equirect'] = None
+    source['faces'] = None
+
+    return source
+
+
+def GetSourceEquirect(source):
+    render_options = source['render_options']
+
+    if source['equirect'] is None:
+        if render_options.projection == 'CUBEMAP':
+            resolution = render_options.resolution
+            source['equirect'] = CubemapToEquirect(GetSourceFaces(source), resolution, resolution // 2)
+        else:
+            source['equirect'] = LoadImagePixels(GetOutputFilepath(source['destination'], 'HDR'))
+
+    return source['equirect']
+
+
+def GetSourceFaces(source):
+    render_options = source['render_options']
+
+    if source['faces'] is None:
+        if render_options.projection == 'CUBEMAP':
+            source['faces'] = LoadCubemapFaces(source['destination'])
+        else:
+            source['faces'] = EquirectToCubemap(GetSourceEquirect(source), render_options.face_resolution)
+
+    return source['faces']
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+def GetHarmonicsFilepath(render_options, destination):
+    return (bpy.path.abspath(destination) + HARMONICS_SUFFIX 
+        + HARMONICS_EXTENSIONS[render_options.harmonics_format])
+
+
+def GetSkyboxStageOutputFiles(satellite, destination):
+    """
+    Returns the extra files written by a Skybox's post-processing stages.
+    """
+
+    render_options = satellite.data_skybox
+    filepaths = []
+
+    if render_options.convert_projection is True:
+        if render_options.projection == 'CUBEMAP':
+            filepaths.append(GetOutputFilepath(destination + CONVERTED_EQUIRECT_SUFFIX, 'HDR'))
+        else:
+            filepaths += GetCubemapOutputFiles(destination + CONVERTED_CUBEMAP_SUFFIX,
+                render_options.cubemap_layout)
+
+    if render_options.generate_specular is True:
+        for mip in range(render_options.specular_mip_count):
+            filepaths += GetCubemapOutputFiles(destination + SPECULAR_SUFFIX + str(mip),
+                render_options.cubemap_layout)
+
+    if render_options.generate_irradiance is True:
+        filepaths += GetCubemapOutputFiles(destination + IRRADIANCE_SUFFIX,
+            render_options.cubemap_layout)
+
+    if render_options.generate_harmonics is True:
+        filepaths.append(GetHarmonicsFilepath(render_options, destination))
+
+    return filepaths
+
+
+def ConvertSkyboxProjection(self, context, render_options, source, destination):
+    """
+    Saves the skybox in the projection it wasn't rendered with.
+    """
+
+    if render_options.projection == 'CUBEMAP':
+        SaveImagePixels(GetOutputFilepath(destination + CONVERTED_EQUIRECT_SUFFIX, 'HDR'),
+            GetSourceEquirect(source))
+    else:
+        SaveCubemap(GetSourceFaces(source), destination + CONVERTED_CUBEMAP_SUFFIX,
+            render_options.cubemap_layout)
+
+
+def GenerateLighting(self, context, render_options, source, destination):
+    """
+    Saves the prefiltered specular mips and irradiance map generated from the skybox.
+    """
+
+    specular, irradiance = GenerateSkyboxLighting(GetSourceFaces(source), 
+        render_options.specular_resolution, render_options.specular_mip_count, 
+        render_options.irradiance_resolution, render_options.lighting_samples,
+        render_options.generate_specular, render_options.generate_irradiance)
+
+    if specular is not None:
+        for mip, faces in enumerate(specular):
+            SaveCubemap(faces, destination + SPECULAR_SUFFIX + str(mip), render_options.cubemap_layout)
+
+    if irradiance is not None:
+        SaveCubemap(irradiance, destination + IRRADIANCE_SUFFIX, render_options.cubemap_layout)
+
+
+def RunSkyboxStages(self, context, satellite, destination):
+    """
+    Runs every post-processing stage enabled for a Skybox on the images it rendered.
+    Cubemaps are still individual faces at this point.
+    """
+
+    render_options = satellite.data_skybox
+    source = CreateSkyboxSource(satellite, destination)
+
+    if render_options.convert_projection is True:
+        ConvertSkyboxProjection(self, context, render_options, source, destination)
+
+    if render_options.generate_specular is True or render_options.generate_irradiance is True:
+        GenerateLighting(self, context, render_options, source, destination)
+
+    if render_options.generate_harmonics is True:
+        coefficients = ProjectEquirectToHarmonics(GetSourceEquirect(source))
+        SaveHarmonics(GetHarmonicsFilepath(render_options, destination), coefficients, 
+            render_options.harmonics_format)
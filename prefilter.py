@@ -0,0 +1,295 @@
+import os
+import numpy
+from math import pi, log2
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .cubemap import CUBEMAP_FACES
+from .projection import (
+    CHUNK_PIXELS, 
+    GetChunkRows, 
+    FaceToDirections, 
+    DirectionsToCubemap, 
+    SampleBilinear,
+)
+
+# Samples are blurred a little more than their footprint needs, which hides the
+# noise left from using fewer samples (as described by Karis in "Real Shading in UE4").
+LOD_BIAS = 1.0
+
+# Roughly how many texels can be filtered at once between every thread.  Each one
+# needs a few temporary vectors for every sample, so this bounds the memory used
+# while the largest mips are generated.
+MAX_FILTER_PIXELS = 4 * CHUNK_PIXELS
+
+
+def GetHammersleyPoints(count):
+    """
+    Returns a well distributed set of 2D sample points between 0 and 1.
+    """
+
+    i = numpy.arange(count, dtype = numpy.uint32)
+
+    # The radical inverse is the bits of the index mirrored around the decimal point.
+    bits = i.copy()
+    bits = (bits << 16) | (bits >> 16)
+    bits = ((bits & 0x55555555) << 1) | ((bits & 0xAAAAAAAA) >> 1)
+    bits = ((bits & 0x33333333) << 2) | ((bits & 0xCCCCCCCC) >> 2)
+    bits = ((bits & 0x0F0F0F0F) << 4) | ((bits & 0xF0F0F0F0) >> 4)
+    bits = ((bits & 0x00FF00FF) << 8) | ((bits & 0xFF00FF00) >> 8)
+
+    return i / count, bits.astype(numpy.float64) / 2.0**32
+
+
+def BuildSourceMips(faces):
+    """
+    Stacks the six faces of a cubemap and halves them in size until they can't
+    be halved any further, so samples covering a large area can be read cheaply.
+    """
+
+    mips = [numpy.stack([faces[face] for face in CUBEMAP_FACES])]
+
+    while mips[-1].shape[1] > 1 and mips[-1].shape[1] % 2 == 0:
+        size = mips[-1].shape[1] // 2
+        mips.append(mips[-1].reshape(6, size, 2, size, 2, 4).mean(axis = (2, 4)))
+
+    return mips
+
+
+def SampleSourceMips(mips, directions, lod):
+    """
+    Samples the source cubemap in each direction from the mip closest to the given level.
+    """
+
+    level = int(numpy.clip(round(lod), 0, len(mips) - 1))
+    face_index, x, y = DirectionsToCubemap(directions, mips[level].shape[1])
+
+    return SampleBilinear(mips[level], x, y, layer = face_index)
+
+
+def GetSampleLod(mips, sample_count, pdf):
+    """
+    Returns the source mip level whose texels cover roughly the same solid angle as a sample.
+    """
+
+    if pdf <= 0.0:
+        return len(mips) - 1
+
+    sample_angle = 1.0 / (sample_count * pdf)
+    texel_angle = 4.0 * pi / (6.0 * mips[0].shape[1] ** 2)
+
+    return max(0.5 * log2(sample_angle / texel_angle) + LOD_BIAS, 0.0)
+
+
+def GetTexelFrames(size, rows):
+    """
+    Returns the direction through every texel in the given rows of each face of
+    a cubemap, along with two tangents perpendicular to it.
+    """
+
+    normals = numpy.stack([FaceToDirections(i, rows, size) for i in range(6)])
+    normals /= numpy.linalg.norm(normals, axis = -1, keepdims = True)
+
+    # Any vector not parallel to the normal works to build the tangents from.
+    up = numpy.zeros_like(normals)
+    pole = numpy.abs(normals[..., 2]) > 0.999
+    up[..., 2] = numpy.where(pole, 0.0, 1.0)
+    up[..., 0] = numpy.where(pole, 1.0, 0.0)
+
+    tangent_x = numpy.cross(up, normals)
+    tangent_x /= numpy.linalg.norm(tangent_x, axis = -1, keepdims = True)
+    tangent_y = numpy.cross(normals, tangent_x)
+
+    return normals, tangent_x, tangent_y
+
+
+def GetFilterPixels(size):
+    """
+    Returns how many texels are filtered at once for a cubemap of the given size.
+    """
+
+    return 6 * size * min(size, GetChunkRows(6 * size))
+
+
+def FilterCubemap(size, filter_rows):
+    """
+    Filters a cubemap a few rows of every face at a time, so the temporary values
+    needed only ever cover part of it.  filter_rows is given the rows to filter
+    and returns their pixels for all six faces.
+    """
+
+    stacked = numpy.empty((6, size, size, 4), dtype = numpy.float32)
+    chunk_rows = GetChunkRows(6 * size)
+
+    for start in range(0, size, chunk_rows):
+        rows = numpy.arange(start, min(start + chunk_rows, size))
+        stacked[:, start : start + len(rows)] = filter_rows(rows)
+
+    return StackToFaces(stacked)
+
+
+def StackToFaces(stacked):
+    faces = {}
+    for i, face in enumerate(CUBEMAP_FACES):
+        faces[face] = stacked[i].astype(numpy.float32)
+        faces[face][..., 3] = 1.0
+
+    return faces
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+def GetSpecularSamples(mips, roughness, sample_count):
+    """
+    Returns the GGX samples for a roughness, each as a half vector in tangent space
+    along with it's weight and the source mip level it's read from.
+    """
+
+    alpha_sq = (roughness * roughness) ** 2
+    samples = []
+
+    for u, v in zip(*GetHammersleyPoints(sample_count)):
+        phi = 2.0 * pi * u
+        cos_theta = numpy.sqrt((1.0 - v) / (1.0 + (alpha_sq - 1.0) * v))
+        sin_theta = numpy.sqrt(1.0 - cos_theta * cos_theta)
+
+        # With the view direction on the normal every texel gets the same weight and pdf.
+        n_dot_l = 2.0 * cos_theta * cos_theta - 1.0
+        if n_dot_l <= 0.0:
+            continue
+
+        distribution = alpha_sq / (pi * ((alpha_sq - 1.0) * cos_theta * cos_theta + 1.0) ** 2)
+        lod = GetSampleLod(mips, sample_count, distribution / 4.0)
+
+        samples.append((sin_theta * numpy.cos(phi), sin_theta * numpy.sin(phi), cos_theta,
+            n_dot_l, lod))
+
+    return samples
+
+
+def PrefilterSpecular(mips, size, roughness, sample_count):
+    """
+    Convolves the source cubemap with the GGX distribution for the given roughness,
+    assuming the view and reflection directions match the normal.  Samples are
+    importance sampled and read from the source mip matching their footprint.
+    """
+
+    if roughness == 0.0:
+        lod = 0.5 * log2((mips[0].shape[1] / size) ** 2)
+
+        def FilterRows(rows):
+            normals = GetTexelFrames(size, rows)[0]
+            return SampleSourceMips(mips, normals, lod)
+
+        return FilterCubemap(size, FilterRows)
+
+    samples = GetSpecularSamples(mips, roughness, sample_count)
+    total_weight = max(sum(sample[3] for sample in samples), 1e-8)
+
+    def FilterRows(rows):
+        normals, tangent_x, tangent_y = GetTexelFrames(size, rows)
+        result = numpy.zeros(normals.shape[:-1] + (4,))
+
+        for x, y, z, n_dot_l, lod in samples:
+            half_vector = tangent_x * x + tangent_y * y + normals * z
+            light = 2.0 * z * half_vector - normals
+            result += SampleSourceMips(mips, light, lod) * n_dot_l
+
+        return result / total_weight
+
+    return FilterCubemap(size, FilterRows)
+
+
+def ConvolveIrradiance(mips, size, sample_count):
+    """
+    Convolves the source cubemap with a cosine lobe, giving the average light
+    arriving at a surface facing each direction.  Multiply by a surface's albedo
+    to get its diffuse lighting.
+    """
+
+    samples = []
+    for u, v in zip(*GetHammersleyPoints(sample_count)):
+        phi = 2.0 * pi * u
+        cos_theta = numpy.sqrt(1.0 - v)
+        sin_theta = numpy.sqrt(v)
+
+        lod = GetSampleLod(mips, sample_count, cos_theta / pi)
+        samples.append((sin_theta * numpy.cos(phi), sin_theta * numpy.sin(phi), cos_theta, lod))
+
+    def FilterRows(rows):
+        normals, tangent_x, tangent_y = GetTexelFrames(size, rows)
+        result = numpy.zeros(normals.shape[:-1] + (4,))
+
+        for x, y, z, lod in samples:
+            light = tangent_x * x + tangent_y * y + normals * z
+            result += SampleSourceMips(mips, light, lod)
+
+        return result / sample_count
+
+    return FilterCubemap(size, FilterRows)
+
+
+def GetMipRoughness(mip, mip_count):
+    """
+    Returns the roughness a mip of the specular chain is prefiltered for, rising
+    evenly from 0 at the first mip to 1 at the last.
+    """
+
+    if mip_count <= 1:
+        return 0.0
+
+    return mip / (mip_count - 1)
+
+
+def GenerateSkyboxLighting(faces, specular_size, mip_count, irradiance_size, sample_count,
+        use_specular = True, use_irradiance = True):
+    """
+    Generates the prefiltered specular mip chain and irradiance map for a skybox,
+    with the mips generated in parallel as long as the texels being filtered fit
+    in MAX_FILTER_PIXELS.  Returns the specular mips (as a list of faces) and the 
+    irradiance map (as faces), either of which may be None.
+    """
+
+    mips = BuildSourceMips(faces)
+
+    # Each is keyed by the mip it makes, or 'irradiance'.
+    tasks = []
+    if use_specular is True:
+        for mip in range(mip_count):
+            size = max(1, specular_size >> mip)
+            tasks.append((mip, size, PrefilterSpecular, 
+                (mips, size, GetMipRoughness(mip, mip_count), sample_count)))
+
+    if use_irradiance is True:
+        tasks.append(('irradiance', irradiance_size, ConvolveIrradiance,
+            (mips, irradiance_size, sample_count)))
+
+    results = {}
+
+    # The heavy lifting happens inside NumPy, which lets other threads run alongside it.
+    with ThreadPoolExecutor(max_workers = os.cpu_count() or 1) as executor:
+        running = {}
+        running_pixels = 0
+
+        for key, size, function, args in tasks:
+            pixels = GetFilterPixels(size)
+
+            # A large mip waits for others to finish, but always runs if it's alone.
+            while len(running) > 0 and running_pixels + pixels > MAX_FILTER_PIXELS:
+                done, not_done = wait(running, return_when = FIRST_COMPLETED)
+                for future in done:
+                    done_key, done_pixels = running.pop(future)
+                    running_pixels -= done_pixels
+                    results[done_key] = future.result()
+
+            running[executor.submit(function, *args)] = (key, pixels)
+            running_pixels += pixels
+
+        for future, (key, pixels) in running.items():
+            results[key] = future.result()
+
+    specular = None
+    if use_specular is True:
+        specular = [results[mip] for mip in range(mip_count)]
+
+    return specular, results.get('irradiance', None)
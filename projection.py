@@ -0,0 +1,195 @@
+import numpy
+from math import pi
+
+from .cubemap import CUBEMAP_FACES
+
+# The Skybox camera faces +Y, so that's the direction seen in the center of an
+# equirectangular render.  +X is to the right of it and +Z is at the top.
+EQUIRECT_CENTER_AZIMUTH = pi / 2
+
+# Roughly how many output pixels are converted at once.  Each one needs a few
+# temporary values per channel, so this bounds the memory used by large images.
+CHUNK_PIXELS = 1 << 20
+
+
+def GetChunkRows(width):
+    """
+    Returns how many rows of an image of the given width can be converted at once.
+    """
+
+    return max(1, CHUNK_PIXELS // width)
+
+
+def GetFaceBasis():
+    """
+    Returns the forward, up and right vectors of every cubemap face as arrays,
+    in the order the faces are defined.
+    """
+
+    forwards = numpy.array([forward for forward, up in CUBEMAP_FACES.values()])
+    ups = numpy.array([up for forward, up in CUBEMAP_FACES.values()])
+    rights = numpy.cross(forwards, ups)
+
+    return forwards, ups, rights
+
+
+def SampleBilinear(image, x, y, wrap_x = False, layer = None):
+    """
+    Samples an image at fractional pixel coordinates, where whole numbers are the
+    center of a pixel.  If wrap_x is True the image wraps around horizontally,
+    otherwise the edges are extended.  Layer picks the image to sample per pixel
+    when given a stack of images.
+    """
+
+    height, width = image.shape[-3:-1]
+
+    x0 = numpy.floor(x)
+    y0 = numpy.floor(y)
+    fx = (x - x0)[..., None].astype(numpy.float32)
+    fy = (y - y0)[..., None].astype(numpy.float32)
+
+    x0 = x0.astype(numpy.int64)
+    y0 = y0.astype(numpy.int64)
+    x1 = x0 + 1
+    y1 = y0 + 1
+
+    if wrap_x is True:
+        x0 %= width
+        x1 %= width
+    else:
+        x0 = numpy.clip(x0, 0, width - 1)
+        x1 = numpy.clip(x1, 0, width - 1)
+
+    y0 = numpy.clip(y0, 0, height - 1)
+    y1 = numpy.clip(y1, 0, height - 1)
+
+    if layer is not None:
+        index = lambda row, column: image[layer, row, column]
+    else:
+        index = lambda row, column: image[row, column]
+
+    top = index(y0, x0) * (1 - fx) + index(y0, x1) * fx
+    bottom = index(y1, x0) * (1 - fx) + index(y1, x1) * fx
+
+    return top * (1 - fy) + bottom * fy
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+def EquirectToDirections(rows, width, height):
+    """
+    Returns the direction seen through the center of every pixel in the given
+    rows of an equirectangular image.
+    """
+
+    u = (numpy.arange(width) + 0.5) / width
+    v = (rows + 0.5) / height
+
+    azimuth = EQUIRECT_CENTER_AZIMUTH + (0.5 - u) * 2 * pi
+    latitude = (0.5 - v) * pi
+
+    cos_latitude = numpy.cos(latitude)[:, None]
+    directions = numpy.empty((len(rows), width, 3))
+    directions[..., 0] = cos_latitude * numpy.cos(azimuth)[None, :]
+    directions[..., 1] = cos_latitude * numpy.sin(azimuth)[None, :]
+    directions[..., 2] = numpy.sin(latitude)[:, None]
+
+    return directions
+
+
+def DirectionsToEquirect(directions, width, height):
+    """
+    Returns the pixel coordinates of an equirectangular image seen in each direction.
+    """
+
+    x, y, z = directions[..., 0], directions[..., 1], directions[..., 2]
+
+    azimuth = numpy.arctan2(y, x)
+    latitude = numpy.arctan2(z, numpy.hypot(x, y))
+
+    u = 0.5 - (azimuth - EQUIRECT_CENTER_AZIMUTH) / (2 * pi)
+    v = 0.5 - latitude / pi
+
+    return u * width - 0.5, v * height - 0.5
+
+
+def FaceToDirections(face_index, rows, size):
+    """
+    Returns the direction seen through the center of every pixel in the given
+    rows of a cubemap face.
+    """
+
+    forwards, ups, rights = GetFaceBasis()
+
+    a = 2 * (numpy.arange(size) + 0.5) / size - 1
+    b = 1 - 2 * (rows + 0.5) / size
+
+    return (forwards[face_index]
+        + a[None, :, None] * rights[face_index]
+        + b[:, None, None] * ups[face_index])
+
+
+def DirectionsToCubemap(directions, size):
+    """
+    Returns the face and the pixel coordinates on that face seen in each direction.
+    """
+
+    forwards, ups, rights = GetFaceBasis()
+
+    # The face is picked by the largest axis, with faces ordered +X, -X, +Y, -Y, +Z, -Z.
+    major_axis = numpy.argmax(numpy.abs(directions), axis = -1)
+    major_value = numpy.take_along_axis(directions, major_axis[..., None], axis = -1)[..., 0]
+    face_index = major_axis * 2 + (major_value < 0)
+
+    depth = numpy.einsum('...i,...i->...', directions, forwards[face_index])
+    a = numpy.einsum('...i,...i->...', directions, rights[face_index]) / depth
+    b = numpy.einsum('...i,...i->...', directions, ups[face_index]) / depth
+
+    return face_index, (a + 1) / 2 * size - 0.5, (1 - b) / 2 * size - 0.5
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+def EquirectToCubemap(equirect, size):
+    """
+    Converts an equirectangular image to six cubemap faces of the given size.
+    """
+
+    height, width = equirect.shape[:2]
+    chunk_rows = GetChunkRows(size)
+    faces = {}
+
+    for face_index, face in enumerate(CUBEMAP_FACES):
+        pixels = numpy.empty((size, size, 4), dtype = numpy.float32)
+
+        for start in range(0, size, chunk_rows):
+            rows = numpy.arange(start, min(start + chunk_rows, size))
+            directions = FaceToDirections(face_index, rows, size)
+            x, y = DirectionsToEquirect(directions, width, height)
+            pixels[start : start + len(rows)] = SampleBilinear(equirect, x, y, wrap_x = True)
+
+        faces[face] = pixels
+
+    return faces
+
+
+def CubemapToEquirect(faces, width, height):
+    """
+    Converts six cubemap faces to an equirectangular image of the given size.
+    """
+
+    stacked = numpy.stack([faces[face] for face in CUBEMAP_FACES])
+    size = stacked.shape[1]
+    chunk_rows = GetChunkRows(width)
+
+    equirect = numpy.empty((height, width, 4), dtype = numpy.float32)
+
+    for start in range(0, height, chunk_rows):
+        rows = numpy.arange(start, min(start + chunk_rows, height))
+        directions = EquirectToDirections(rows, width, height)
+        face_index, x, y = DirectionsToCubemap(directions, size)
+        equirect[start : start + len(rows)] = SampleBilinear(stacked, x, y, layer = face_index)
+
+    return equirect
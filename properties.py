@@ -52,6 +52,108 @@ class SATELLITE_FormatSkybox(PropertyGroup):
         default=2048,
     )
 
+    projection: EnumProperty(
+        name="Projection",
+        items=
+            (
+            ('EQUIRECTANGULAR', "Equirectangular", "Render the skybox as a single panoramic image, twice as wide as it is tall"),
+            ('CUBEMAP', "Cubemap", "Render the skybox as six square faces, one for each direction.  Avoids over-sampling the top and bottom of the sky and can be rendered with Eevee"),
+            ),
+        default='EQUIRECTANGULAR',
+        description="How the skybox is projected onto the rendered image",
+    )
+
+    cubemap_layout: EnumProperty(
+        name="Cubemap Layout",
+        items=
+            (
+            ('FACES', "Faces", "Save each face to it's own file, with the direction it faces added to the Output Name (_px, _nx, _py, _ny, _pz and _nz)"),
+            ('CROSS', "Cross", "Save the faces in a single image laid out as a horizontal cross, with +Y (front) in the center"),
+            ('STRIP', "Strip", "Save the faces side by side in a single image, in the order +X, -X, +Y, -Y, +Z, -Z"),
+            ),
+        default='FACES',
+        description="How the six faces of the cubemap are saved",
+    )
+
+    convert_projection: BoolProperty(
+        name="Save Other Projection",
+        description="Also save the skybox in the projection it wasn't rendered with, converted from the render.  Equirectangular renders get cubemap faces (saved with _cubemap added to the Output Name), and cubemaps get an equirectangular image (with _equirect added)",
+        default=False,
+    )
+
+    generate_specular: BoolProperty(
+        name="Prefiltered Specular",
+        description="Also save a chain of cubemaps blurred for increasing GGX roughness, used by game engines for reflections.  Each mip is saved with _specular_ and it's number added to the Output Name, using the Cubemap Layout",
+        default=False,
+    )
+
+    generate_irradiance: BoolProperty(
+        name="Irradiance Map",
+        description="Also save a small cubemap of the diffuse light arriving from every direction, used by game engines for ambient lighting.  Saved with _irradiance added to the Output Name, using the Cubemap Layout",
+        default=False,
+    )
+
+    generate_harmonics: BoolProperty(
+        name="Spherical Harmonics",
+        description="Also save the L2 spherical harmonic coefficients of the skybox, used by game engines for cheap ambient lighting.  Saved with _sh added to the Output Name",
+        default=False,
+    )
+
+    harmonics_format: EnumProperty(
+        name="Harmonics Format",
+        items=
+            (
+            ('JSON', "JSON", "Save the nine RGB coefficients in a .json file"),
+            ('BINARY', "Binary", "Save the nine RGB coefficients as 27 little-endian 32-bit floats in a .bin file"),
+            ),
+        default='JSON',
+        description="The file format the spherical harmonic coefficients are saved in",
+    )
+
+    specular_resolution: IntProperty(
+        name="Specular Resolution",
+        description="The face resolution of the first (sharpest) specular mip.  Each mip after it is half the size of the last",
+        subtype = 'PIXEL',
+        min=4,
+        max=4096,
+        default=256,
+    )
+
+    specular_mip_count: IntProperty(
+        name="Specular Mips",
+        description="The number of mips in the specular chain, with roughness rising evenly from 0 at the first mip to 1 at the last",
+        min=1,
+        max=12,
+        default=6,
+    )
+
+    irradiance_resolution: IntProperty(
+        name="Irradiance Resolution",
+        description="The face resolution of the irradiance map.  Diffuse light changes slowly so this can be very small",
+        subtype = 'PIXEL',
+        min=1,
+        max=512,
+        default=32,
+    )
+
+    lighting_samples: IntProperty(
+        name="Lighting Samples",
+        description="The number of samples used for each pixel of the specular mips and irradiance map.  More samples reduce noise but take longer to generate",
+        min=1,
+        soft_max=1024,
+        max=16384,
+        default=64,
+    )
+
+    face_resolution: IntProperty(
+        name="Face Resolution",
+        description="Controls the width and height of each cubemap face.  A face a quarter of the equirectangular Max Resolution has roughly the same detail at the horizon",
+        subtype = 'PIXEL',
+        min=4,
+        max=16384,
+        default=512,
+    )
+
     samples: IntProperty(
         name="Render Samples",
         description="Sets the amount of samples to be used when rendering the HDRI.",
@@ -95,6 +197,82 @@ def UPDATE_ColorModeFull(self, context):
     
 
 
+class SATELLITE_OutputVariant(PropertyGroup):
+    # An extra image saved from a Direct Camera render, in another format or size.
+
+    suffix: StringProperty(
+        name = "Suffix",
+        description = "Added to the end of the Output Name to give this variant it's own file name",
+        default = "_variant",
+    )
+
+    file_format: EnumProperty(
+        name = "File Format",
+        items =
+            (
+            ('PNG', "PNG", "Export using the PNG format"),
+            ('JPEG', "JPEG", "Export using the JPEG format"),
+            ('TARGA', "TARGA", "Export using the Targa format"),
+            ('TARGA_RAW', "TARGA Raw", "Export using the Targa Raw format"),
+            ('HDR', "Radiance HDR", "Export using the Radiance HDR format"),
+            ('OPEN_EXR', "OpenEXR", "Export using the OpenEXR format"),
+            ),
+        default = 'PNG',
+        description = "The file type to save this variant as",
+    )
+
+    color_depth: EnumProperty(
+        name = "Color Depth",
+        items =
+            (
+            ('8', "8", "8-bit color channels"),
+            ('16', "16", "16-bit color channels (half float for OpenEXR)"),
+            ('32', "32", "32-bit float color channels (OpenEXR only)"),
+            ),
+        default = '8',
+        description = "The bit depth per channel.  WARNING - Not all file formats support all color depth options, unsupported ones are ignored",
+    )
+
+    color_mode: EnumProperty(
+        name = "Color Mode",
+        items =
+            (
+            ('BW', "BW", "Images get saved in grayscale"),
+            ('RGB', "RGB", "Images are saved with RGB (color) data"),
+            ('RGBA', "RGBA", "Images are saved with RGB and Alpha data"),
+            ),
+        default = 'RGB',
+        description = "Choose BW for saving grayscale images, RGB for saving red, green and blue channels, and RGBA for saving red, green, blue and alpha channels.  WARNING - Not all file formats support all color modes",
+    )
+
+    compression: IntProperty(
+        name = "Compression",
+        description = "The amount of time taken for Blender to determine the best compression for the file.  0 will result in no compression with a fast file output time and 100 will result in the maximum lossless compression with the slowest output time",
+        default = 15,
+        min = 0,
+        max = 100,
+        subtype = 'PERCENTAGE',
+    )
+
+    quality: IntProperty(
+        name = "Quality",
+        description = "Quality for image formats that support lossy compression",
+        default = 90,
+        min = 0,
+        max = 100,
+        subtype = 'PERCENTAGE',
+    )
+
+    scale: FloatProperty(
+        name = "Scale",
+        description = "The size of this variant compared to the render.  Smaller variants are shrunk from the render rather than rendered again",
+        default = 1.0,
+        min = 0.01,
+        max = 1.0,
+        subtype = 'FACTOR',
+    )
+
+
 class SATELLITE_FormatCamera(PropertyGroup):
     # Used to define settings for a Direct Camera render.
 
@@ -125,6 +303,23 @@ class SATELLITE_FormatCamera(PropertyGroup):
         description = "If defined, any object included in the render will have their material replaced with the one defined here.  This is commonly used in conjunction with the camera to create world-space maps for use in shaders"
     )
 
+    use_isolated_scene: BoolProperty(
+        name = "Render in Separate Scene",
+        description = "Renders the camera in a scene of it's own that only has the objects that will be rendered linked into it, so the real scene doesn't have to be changed and put back.  Can be much faster for large scenes",
+        default = False,
+    )
+
+    replacement_method: EnumProperty(
+        name = "Replace Using",
+        items =
+            (
+            ('OBJECT', "Object Slots", "Replaces the material in every material slot of every object rendered, then puts them back afterwards.  This can take a long time in scenes with lots of objects, and objects linked from other files keep their materials"),
+            ('OVERRIDE', "Material Override", "Uses the View Layer's Material Override to replace every material at once, only replacing Geometry Nodes material inputs object by object.  This is much faster in scenes with lots of objects, and also replaces the materials of objects linked from other files"),
+            ),
+        default = 'OBJECT',
+        description = "How the Replacement Material is given to every object in the render",
+    )
+
     render_engine: EnumProperty(
         name="Render Engine",
         items=
@@ -255,6 +450,14 @@ class SATELLITE_FormatCamera(PropertyGroup):
 
     
 
+    output_variants: CollectionProperty(
+        type = SATELLITE_OutputVariant,
+        name = "Output Variants",
+        description = "Extra images saved from the same render in other formats and sizes",
+    )
+
+    output_variants_index: IntProperty(default = 0)
+
     #TODO: Include additional settings.
 
 
@@ -313,6 +516,21 @@ class SATELLITE_Preset(PropertyGroup):
 
     # Below is additional preferences that are shared between render types
 
+    use_tiling: BoolProperty(
+        name = "Render in Tiles",
+        description = "Renders large images a tile at a time and puts them together afterwards, so the full image never has to fit in memory.  Tiles can be rendered by separate workers.  Cubemaps are always rendered a face at a time instead",
+        default = False,
+    )
+
+    tile_size: IntProperty(
+        name = "Tile Size",
+        description = "The largest width and height of a single tile.  Images that fit in a single tile are rendered normally",
+        subtype = 'PIXEL',
+        default = 4096,
+        min = 256,
+        max = 16384,
+    )
+
     color_view_transform: EnumProperty(
         name="View Transform",
         items=
@@ -378,6 +596,69 @@ class SATELLITE_SceneData(PropertyGroup):
     ## The index of the currently selected collection from the UI list.  Will be -1 if not selected.
     sat_selected_list_index: IntProperty(default=0)
 
+    optimize_order: BoolProperty(
+        name = "Optimize Render Order",
+        description = "Renders active Satellites that share a Render Engine, View Layer and materials one after another to avoid switching between them, instead of following the list order.  The images rendered will be the same",
+        default = False,
+    )
+
+    skip_unchanged: BoolProperty(
+        name = "Skip Unchanged",
+        description = "Skips rendering any Satellite whose settings, World, Camera, visible objects and materials haven't changed since it was last rendered.  A small .satellite.json file is saved next to each render to keep track of this",
+        default = False,
+    )
+
+    encode_in_background: BoolProperty(
+        name = "Compress in Background",
+        description = "Saves compressed PNG renders quickly without compression and compresses them on a background thread while the next Satellite renders.  Everything is finished saving before the batch ends.  The compressed images don't keep Blender's metadata, like stamps and DPI",
+        default = False,
+    )
+
+    timings_path: StringProperty(
+        name = "Timings Report",
+        description = "A JSON file that how long each phase of every Satellite took is saved to whenever a batch finishes rendering, along with how many objects and materials were changed.  Leave empty to not save one",
+        default = "",
+        subtype = 'FILE_PATH',
+    )
+
+    print_timings: BoolProperty(
+        name = "Print Timings",
+        description = "Prints how long each phase of every Satellite took to the console as a table whenever a batch finishes rendering",
+        default = False,
+    )
+
+    farm_workers: IntProperty(
+        name = "Workers",
+        description = "The number of background Blender processes used by Render All Active (Workers).  The CPU threads available are split evenly between them",
+        default = 4,
+        min = 1,
+        soft_max = 32,
+    )
+
+    farm_retries: IntProperty(
+        name = "Worker Retries",
+        description = "How many times a Satellite will be given to a new worker if the worker rendering it crashes",
+        default = 1,
+        min = 0,
+        soft_max = 5,
+    )
+
+    watch_mode: BoolProperty(
+        name = "Watch Mode",
+        description = "Whenever the file is saved, renders any active Satellite that has changed since it was last rendered",
+        default = False,
+    )
+
+    watch_delay: FloatProperty(
+        name = "Watch Delay",
+        description = "How long to wait after saving before Watch Mode starts rendering.  Saving again before then restarts the wait",
+        subtype = 'TIME',
+        unit = 'TIME',
+        default = 2.0,
+        min = 0.0,
+        soft_max = 30.0,
+    )
+
     # the menu toggle for Skybox render Presets, tabs didnt work out so this is muted for now
     # skybox_ui_options: EnumProperty(
     #     name = "Skybox Render Options",
@@ -4,156 +4,806 @@ from bpy.types import Operator
 from bpy.props import IntProperty, FloatProperty, StringProperty, BoolProperty
 
 import os
+import traceback
 from math import radians
 from mathutils import Vector
 
-# TODO: The save/restore script could probably be done using flexible RNA searches.
+from .scheduler import ScheduleSatellites, PrintSchedule
+from .cache import (
+    ComputeSatelliteFingerprint,
+    IsRenderCached,
+    WriteRenderFingerprint,
+    ClearRenderFingerprint,
+    GetOutputFilepath,
+    GetUserVisibleObjects,
+    RIG_PROPERTY,
+)
+from .dirty import SuspendTracking, ResumeTracking, MarkSatellitesRendered
+from .node_inputs import GetModifierMaterialInputs
+from .cubemap import (
+    CUBEMAP_FACES,
+    GetFaceRotation,
+    GetFaceDestination,
+    GetCubemapOutputFiles,
+    SetupCubemapCamera,
+    AssembleCubemap,
+)
+from .postprocess import GetSkyboxStageOutputFiles, RunSkyboxStages
+from .tiling import (
+    GetTileParts,
+    IsTilePart,
+    GetTileBorder,
+    GetTileDestination,
+    AssembleTiles,
+)
+from .imaging import LoadImagePixels
+from .encoder import CreateEncodeQueue, QueueImageEncode, WaitForPathEncodes, FinishEncodeQueue
+from .timings import (
+    CreateBatchTimings,
+    BeginSatelliteTimings,
+    EndSatelliteTimings,
+    TimePhase,
+    CountChanges,
+    CreateTimingsReport,
+    WriteTimingsReport,
+    FormatTimingsTable,
+)
+from .variants import (
+    MASTER_SUFFIX,
+    MASTER_FORMAT,
+    GetMasterDestination,
+    GetVariantDestination,
+    SaveOutputVariants,
+)
+
+# Every render setting Satellite may change, found by it's RNA path from the scene.
+# NOTE: This will only save settings that Satellite may need to change, not every
+# possible rendering feature.  Image settings are ordered so the file format is
+# always written before the color settings that depend on it.
+RENDER_SETTING_PATHS = (
+    # CYCLES SETTINGS (the API page is missing, do your best, avoid preview settings)
+    'cycles.device',
+    'cycles.feature_set',
+    'cycles.adaptive_threshold',
+    'cycles.samples',
+    'cycles.adaptive_min_samples',
+    'cycles.use_denoising',
+
+    # EEVEE SETTINGS
+    'eevee.taa_render_samples',
+    'eevee.use_gtao',
+    'eevee.use_bloom',
+    'eevee.use_ssr',
+    'eevee.use_motion_blur',
 
-def SaveRenderSettings(self, context):
+    # RENDER SETTINGS
+    'render.engine',
+    'render.resolution_x',
+    'render.resolution_y',
+    'render.resolution_percentage',
+    'render.pixel_aspect_x',
+    'render.pixel_aspect_y',
+    'render.use_border',
+    'render.use_crop_to_border',
+    'render.border_min_x',
+    'render.border_max_x',
+    'render.border_min_y',
+    'render.border_max_y',
+
+    'render.use_multiview',
+    'render.use_file_extension',
+    'render.use_render_cache',
+    'render.use_overwrite',
+
+    'render.image_settings.file_format',
+    'render.image_settings.color_mode',
+    'render.image_settings.compression',
+    'render.image_settings.quality',
+    'render.image_settings.color_depth',
+
+    'render.use_compositing',
+    'render.use_sequencer',
+    'render.use_single_layer',
+    'render.filepath',
+
+    # COLOR SETTINGS
+    'view_settings.view_transform',
+    'view_settings.look',
+    'view_settings.exposure',
+    'view_settings.gamma',
+)
+
+
+def SaveRenderSettings(self, context, scene = None):
     """
-    Saves all relevant render settings before attempting to render with Satellite.
-    NOTE: This will only save settings that Satellite may need to change, not every
-    possible rendering feature.
+    Saves all relevant render settings before attempting to render with Satellite, 
+    keyed by their RNA path from the scene.
     """
 
+    if scene is None:
+        scene = context.scene
+
     saved_render_settings = {}
-    cycles_settings = {}
-    eevee_settings = {}
-    render_settings = {}
-    color_settings = {}
+
+    for path in RENDER_SETTING_PATHS:
+        owner_path, attribute = path.rsplit('.', 1)
+        owner = scene.path_resolve(owner_path)
+        saved_render_settings[path] = getattr(owner, attribute)
+
+    return saved_render_settings
+
+
+def ApplyRenderSettings(self, context, settings, scene = None):
+    """
+    Writes render settings to the scene, skipping any that already have the value
+    needed.  Every write can force Blender to re-sync or recompile shaders, so 
+    only changes are made.  Returns the number of settings written.
+    """
+
+    if scene is None:
+        scene = context.scene
+
+    written = 0
+
+    for path, value in settings.items():
+        owner_path, attribute = path.rsplit('.', 1)
+        owner = scene.path_resolve(owner_path)
+
+        if getattr(owner, attribute) == value:
+            continue
+
+        # Some image settings are only valid for certain file formats, in which case
+        # Blender will have already picked one that's valid for the current format.
+        try:
+            setattr(owner, attribute, value)
+        except TypeError:
+            continue
+
+        written += 1
+
+    return written
+
+
+def RestoreRenderSettings(self, context, saved_render_settings, scene = None):
+    """
+    Restores all previously saved render settings, returning the number of settings written.
+    """
+
+    return ApplyRenderSettings(self, context, saved_render_settings, scene)
+
+
+def GetSatelliteResolution(satellite):
+    """
+    Returns the width and height of the image a Satellite is rendered to.  For
+    cubemaps this is the size of a single face.
+    """
+
+    if satellite.render_type == 'Skybox':
+        render_options = satellite.data_skybox
+
+        if render_options.projection == 'CUBEMAP':
+            return int(render_options.face_resolution), int(render_options.face_resolution)
+
+        return int(render_options.resolution), int(render_options.resolution / 2)
+
+    render_options = satellite.data_camera
+    return int(render_options.resolution_x), int(render_options.resolution_y)
+
+
+def GetSatelliteImageFormat(satellite):
+    """
+    Returns the image format a Satellite is saved with, matching Blender's ImageFormatSettings.
+    """
+
+    image_format = {}
+
+    if satellite.render_type == 'Skybox':
+        image_format['file_format'] = 'HDR'
+        image_format['color_mode'] = satellite.data_skybox.color_mode
+
+    else:
+        render_options = satellite.data_camera
+        image_format['file_format'] = render_options.file_format
+        image_format['color_depth'] = render_options.color_depth
+        image_format['color_mode'] = render_options.color_mode
+        image_format['quality'] = render_options.quality
+        image_format['compression'] = render_options.compression
+
+    return image_format
+
+
+def GetSatelliteViewSettings(satellite):
+    """
+    Returns the color management a Satellite is rendered with, matching Blender's ColorManagedViewSettings.
+    """
+
+    view_settings = {}
+    view_settings['view_transform'] = satellite.color_view_transform
+    view_settings['look'] = satellite.color_look
+    view_settings['exposure'] = satellite.color_exposure
+    view_settings['gamma'] = satellite.color_gamma
+
+    return view_settings
+
+
+def HasOutputVariants(satellite):
+    return satellite.render_type == 'Direct Camera' and len(satellite.data_camera.output_variants) > 0
+
+
+def GetSatelliteRenderOutput(satellite, destination):
+    """
+    Returns where a Satellite's render is saved and the format it's saved in.  This
+    is the master image when the Satellite has output variants to make from it.
+    """
+
+    if HasOutputVariants(satellite) is True:
+        return GetMasterDestination(destination), MASTER_FORMAT
+
+    return destination, GetSatelliteImageFormat(satellite)
+
+
+def CanEncodeInBackground(satellite):
+    """
+    Returns True if a Satellite's image can be quickly saved uncompressed when it's
+    rendered and compressed on a background thread afterwards.  Only PNG images
+    spend long enough compressing to be worth it.
+    """
+
+    if satellite.render_type != 'Direct Camera' or HasOutputVariants(satellite) is True:
+        return False
+
+    if IsSatelliteTiled(satellite) is True:
+        return False
+
+    render_options = satellite.data_camera
+    return render_options.file_format == 'PNG' and render_options.compression > 0
+
+
+def IsSatelliteTiled(satellite):
+    """
+    Returns True if a Satellite is rendered in tiles that are put together afterwards.
+    """
+
+    if satellite.use_tiling is False:
+        return False
+
+    if satellite.render_type == 'Skybox' and satellite.data_skybox.projection == 'CUBEMAP':
+        return False
+
+    width, height = GetSatelliteResolution(satellite)
+    return width > satellite.tile_size or height > satellite.tile_size
+
+
+def GetTileImageFormat(image_format):
+    """
+    Returns the format tiles are rendered in before being put together.  Lossy
+    formats would be compressed twice, so those tiles are saved as PNG instead.
+    """
+
+    if image_format['file_format'] != 'JPEG':
+        return image_format
+
+    tile_format = dict(image_format)
+    tile_format['file_format'] = 'PNG'
+    tile_format['color_depth'] = '8'
+    tile_format['compression'] = 0
+    return tile_format
+
+
+def GetSatelliteRenderSettings(self, context, satellite, destination):
+    """
+    Returns the render settings a Satellite needs, keyed by their RNA path from the scene.
+    Anything not included should be left as the user had it.
+    """
+
+    settings = {}
+
+    # COLOR SETTINGS
+    # this is shared between render modes so it can be done here
+    for key, value in GetSatelliteViewSettings(satellite).items():
+        settings['view_settings.' + key] = value
+
+    # OUTPUT
+    if satellite.render_type == 'Skybox':
+        render_options = satellite.data_skybox
+        settings['render.use_compositing'] = False
+        settings['render.use_sequencer'] = False
+
+    elif satellite.render_type == 'Direct Camera':
+        render_options = satellite.data_camera
+
+    width, height = GetSatelliteResolution(satellite)
+    settings['render.resolution_x'] = width
+    settings['render.resolution_y'] = height
+
+    render_destination, image_format = GetSatelliteRenderOutput(satellite, destination)
+    if IsSatelliteTiled(satellite) is True:
+        image_format = GetTileImageFormat(image_format)
+
+    for key, value in image_format.items():
+        settings['render.image_settings.' + key] = value
+
+    # ensure some render settings are at their defaults
+    settings['render.resolution_percentage'] = 100
+    settings['render.pixel_aspect_x'] = 1.0
+    settings['render.pixel_aspect_y'] = 1.0
+    settings['render.use_border'] = False
+    settings['render.use_crop_to_border'] = False
+
+    settings['render.use_multiview'] = False
+    settings['render.use_file_extension'] = True
+    settings['render.use_render_cache'] = False
+    settings['render.use_overwrite'] = True
+
+    # RENDER ENGINE
+    if render_options.render_engine == 'Cycles':
+        settings['render.engine'] = 'CYCLES'
+        settings['cycles.samples'] = render_options.samples
+        settings['cycles.use_denoising'] = render_options.cycles_use_denoiser
     
+    elif render_options.render_engine == 'Eevee':
+        settings['render.engine'] = 'BLENDER_EEVEE'
+        settings['eevee.taa_render_samples'] = render_options.samples
 
-    # CYCLES SETTINGS (the API page is missing, do your best, avoid preview settings)
-    cycles = context.scene.cycles
-    cycles_settings['device'] = cycles.device
-    cycles_settings['feature_set'] = cycles.feature_set
-
-    cycles_settings['adaptive_threshold'] = cycles.adaptive_threshold
-    cycles_settings['samples'] = cycles.samples
-    cycles_settings['adaptive_min_samples'] = cycles.adaptive_min_samples
-    cycles_settings['use_denoising'] = cycles.use_denoising
+        if render_options.eevee_disable_pp is True:
+            settings['eevee.use_gtao'] = False
+            settings['eevee.use_bloom'] = False
+            settings['eevee.use_ssr'] = False
+            settings['eevee.use_motion_blur'] = False
     
+    settings['render.filepath'] = render_destination
+    settings['render.use_single_layer'] = True
 
-    # EEVEE SETTINGS
-    eevee = context.scene.eevee
-    eevee_settings["taa_render_samples"] = eevee.taa_render_samples
-    eevee_settings["use_gtao"] = eevee.use_gtao
-    eevee_settings["use_bloom"] = eevee.use_bloom
-    eevee_settings["use_ssr"] = eevee.use_ssr
-    eevee_settings["use_motion_blur"] = eevee.use_motion_blur
+    return settings
 
-    # RENDER SETTINGS
-    render = context.scene.render
-    render_settings['engine'] = render.engine
-    render_settings['resolution_x'] = render.resolution_x
-    render_settings['resolution_y'] = render.resolution_y
-    render_settings['resolution_percentage'] = render.resolution_percentage
-    render_settings['pixel_aspect_x'] = render.pixel_aspect_x
-    render_settings['pixel_aspect_y'] = render.pixel_aspect_y
-    render_settings['use_border'] = render.use_border
-
-    render_settings['use_multiview'] = render.use_multiview
-    render_settings['use_file_extension'] = render.use_file_extension
-    render_settings['use_render_cache'] = render.use_render_cache
-    render_settings['use_overwrite'] = render.use_overwrite
-
-    render_settings['file_format'] = render.image_settings.file_format
-    render_settings['color_mode'] = render.image_settings.color_mode
-    render_settings['compression'] = render.image_settings.compression
-    render_settings['quality'] = render.image_settings.quality
-    render_settings['color_depth'] = render.image_settings.color_depth
-
-    render_settings['use_compositing'] = render.use_compositing
-    render_settings['use_sequencer'] = render.use_sequencer
 
-    # COLOR SETTINGS
-    color = context.scene.view_settings
-    color_settings['view_transform'] = color.view_transform
-    color_settings['look'] = color.look
-    color_settings['exposure'] = color.exposure
-    color_settings['gamma'] = color.gamma
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+def UpdateEditModeObjects(self, context):
+    """
+    Writes the changes made to objects still in edit mode back to their data, so
+    they can be fingerprinted and rendered without leaving edit mode.
+    """
+
+    objects = getattr(context, 'objects_in_mode', None)
+    if objects is None:
+        objects = [obj for obj in context.scene.objects if obj.mode == 'EDIT']
+
+    for obj in objects:
+        if obj.mode == 'EDIT':
+            obj.update_from_editmode()
+
+
+def BeginRenderBatch(self, context, output_root = None, use_cache = False, force = False,
+        timings_path = None):
+    """
+    Starts a batch of Satellite renders, saving the render settings once so they 
+    only need to be restored once the whole batch has finished.
+
+    If use_cache is True, Satellites whose last render was made with the same
+    settings and scene contents are skipped, unless force is True.  If a timings
+    path is given, how long every part of the batch took is saved there once it ends.
+    """
+
+    batch = {}
+    batch['timings'] = CreateBatchTimings()
+    batch['timings_path'] = timings_path
+    batch['scene'] = context.scene
+    batch['output_root'] = output_root
+    batch['use_cache'] = use_cache
+    batch['force'] = force
+
+    with TimePhase(batch['timings'], 'save_settings'):
+        batch['saved_render_settings'] = SaveRenderSettings(self, context)
+    batch['settings_written'] = 0
+
+    # Nothing Satellite does needs a mode or selection, so the user's are kept as they are.
+    with TimePhase(batch['timings'], 'scene_sync'):
+        UpdateEditModeObjects(self, context)
+
+    # Satellites that rendered (or were cached), marked as clean once the batch ends.
+    batch['rendered'] = []
+
+    # Set while the scene is put back between Satellites, see PauseRenderBatch.
+    batch['paused'] = False
+
+    # The render visibility each View Layer needs, along with whatever was changed
+    # to apply them.  No View Layer's visibility is applied to begin with.
+    batch['visibility_plans'] = {}
+    batch['visibility_layer'] = None
+    batch['saved_object_hide'] = {}
+    batch['saved_collection_hide'] = {}
+    batch['visibility_written'] = 0
+
+    # The camera and View Layer Skyboxes render with, made the first time they're needed.
+    batch['rig'] = None
+
+    # Images waiting to be compressed while the next Satellite renders.
+    batch['encode_queue'] = None
+    if context.scene.SATL_SceneData.encode_in_background is True:
+        batch['encode_queue'] = CreateEncodeQueue()
+
+    # Our own changes to the scene shouldn't mark Satellites as dirty.
+    SuspendTracking()
+
+    return batch
+
+
+def GetBatchRenderSettings(self, context, satellite, batch, destination):
+    """
+    Returns every render setting a Satellite will be rendered with in this batch.
+    """
+
+    # Anything the Satellite doesn't set should be as the user had it.
+    settings = dict(batch['saved_render_settings'])
+    settings.update(GetSatelliteRenderSettings(self, context, satellite, destination))
 
+    # The image is compressed later, so Blender only has to save it as fast as it can.
+    if batch['encode_queue'] is not None and CanEncodeInBackground(satellite) is True:
+        settings['render.image_settings.compression'] = 0
 
-    saved_render_settings['cycles'] = cycles_settings
-    saved_render_settings['eevee'] = eevee_settings
-    saved_render_settings['render'] = render_settings
-    saved_render_settings['color'] = color_settings
+    return settings
+
+
+def ApplySatelliteRenderSettings(self, context, satellite, batch, destination, scene = None):
+    """
+    Moves the render settings from whatever the last Satellite used to what this 
+    Satellite needs, only writing the settings that differ between them.
+    """
+
+    if scene is None:
+        scene = batch['scene']
+
+    with TimePhase(batch['timings'], 'save_settings'):
+        settings = GetBatchRenderSettings(self, context, satellite, batch, destination)
+        written = ApplyRenderSettings(self, context, settings, scene)
     
+    batch['settings_written'] += written
+    CountChanges(batch['timings'], 'settings_written', written)
 
-    return saved_render_settings
+
+def CheckSatelliteCache(self, context, satellite, batch):
+    """
+    Fingerprints a Satellite if the batch is using the render cache, returning
+    the fingerprint (or None) and a report if the previous render can be reused.
+    """
+
+    if batch['use_cache'] is False:
+        return None, None
+
+    with TimePhase(batch['timings'], 'verify'):
+        return FingerprintSatellite(self, context, satellite, batch)
+
+
+def FingerprintSatellite(self, context, satellite, batch):
+    """
+    Fingerprints a Satellite, returning the fingerprint and a report if the previous
+    render can be reused.
+    """
+
+    # Render visibility is part of the fingerprint, so it has to be what the Satellite renders with.
+    if IsIsolatedSatellite(satellite) is True:
+        ApplyIsolatedVisibility(self, context, batch, satellite)
+    else:
+        ApplyBatchVisibility(self, context, batch, GetSatelliteViewLayer(self, context, satellite))
+
+    destination = GetSatelliteDestination(satellite, batch['output_root'])
+    settings = GetBatchRenderSettings(self, context, satellite, batch, destination)
+    fingerprint = ComputeSatelliteFingerprint(self, context, satellite, settings)
+    filepaths = GetSatelliteOutputFiles(satellite, destination)
+
+    # The render about to be made can't be described by the last fingerprint saved.
+    if fingerprint is None:
+        ClearRenderFingerprint(destination)
+        return None, None
+
+    if batch['force'] is True or IsRenderCached(destination, filepaths, fingerprint) is False:
+        return fingerprint, None
+    
+    report = {}
+    report['status'] = 'CACHED'
+    report['destination'] = destination
+    report['filepath'] = filepaths[0]
+    return fingerprint, report
+
+
+def EndRenderBatch(self, context, batch):
+    """
+    Restores the render settings saved when the batch began, then reports how
+    long the batch took.
+    """
+
+    timings = batch['timings']
+    ResumeRenderBatch(self, context, batch)
+
+    try:
+        with TimePhase(timings, 'write'):
+            if batch['encode_queue'] is not None:
+                for filepath, error in FinishEncodeQueue(batch['encode_queue']):
+                    print("SATELLITE - Couldn't compress " + filepath + ", it was left uncompressed - " + str(error))
+
+        with TimePhase(timings, 'restore'):
+            RemoveBatchRig(self, context, batch)
+            RestoreBatchScene(self, context, batch)
+
+    finally:
+        ResumeTracking()
+
+    ReportBatchTimings(self, context, batch)
+
+
+def RestoreBatchScene(self, context, batch):
+    """
+    Puts back the render settings and render visibility changed by the batch so far,
+    and marks the Satellites rendered since then as clean.
+    """
+
+    written = RestoreRenderSettings(self, context, batch['saved_render_settings'], batch['scene'])
+    batch['settings_written'] += written
+    CountChanges(batch['timings'], 'settings_written', written)
+
+    ApplyBatchVisibility(self, context, batch, None)
+
+    # Flush the updates our changes caused while tracking is still suspended.
+    GetWindowViewLayer(context).update()
+    MarkSatellitesRendered(self, context, batch['rendered'])
+    batch['rendered'] = []
+
+
+def PauseRenderBatch(self, context, batch):
+    """
+    Puts the scene back the way the user had it between two Satellites, for batches
+    that let the user keep working while they render.  Anything the user changes
+    while it's paused is kept, as the render settings are saved again and the 
+    visibility each View Layer needs is worked out again once it resumes.
+    """
+
+    if batch['paused'] is True:
+        return
+
+    with TimePhase(batch['timings'], 'restore'):
+        RestoreBatchScene(self, context, batch)
+
+    batch['visibility_plans'] = {}
+    batch['saved_object_hide'] = {}
+    batch['saved_collection_hide'] = {}
+    batch['paused'] = True
+
+    ResumeTracking()
+
+
+def ResumeRenderBatch(self, context, batch):
+    """
+    Saves the render settings again after a batch was paused, before the next Satellite renders.
+    """
+
+    if batch['paused'] is False:
+        return
+
+    SuspendTracking()
+    batch['paused'] = False
+
+    with TimePhase(batch['timings'], 'save_settings'):
+        batch['saved_render_settings'] = SaveRenderSettings(self, context, batch['scene'])
+
+    with TimePhase(batch['timings'], 'scene_sync'):
+        UpdateEditModeObjects(self, context)
+
+
+def ReportBatchTimings(self, context, batch):
+    """
+    Saves how long every part of a batch took if a timings path was given, and prints 
+    it as a table if the scene asks for it.  Failing to save it doesn't fail the
+    batch, as the renders themselves are fine.
+    """
+
+    report = CreateTimingsReport(batch['timings'], batch['scene'])
+
+    if batch['timings_path'] is not None:
+        try:
+            WriteTimingsReport(batch['timings_path'], report)
+        except OSError as error:
+            print("SATELLITE - Couldn't save the timings report - " + str(error))
+
+    if batch['scene'].SATL_SceneData.print_timings is True:
+        print(FormatTimingsTable(report))
 
 
 # /////////////////////////////////////////////////////////////////////////
 # /////////////////////////////////////////////////////////////////////////
 
+def GetBatchRig(self, context, batch):
+    """
+    Returns the camera Skyboxes are rendered with, creating it the first time it's
+    needed in a batch.  It's kept until the batch ends so every Skybox can reuse it
+    rather than rebuilding the scene each time.
+    """
+
+    if batch['rig'] is None:
+        # This is built from datablocks rather than camera_add as there may be 
+        # no 3D View (or any window) to add it from.
+        camera_data = bpy.data.cameras.new(name = "Satellite Camera")
+        camera = bpy.data.objects.new(name = "Satellite Camera", object_data = camera_data)
+        camera[RIG_PROPERTY] = True
+        camera.location = Vector((0.0, 0.0, 0.0))
+        camera.hide_select = True
 
-def RestoreRenderSettings(self, context, saved_render_settings):
+        rig = {}
+        rig['camera'] = camera
+        rig['camera_data'] = camera_data
+        rig['scene'] = None
+        rig['linked'] = {}
+        batch['rig'] = rig
+
+    return batch['rig']
+
+
+def GetRigScene(self, context, batch):
+    """
+    Returns an empty scene for Skyboxes that only render the world, so Blender 
+    doesn't have to sync everything in the real scene to render them.  It's a copy
+    of the real scene with everything in it removed, so it keeps the render settings
+    Satellite doesn't change (like the Cycles device).  It's created the first 
+    time it's needed in a batch.
+    """
+
+    rig = GetBatchRig(self, context, batch)
+
+    if rig['scene'] is None:
+        scene = batch['scene'].copy()
+        scene.name = "Satellite Render"
+        scene.background_set = None
+
+        for child in list(scene.collection.children):
+            scene.collection.children.unlink(child)
+        for obj in list(scene.collection.objects):
+            scene.collection.objects.unlink(obj)
+
+        for view_layer in list(scene.view_layers)[1:]:
+            scene.view_layers.remove(view_layer)
+
+        rig['scene'] = scene
+
+    return rig['scene']
+
+
+def SyncRigObjects(self, context, batch, objects):
     """
-    Restores all previously saved render settings.
+    Links the given objects into the empty render scene, unlinking whatever the
+    last Satellite needed that this one doesn't.  Objects needed by both stay as
+    they are, so Satellites rendering the same things cost nothing extra.
     """
 
-    cycles_settings = saved_render_settings['cycles']
-    eevee_settings = saved_render_settings['eevee']
-    render_settings = saved_render_settings['render']
-    color_settings = saved_render_settings['color']
+    rig = GetBatchRig(self, context, batch)
+    scene = GetRigScene(self, context, batch)
+    linked = rig['linked']
+    wanted = {obj.as_pointer(): obj for obj in objects}
+
+    changed = 0
+
+    for key, obj in list(linked.items()):
+        if key not in wanted:
+            scene.collection.objects.unlink(obj)
+            del linked[key]
+            changed += 1
+    
+    for key, obj in wanted.items():
+        if key not in linked:
+            scene.collection.objects.link(obj)
+            linked[key] = obj
+            changed += 1
     
+    CountChanges(batch['timings'], 'objects_touched', changed)
 
-    # CYCLES SETTINGS (the API page is missing, do your best, avoid preview settings)
-    cycles = context.scene.cycles
-    cycles.device = cycles_settings["device"]
-    cycles.feature_set = cycles_settings["feature_set"]
-
-    cycles.adaptive_threshold = cycles_settings["adaptive_threshold"]
-    cycles.samples = cycles_settings["samples"]
-    cycles.adaptive_min_samples = cycles_settings["adaptive_min_samples"]
-    cycles.use_denoising = cycles_settings["use_denoising"]
+
+def IsIsolatedSatellite(satellite):
+    """
+    Returns True if a Satellite is a Direct Camera rendered in a scene of it's own.
+    """
+
+    return satellite.render_type == 'Direct Camera' and satellite.data_camera.use_isolated_scene is True
+
+
+def IsWorldOnlySkybox(satellite):
+    """
+    Returns True if a Satellite is a Skybox that only renders the world.
+    """
+
+    return satellite.render_type == 'Skybox' and satellite.data_skybox.view_layer == ""
+
+
+def RemoveBatchRig(self, context, batch):
+    rig = batch['rig']
+    if rig is None:
+        return
+
+    bpy.data.objects.remove(rig['camera'], do_unlink = True)
+    bpy.data.cameras.remove(rig['camera_data'])
+
+    if rig['scene'] is not None:
+        bpy.data.scenes.remove(rig['scene'])
+
+    batch['rig'] = None
+
+
+def GetWindowViewLayer(context):
+    """
+    Returns the View Layer currently being worked in.  When Blender is running
+    in the background there is no window, so the context View Layer is used.
+    """
+
+    if context.window is not None:
+        return context.window.view_layer
     
+    return context.view_layer
 
-    # EEVEE SETTINGS
-    eevee = context.scene.eevee
-    eevee.taa_render_samples = eevee_settings["taa_render_samples"]
-    eevee.use_gtao = eevee_settings["use_gtao"]
-    eevee.use_bloom = eevee_settings["use_bloom"]
-    eevee.use_ssr = eevee_settings["use_ssr"]
-    eevee.use_motion_blur = eevee_settings["use_motion_blur"]
 
+def SetWindowViewLayer(context, view_layer):
+    """
+    Switches the View Layer of the active window if we have one.  Renders pass the
+    View Layer they need directly so this is only here to keep the UI in sync.
+    """
 
-    # RENDER SETTINGS
-    render = context.scene.render
-    render.engine = render_settings["engine"]
-    render.resolution_x = render_settings["resolution_x"]
-    render.resolution_y = render_settings["resolution_y"]
-    render.resolution_percentage = render_settings["resolution_percentage"]
-    render.pixel_aspect_x = render_settings["pixel_aspect_x"]
-    render.pixel_aspect_y = render_settings["pixel_aspect_y"]
-    render.use_border = render_settings["use_border"]
-
-    render.use_multiview = render_settings["use_multiview"]
-    render.use_file_extension = render_settings["use_file_extension"]
-    render.use_render_cache = render_settings["use_render_cache"]
-    render.use_overwrite = render_settings["use_overwrite"]
-
-    render.image_settings.file_format = render_settings["file_format"]
-    render.image_settings.color_mode = render_settings["color_mode"]
-    render.image_settings.compression = render_settings["compression"]
-    render.image_settings.quality = render_settings["quality"]
-    render.image_settings.color_depth = render_settings["color_depth"]
-
-    render.use_compositing = render_settings['use_compositing']
-    render.use_sequencer = render_settings['use_sequencer']
+    if context.window is not None:
+        context.window.view_layer = view_layer
 
-    # COLOR SETTINGS
-    color = context.scene.view_settings
-    color.view_transform = color_settings['view_transform']
-    color.look = color_settings['look']
-    color.exposure = color_settings['exposure']
-    color.gamma = color_settings['gamma']
 
-    pass
+def GetSatelliteDestination(satellite, output_root = None):
+    """
+    Returns the path a Satellite will be rendered to (without a file extension).
+    If an output root is provided it replaces the Satellite's Output Directory.
+    """
+
+    output_dir = satellite.output_dir
+    if output_root is not None:
+        output_dir = output_root
+    
+    return os.path.join(output_dir, satellite.output_name)
+
 
 # /////////////////////////////////////////////////////////////////////////
 # /////////////////////////////////////////////////////////////////////////
 
+def GetSatelliteOutputFiles(satellite, destination):
+    """
+    Returns the files a Satellite leaves behind once it's been rendered.
+    """
+
+    if satellite.render_type == 'Skybox':
+        render_options = satellite.data_skybox
+
+        if render_options.projection == 'CUBEMAP':
+            filepaths = GetCubemapOutputFiles(destination, render_options.cubemap_layout)
+        else:
+            filepaths = [GetOutputFilepath(destination, 'HDR')]
+
+        return filepaths + GetSkyboxStageOutputFiles(satellite, destination)
+
+    filepaths = [GetOutputFilepath(destination, satellite.data_camera.file_format)]
+
+    for variant in satellite.data_camera.output_variants:
+        filepaths.append(GetOutputFilepath(GetVariantDestination(destination, variant), variant.file_format))
+
+    return filepaths
+
+
+def GetSatelliteParts(satellite):
+    """
+    Returns the parts a Satellite is rendered in, each of which can be rendered
+    separately (and by separate workers).  Most Satellites are a single part, None.
+    """
+
+    if satellite.render_type == 'Skybox' and satellite.data_skybox.projection == 'CUBEMAP':
+        return list(CUBEMAP_FACES.keys())
+
+    if IsSatelliteTiled(satellite) is True:
+        width, height = GetSatelliteResolution(satellite)
+        return GetTileParts(width, height, satellite.tile_size)
+
+    return [None]
+
+
 # batfinger you legend
 def TraverseCollectionTree(t):
     """
@@ -168,459 +818,768 @@ def TraverseCollectionTree(t):
 # /////////////////////////////////////////////////////////////////////////
 
 
-def SetupRenderingState(self, context, view_layer = None):
+def PlanRenderVisibility(self, context, view_layer):
     """
-    Saves the rendering state of objects in the scene, then modifies them
-    based on their viewport visibility.
+    Works out the render visibility every object and collection needs to match the
+    viewport visibility of a View Layer, without changing anything.  Returns 
+    dictionaries of objects and collections to whether they should be hidden.
     """
 
-    # If we don't have a view layer use the active one.
-    if view_layer is None:
-        view_layer = context.window.view_layer
-    
-    obj_render_state = []
-
-    for obj in context.scene.objects:
-        state = {}
-        state['object'] = obj
-        state['hide_render'] = obj.hide_render
-        obj_render_state.append(state)
+    # Objects are looked up by the collections that directly hold them, once.
+    object_collections = {}
+    collection_hide = {}
 
-        obj.hide_render = obj.hide_get(view_layer = view_layer)
-    
-    
     # TODO: What about objects that belong to multiple collections
-    col_render_state = []
-    scene_collections = TraverseCollectionTree(view_layer.layer_collection)
-
-    for col in scene_collections:
+    for col in TraverseCollectionTree(view_layer.layer_collection):
         if col.name == "Scene Collection":
             continue
-
-        state = {}
-        state['collection'] = col.collection
-        state['hide_render'] = col.collection.hide_render
-        col_render_state.append(state)
         
         # renderable = () # or col.holdout, add later
-        col.collection.hide_render = (not col.is_visible)
-
-        # we also need to set objects inside as not renderable
-        # as the replacement material system relies on the render
-        # status to filter out as Blender has no internal "renderable"
-        # indicator.
-        if not col.is_visible:
-            for col_obj in col.collection.all_objects:
-                col_obj.hide_render = True
+        collection_hide[col.collection] = (not col.is_visible)
+
+        for col_obj in col.collection.objects:
+            object_collections.setdefault(col_obj, []).append(col)
+
+    # Objects inside hidden collections also need to be hidden, as the replacement
+    # material system relies on the render status to filter them out as Blender 
+    # has no internal "renderable" indicator.  Objects the View Layer doesn't 
+    # have are only inside excluded collections.
+    view_objects = set(view_layer.objects)
+    object_hide = {}
+
+    for obj in context.scene.objects:
+        if obj not in view_objects:
+            object_hide[obj] = True
+            continue
+
+        hidden_collection = any(not col.is_visible for col in object_collections.get(obj, []))
+        object_hide[obj] = hidden_collection or obj.hide_get(view_layer = view_layer)
     
-    render_state = {}
-    render_state['objects'] = obj_render_state
-    render_state['collections'] = col_render_state
+    return object_hide, collection_hide
 
-    return render_state
 
+def GetSatelliteViewLayer(self, context, satellite):
+    """
+    Returns the View Layer whose visibility a Satellite renders with, or None if it
+    renders with the scene as the user has it.
+    """
+
+    if satellite.render_type == 'Skybox':
+        layer_name = satellite.data_skybox.view_layer
+    else:
+        layer_name = satellite.data_camera.view_layer
 
-def ReplaceObjectMaterialSlots(self, context, target_obj, target_mat):
-    """Saves a record of any material slots the object has, including any from Geometry Node Modifiers, then replaces it with a provided material."""
+    if layer_name == "":
+        return None
 
-    mat_data = {}
-    mat_data['object'] = target_obj
-    mat_slots = target_obj.material_slots
+    return context.scene.view_layers[layer_name]
+
+
+def GetVisibilityPlan(self, context, batch, view_layer):
+    """
+    Returns the render visibility a View Layer needs, which is only worked out once per batch.
+    """
+
+    if view_layer.name not in batch['visibility_plans']:
+        batch['visibility_plans'][view_layer.name] = PlanRenderVisibility(self, context, view_layer)
+    
+    return batch['visibility_plans'][view_layer.name]
 
-    # ////////////////////////////////
-    # MATERIAL SLOT REPLACEMENT
 
-    has_slots = (len(mat_slots.values()) > 0)
-    mat_data['has_slots'] = has_slots
+def GetIsolatedObjects(self, context, batch, satellite):
+    """
+    Returns every object a Direct Camera would render in the real scene, which are
+    the ones needed in it's own scene.
+    """
+
+    render_options = satellite.data_camera
+
+    if render_options.view_layer != "":
+        view_layer = context.scene.view_layers[render_options.view_layer]
+        object_hide = GetVisibilityPlan(self, context, batch, view_layer)[0]
+        return [obj for obj, hide_render in object_hide.items() if hide_render is False]
+
+    return GetUserVisibleObjects(self, context, GetWindowViewLayer(context))
+
+
+def ApplyBatchVisibility(self, context, batch, view_layer = None):
+    """
+    Moves the render visibility of the scene to what a View Layer needs, or back to
+    how the user had it if no View Layer is given.  The visibility each View Layer
+    needs is only worked out once per batch, and only the objects and collections 
+    that differ from the current state are written to.
+    """
 
-    # Get slot data if we have it
-    if has_slots == True:
-        slot_list = []
-        link_type = []
+    layer_name = view_layer.name if view_layer is not None else None
+    if batch['visibility_layer'] == layer_name:
+        return
 
-        for slot in mat_slots:
-            slot_list.append(slot.name)
-            link_type.append(slot.link)
+    with TimePhase(batch['timings'], 'visibility'):
+        if view_layer is None:
+            object_hide = dict(batch['saved_object_hide'])
+            collection_hide = dict(batch['saved_collection_hide'])
         
-        # TODO: Finish link type implementation
-        mat_data['slots'] = slot_list
-        mat_data['link_type'] = link_type
+        else:
+            object_hide, collection_hide = GetVisibilityPlan(self, context, batch, view_layer)
+        
+        # The first time anything is changed it's saved, so it can be restored once the batch ends.
+        for obj, hide_render in object_hide.items():
+            if obj.hide_render != hide_render:
+                batch['saved_object_hide'].setdefault(obj, obj.hide_render)
+                obj.hide_render = hide_render
+                batch['visibility_written'] += 1
+                CountChanges(batch['timings'], 'objects_touched', 1)
         
-        # NOW WIPE EM
-        for slot in mat_slots :
-            # slot.link = 'OBJECT' # TODO: Check if it works, srsly
-            slot.material = target_mat
+        for collection, hide_render in collection_hide.items():
+            if collection.hide_render != hide_render:
+                batch['saved_collection_hide'].setdefault(collection, collection.hide_render)
+                collection.hide_render = hide_render
+                batch['visibility_written'] += 1
     
-    # If we dont, assign a material
-    else:
-        target_obj.active_material = target_mat
+    batch['visibility_layer'] = layer_name
+
+
+def ApplyIsolatedVisibility(self, context, batch, satellite):
+    """
+    Puts the render visibility of the scene back how the user had it, then shows
+    any object an isolated Direct Camera needs that is hidden from renders, as
+    objects keep their own render visibility when linked into it's scene.
+    Returns the objects it needs.  Collections are left alone, as the objects 
+    are linked directly.
+    """
+
+    ApplyBatchVisibility(self, context, batch, None)
+    objects = GetIsolatedObjects(self, context, batch, satellite)
+
+    with TimePhase(batch['timings'], 'visibility'):
+        shown = 0
+
+        for obj in objects:
+            if obj.hide_render is True:
+                batch['saved_object_hide'].setdefault(obj, obj.hide_render)
+                obj.hide_render = False
+                shown += 1
+        
+        batch['visibility_written'] += shown
+        CountChanges(batch['timings'], 'objects_touched', shown)
     
-    # ////////////////////////////////
-    # GEOMETRY NODE SLOT REPLACEMENT
-    # big thanks to the modifier list addon author for cracking
-    # the code on this seemingly undocumented area
+    # The scene no longer matches any View Layer (or the user's visibility), so
+    # the next Satellite has to move it again.
+    if shown > 0:
+        batch['visibility_layer'] = False
 
+    return objects
+
+
+def HasModifierMaterialInputs(obj):
+    """
+    Returns True if any Geometry Nodes modifier on the object has a Material input.
+    """
+
+    for md in obj.modifiers:
+        if md.type == 'NODES' and len(GetModifierMaterialInputs(md)) > 0:
+            return True
+    
+    return False
+
+
+def GetReplaceableObjects(self, context, target_view):
+    """
+    Returns every object in the View Layer that will be rendered and can have it's
+    materials replaced, including the objects inside any collection instances.
+    """
+
+    # this may need to include POINTCLOUD in the future but not right now
+    valid_types = ['MESH', 'CURVE', 'SURFACE', 'META', 'FONT',
+        'HAIR', 'VOLUME', 'GPENCIL']
+
+    replace_objects = {}
+    search_objects = [obj for obj in target_view.objects if obj.hide_render == False]
+    searched_collections = set()
+
+    while len(search_objects) > 0:
+        obj = search_objects.pop()
+
+        if obj.type in valid_types:
+            replace_objects[obj.as_pointer()] = obj
+        
+        collection = obj.instance_collection
+        if obj.instance_type == 'COLLECTION' and collection is not None:
+            if collection.as_pointer() not in searched_collections:
+                searched_collections.add(collection.as_pointer())
+                search_objects += [col_obj for col_obj in collection.all_objects 
+                    if col_obj.hide_render == False]
+
+    return list(replace_objects.values())
+
+
+def CreateMaterialRecord():
+    mat_data = {}
+    mat_data['data'] = []
+    mat_data['objects'] = []
     mat_data['modifiers'] = []
 
-    for md in target_obj.modifiers:
-        if md.type == 'NODES':
-            
-            modifier_data = {}
-            modifier_data['modifier_data'] = md
-            modifier_data['inputs'] = []
+    return mat_data
 
-            if not md.node_group:
-                continue
 
-            input_node = next((node for node in md.node_group.nodes if node.type == 'GROUP_INPUT'),
-                        None)
-            
-            if not input_node:
-                continue
-            
-            node_output_types = []
-            # valid_node_outputs_names = []
-            # node_output_socket_shapes = []
-
-            # Skip the last output because it's a placeholder.
-            for node_output in input_node.outputs[:-1]:
-                if node_output.type != 'GEOMETRY':
-                    node_output_types.append(node_output.type)
-                    # valid_node_outputs_names.append(node_output.name)
-                    # node_output_socket_shapes.append(node_output.display_shape)
-            
-            input_prop_ids = [prop_id for prop_id in md.keys()
-                        if (prop_id.startswith("Input_") and prop_id[-1].isdigit())]
-                        
-            i = 0
-            while i < len(node_output_types) - 1:
-                key = input_prop_ids[i]
-                value = node_output_types[i]
-                
-                if value == 'MATERIAL':
-                    mat_record = (key, md[key])
-                    modifier_data['inputs'].append(mat_record)
-                    md[key] = target_mat
-                
-                i += 1
+def IsEditableID(id):
+    """
+    Returns True if a datablock can be changed, which isn't the case for ones
+    linked from another file.
+    """
+
+    return id.library is None and getattr(id, 'is_editable', True) is True
+
+
+def ReplaceMaterialSlots(self, context, objects, target_mat, mat_data = None):
+    """
+    Saves a record of the material slots the objects have, including any from Geometry 
+    Node Modifiers, then replaces them with a provided material.
+
+    Slots linked to object data are replaced once per datablock, so objects sharing
+    the same data (like linked duplicates) only cost as much as one object.  Objects
+    and data linked from other files can't be changed, so they keep their materials
+    unless the View Layer's Material Override is used.
+
+    If a record is given every slot is saved to it just before it's replaced, so a
+    replacement that fails part way can still be restored.
+    """
+
+    if mat_data is None:
+        mat_data = CreateMaterialRecord()
+
+    replaced_data = set()
+
+    for obj in objects:
+
+        # ////////////////////////////////
+        # DATA SLOT REPLACEMENT
+        data = obj.data
+
+        if data is not None and data.as_pointer() not in replaced_data and IsEditableID(data):
+            replaced_data.add(data.as_pointer())
+
+            # The materials themselves are kept rather than their names so they 
+            # don't have to be looked up again.
+            data_record = {}
+            data_record['data'] = data
+            data_record['materials'] = list(data.materials)
+            mat_data['data'].append(data_record)
 
-            mat_data['modifiers'].append(modifier_data)
+            # If there's no slots, add one to give the object a material.
+            if len(data.materials) == 0:
+                data.materials.append(target_mat)
+            
+            for i in range(len(data.materials)):
+                data.materials[i] = target_mat
+        
+        if IsEditableID(obj) is False:
+            continue
+
+        # ////////////////////////////////
+        # OBJECT SLOT REPLACEMENT
+        for i, slot in enumerate(obj.material_slots):
+            if slot.link == 'OBJECT':
+                mat_data['objects'].append((obj, i, slot.material))
+                slot.material = target_mat
+        
+        # ////////////////////////////////
+        # GEOMETRY NODE SLOT REPLACEMENT
+        for md in obj.modifiers:
+            if md.type == 'NODES':
+                for key in GetModifierMaterialInputs(md):
+                    mat_data['modifiers'].append((md, key, md[key]))
+                    md[key] = target_mat
     
     return mat_data
 
-def RestoreObjectMaterialSlots(self, context, mat_data):
-    """Restores an object's material slots based on a previous replacement operation."""
-    
-    obj = mat_data['object']
-    materials = []
-
-    # If we had slots, replace them one after another
-    if mat_data['has_slots'] == True:
-        for mat_name in mat_data['slots']:
-            if mat_name != "" or None:
-                materials.append(bpy.data.materials[mat_name])
-    
-        # NOW WIPE EM
-        i = 0
-        for slot in obj.material_slots:
-            slot.link = mat_data['link_type'][i]
-            slot.material = materials[i]
-            i += 1
-    
-    # If ww don't have any slots, delete the active material
-    else:
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.context.view_layer.objects.active = obj
-        obj.select_set(state=True)
-        bpy.ops.object.material_slot_remove()
-    
-    
-    # RESTORE GEOMETRY NODES
-    modifier_data = mat_data['modifiers']
 
-    for mod_data in modifier_data:
-        md = mod_data['modifier_data']
-        inputs = mod_data['inputs']
+def RestoreMaterialSlots(self, context, mat_data):
+    """
+    Restores the material slots from a previous replacement operation.  This only
+    uses the data API, so no operators (or selection changes) are needed.
+    """
 
-        for input in inputs:
-            if input[1] != "" or None:
-                md[input[0]] = input[1]
+    for obj, i, material in mat_data['objects']:
+        obj.material_slots[i].material = material
 
+    for data_record in mat_data['data']:
+        data = data_record['data']
+        materials = data_record['materials']
 
+        # Data that had no slots was given one, which is removed again.
+        if len(materials) == 0:
+            data.materials.clear()
+            continue
 
-# /////////////////////////////////////////////////////////////////////////
-# /////////////////////////////////////////////////////////////////////////
+        for i, material in enumerate(materials):
+            data.materials[i] = material
+    
+    # Inputs that were empty are emptied again, rather than left with the replacement.
+    for md, key, material in mat_data['modifiers']:
+        md[key] = material
 
 
-def RestoreRenderingState(self, context, render_state):
-    """Restores the rendering state of objects in the scene."""
+def ReplaceBatchMaterials(self, context, batch, objects, target_mat, mat_data):
+    """
+    Replaces the materials of the objects for a batch, saving the slots replaced to
+    the record given and counting what was changed.
+    """
 
-    obj_render_state = render_state['objects']
-    col_render_state = render_state['collections']
+    with TimePhase(batch['timings'], 'material_swap'):
+        ReplaceMaterialSlots(self, context, objects, target_mat, mat_data)
 
-    for state in obj_render_state:
-        state['object'].hide_render = state['hide_render']
-    
-    for state in col_render_state:
-        state['collection'].hide_render = state['hide_render']
+    # Data that had no slots was given one.
+    swapped = sum(max(1, len(record['materials'])) for record in mat_data['data'])
+    swapped += len(mat_data['objects']) + len(mat_data['modifiers'])
 
+    CountChanges(batch['timings'], 'objects_touched', len(objects))
+    CountChanges(batch['timings'], 'materials_swapped', swapped)
+    return mat_data
 
 
 # /////////////////////////////////////////////////////////////////////////
 # /////////////////////////////////////////////////////////////////////////
 
-def RenderSkybox(self, context, satellite):
-    """Renders a skybox defined by the satellite input"""
+def SetupSkybox(self, context, satellite, batch, job):
+    """
+    Prepares the scene to render a skybox defined by the satellite input, filling
+    the job with everything needed to render and clean up after it.
+    """
 
-    scene = bpy.context.scene
+    scene = context.scene
     render_options = satellite.data_skybox
 
-    old_view = context.window.view_layer 
+    job['old_view'] = GetWindowViewLayer(context)
     target_view = None
-    saved_render_state = []
     
     
     if render_options.view_layer != "":
         target_view = scene.view_layers[render_options.view_layer]
-        context.window.view_layer = target_view
-        
-        # archive the render state
-
-        saved_render_state = SetupRenderingState(self, context, target_view)
+        SetWindowViewLayer(context, target_view)
+        ApplyBatchVisibility(self, context, batch, target_view)
 
     else:
-        # create a new view layer and hide everything
-        render_viewlayer = context.scene.view_layers.new(name="Satellite Render")
-        context.window.view_layer = render_viewlayer
-
-        for layer in render_viewlayer.layer_collection.children:
-            layer.exclude = True
+        # render in an empty scene, leaving the real one untouched
+        world = scene.world
+        scene = GetRigScene(self, context, batch)
+        SyncRigObjects(self, context, batch, [])
+        scene.world = world
+        target_view = scene.view_layers[0]
     
+    job['scene'] = scene
+
 
     # ///////////////////////////////////////
     # CAMERA + WORLD
-    scene.render.resolution_x = int(render_options.resolution)
-    scene.render.resolution_y = int(render_options.resolution / 2)
-    scene.render.image_settings.file_format = 'HDR'
-    scene.render.image_settings.color_mode = render_options.color_mode
-
-    # ensure some render settings are at their defaults
-    scene.render.resolution_percentage = 100
-    scene.render.pixel_aspect_x = 1.0
-    scene.render.pixel_aspect_y = 1.0
-    scene.render.use_border = False
-
-    scene.render.use_multiview = False
-    scene.render.use_file_extension = True
-    scene.render.use_render_cache = False
-    scene.render.use_overwrite = True
+    rig = GetBatchRig(self, context, batch)
+    camera = rig['camera']
+    camera_data = rig['camera_data']
 
-    scene.render.use_compositing = False
-    scene.render.use_sequencer = False
+    if scene.collection.objects.get(camera.name) is None:
+        scene.collection.objects.link(camera)
 
-    if render_options.render_engine == 'Cycles':
-        scene.render.engine = 'CYCLES'
-        scene.cycles.samples = render_options.samples
-        scene.cycles.use_denoising = render_options.cycles_use_denoiser
-    
-    elif render_options.render_engine == 'Eevee':
-        scene.render.engine = 'BLENDER_EEVEE'
-        scene.eevee.taa_render_samples = render_options.samples
-
-        if render_options.eevee_disable_pp is True:
-            scene.eevee.use_gtao = False
-            scene.eevee.use_bloom = False
-            scene.eevee.use_ssr = False
-            scene.eevee.use_motion_blur = False
-    
+    if render_options.projection == 'CUBEMAP':
+        # The camera is pointed at each face as it's rendered.
+        SetupCubemapCamera(camera_data)
 
-    # ///////////////////////////////////////
-    # CAMERA + WORLD
-    # Setup the camera
-    bpy.ops.object.camera_add()
-    context.active_object.location = Vector((0.0, 0.0, 0.0))
-    context.active_object.rotation_euler = Vector((radians(90), 0.0, 0.0))
+    else:
+        camera_data.type = 'PANO'
+        camera_data.cycles.panorama_type = 'EQUIRECTANGULAR'
+        camera.rotation_euler = Vector((radians(90), 0.0, 0.0))
 
-    camera_name = context.active_object.name
-    camera_bname = context.active_object.data.name
-    
-    bpy.data.cameras[camera_bname].type = 'PANO'
-    bpy.data.cameras[camera_bname].cycles.panorama_type = 'EQUIRECTANGULAR'
+    job['camera'] = camera
 
     # If a World Material has been defined, use it.
-    old_world = scene.world
+    job['old_world'] = scene.world
     if render_options.world_material is not None:
         scene.world = render_options.world_material
     
-    # ///////////////////////////////////////
-    # RENDER
-    # render this bad boy *slaps side of car*
-    context.scene.camera = context.active_object
-    name = satellite.output_dir
-    dir = satellite.output_name
-
-    destination = os.path.join(name, dir)
-    bpy.context.scene.render.filepath = destination
-    bpy.context.scene.render.use_single_layer = True
-    bpy.ops.render.render(animation = False, write_still = True)
-
-    # ////////////////////////////////////////
-    # CLEAN UP
-    if render_options.world_material is not None:
-        scene.world = old_world
+    job['old_camera'] = scene.camera
+    scene.camera = camera
 
-    bpy.data.objects.remove(bpy.data.objects[camera_name], do_unlink=True)
+    job['layer'] = target_view.name
 
-    if render_options.view_layer != "":
-        RestoreRenderingState(self, context, saved_render_state)
 
-    else:
-        context.scene.view_layers.remove(render_viewlayer)
-    
-    context.window.view_layer = old_view
+def CleanupSkybox(self, context, job):
+    """
+    Restores the scene after a skybox has been rendered, or whatever was changed
+    before setting it up failed.
+    """
+
+    if 'old_world' in job:
+        job['scene'].world = job['old_world']
+
+    if 'old_camera' in job:
+        job['scene'].camera = job['old_camera']
     
-    report  = {}
-    report['status'] = 'FINISHED'
-    report['destination'] = destination
-    return report
+    if 'old_view' in job:
+        SetWindowViewLayer(context, job['old_view'])
 
 
 # /////////////////////////////////////////////////////////////////////////
 # /////////////////////////////////////////////////////////////////////////
 
-def RenderDirectCamera(self, context, satellite):
-    """Renders a direct camera defined by the satellite input"""
+def SetupDirectCamera(self, context, satellite, batch, job):
+    """
+    Prepares the scene to render a direct camera defined by the satellite input, 
+    filling the job with everything needed to render and clean up after it.
+    """
 
-    scene = bpy.context.scene
+    scene = context.scene
     render_options = satellite.data_camera
 
+    job['scene'] = scene
+    job['old_view'] = GetWindowViewLayer(context)
+    target_view = None
 
     # ///////////////////////////////////////
     # SCENE SETUP
     # change the view layer if we have one set
-    old_view = context.window.view_layer
-    target_view = None
-    saved_render_state = []
-
     if render_options.view_layer != "":
         target_view = scene.view_layers[render_options.view_layer]
-        context.window.view_layer = target_view
-        
-        # archive the render state
-        saved_render_state = SetupRenderingState(self, context, target_view)
+        SetWindowViewLayer(context, target_view)
+        ApplyBatchVisibility(self, context, batch, target_view)
 
     else:
-        target_view = context.window.view_layer
+        target_view = job['old_view']
+        ApplyBatchVisibility(self, context, batch, None)
 
     # If we have a Replacement Material set we need to 
     # save all renderable object materials before switching 
     # NOTE - You have to sweep for all material slots
     # NOTE 2 - You have to handle objects that have no slots assigned
-    saved_object_mats = []
     target_mat = render_options.replacement_material
 
-    # this may need to include POINTCLOUD in the future but not right now
-    valid_types = ['MESH', 'CURVE', 'SURFACE', 'META', 'FONT'
-        'HAIR', 'VOLUME', 'GPENCIL']
+    if target_mat is not None:
+        replace_objects = GetReplaceableObjects(self, context, target_view)
 
-    if render_options.replacement_material is not None:
-        for obj in target_view.objects:
-            valid_type = (obj.type in valid_types)
-            renderable = (obj.hide_render == False)
+        # The View Layer's Material Override replaces every material in one go, only
+        # Geometry Nodes material inputs still need replacing object by object.
+        if render_options.replacement_method == 'OVERRIDE' and hasattr(target_view, 'material_override'):
+            job['old_material_override'] = target_view.material_override
+            job['override_view'] = target_view
+            target_view.material_override = target_mat
 
-            if valid_type is True and renderable is True:
-                mat_data = ReplaceObjectMaterialSlots(self, context, obj, target_mat)
-                saved_object_mats.append(mat_data)
+            replace_objects = [obj for obj in replace_objects if HasModifierMaterialInputs(obj)]
 
-    
+        job['saved_object_mats'] = CreateMaterialRecord()
+        ReplaceBatchMaterials(self, context, batch, replace_objects, target_mat, job['saved_object_mats'])
 
     # If a World Material has been defined, use it.
-    old_world = scene.world
+    job['old_world'] = scene.world
     if render_options.world_material is not None:
         scene.world = render_options.world_material
 
 
     # ///////////////////////////////////////
-    # OUTPUT
-    scene.render.resolution_x = int(render_options.resolution_x)
-    scene.render.resolution_y = int(render_options.resolution_y)
-    scene.render.image_settings.file_format = render_options.file_format
-    scene.render.image_settings.color_depth = render_options.color_depth
-    scene.render.image_settings.color_mode = render_options.color_mode
-    scene.render.image_settings.quality = render_options.quality
-    scene.render.image_settings.compression = render_options.compression
+    # CAMERA
+    camera_name = render_options.target_camera.name
+    scene.camera = bpy.data.objects[camera_name]
 
-    # ensure some render settings are at their defaults
-    scene.render.resolution_percentage = 100
-    scene.render.pixel_aspect_x = 1.0
-    scene.render.pixel_aspect_y = 1.0
-    scene.render.use_border = False
-
-    scene.render.use_multiview = False
-    scene.render.use_file_extension = True
-    scene.render.use_render_cache = False
-    scene.render.use_overwrite = True
+    job['layer'] = target_view.name
+
+
+def CleanupDirectCamera(self, context, job):
+    """
+    Restores the scene after a direct camera has been rendered, or whatever was
+    changed before setting it up failed.
+    """
+
+    if 'old_world' in job:
+        job['scene'].world = job['old_world']
     
+    if 'old_view' in job:
+        SetWindowViewLayer(context, job['old_view'])
 
-    # ///////////////////////////////////////
-    # RENDER
-    if render_options.render_engine == 'Cycles':
-        scene.render.engine = 'CYCLES'
-        scene.cycles.samples = render_options.samples
-        scene.cycles.use_denoising = render_options.cycles_use_denoiser
+    if 'override_view' in job:
+        job['override_view'].material_override = job['old_material_override']
     
-    elif render_options.render_engine == 'Eevee':
-        scene.render.engine = 'BLENDER_EEVEE'
-        scene.eevee.taa_render_samples = render_options.samples
+    if 'saved_object_mats' in job:
+        RestoreMaterialSlots(self, context, job['saved_object_mats'])
 
-        if render_options.eevee_disable_pp is True:
-            scene.eevee.use_gtao = False
-            scene.eevee.use_bloom = False
-            scene.eevee.use_ssr = False
-            scene.eevee.use_motion_blur = False
 
-    # render this bad boy *slaps side of car*
-    camera_name = render_options.target_camera.name
-    context.scene.camera = bpy.data.objects[camera_name]
-    name = satellite.output_dir
-    dir = satellite.output_name
+def SetupIsolatedCamera(self, context, satellite, batch, job):
+    """
+    Prepares a scene of it's own to render a direct camera in, linking only the
+    objects that will be rendered into it.  The real scene's View Layers, camera,
+    world and collections are left as the user had them, and only linked objects
+    hidden from renders have their render visibility changed.
+    """
+
+    render_options = satellite.data_camera
+    scene = GetRigScene(self, context, batch)
+    target_view = scene.view_layers[0]
 
-    destination = os.path.join(name, dir)
-    bpy.context.scene.render.filepath = destination
-    bpy.context.scene.render.use_single_layer = True
-    bpy.ops.render.render(write_still = True)
+    # ///////////////////////////////////////
+    # SCENE SETUP
+    objects = ApplyIsolatedVisibility(self, context, batch, satellite)
+
+    camera = render_options.target_camera
+    if camera not in objects:
+        objects.append(camera)
+
+    SyncRigObjects(self, context, batch, objects)
 
-    # ////////////////////////////////////////
-    # CLEAN UP
     if render_options.world_material is not None:
-        scene.world = old_world
-    
-    # restore the render state
-    if render_options.view_layer != "":        
-        RestoreRenderingState(self, context, saved_render_state)
+        scene.world = render_options.world_material
+    else:
+        scene.world = batch['scene'].world
     
-    context.window.view_layer = old_view
+    scene.camera = camera
+
+    # This scene is ours, so the View Layer's Material Override can be used
+    # without having to put anything back.
+    target_mat = render_options.replacement_material
+
+    if hasattr(target_view, 'material_override'):
+        target_view.material_override = target_mat
+
+    if target_mat is not None:
+        replace_objects = GetReplaceableObjects(self, context, target_view)
+
+        if hasattr(target_view, 'material_override'):
+            replace_objects = [obj for obj in replace_objects if HasModifierMaterialInputs(obj)]
+
+        job['saved_object_mats'] = CreateMaterialRecord()
+        ReplaceBatchMaterials(self, context, batch, replace_objects, target_mat, job['saved_object_mats'])
+
+    job['scene'] = scene
+    job['layer'] = target_view.name
+
+
+def CleanupIsolatedCamera(self, context, job):
+    """
+    Restores anything changed in the real scene to render an isolated direct camera.
+    The objects linked for it are left for the next Satellite to reuse.
+    """
+
+    if 'saved_object_mats' in job:
+        RestoreMaterialSlots(self, context, job['saved_object_mats'])
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+def SetupJobPart(self, context, job, part):
+    """
+    Gets the scene ready to render one part of a job, without setting up the
+    rest of the scene again.
+    """
+
+    if part is None:
+        return
+
+    render = job['scene'].render
+
+    # Tiles share everything but the part of the image rendered and where they're saved.
+    if IsTilePart(part) is True:
+        width, height = job['resolution']
+        border = GetTileBorder(part, width, height, job['tile_size'])
+        render.border_min_x, render.border_max_x, render.border_min_y, render.border_max_y = border
+        render.use_border = True
+        render.use_crop_to_border = True
+        render.filepath = GetTileDestination(job['render_destination'], part)
+        return
+
+    # Cubemap faces share everything but the camera direction and where they're saved.
+    job['camera'].rotation_euler = GetFaceRotation(part)
+    render.filepath = GetFaceDestination(job['destination'], part)
+
+
+def RenderJob(self, context, job):
+    """
+    Renders every part of a job that has already been setup, blocking until the 
+    images have been written.
+    """
+
+    for part in job['parts']:
+        SetupJobPart(self, context, job, part)
+
+        # render this bad boy *slaps side of car*
+        bpy.ops.render.render(animation = False, write_still = True, 
+            layer = job['layer'], scene = job['scene'].name)
+
+
+def SetupSatellite(self, context, satellite, batch, parts = None):
+    """
+    Applies the render settings and prepares the scene for any type of Satellite, 
+    returning the job needed to render and clean up after it.  If parts are given
+    only those parts will be rendered, otherwise the whole Satellite is.
+    """
+
+    with TimePhase(batch['timings'], 'scene_sync'):
+        return PrepareSatellite(self, context, satellite, batch, parts)
+
+
+def PrepareSatellite(self, context, satellite, batch, parts = None):
+    """
+    Sets up a Satellite for SetupSatellite, which times how long it takes.
+    """
+
+    destination = GetSatelliteDestination(satellite, batch['output_root'])
+
+    job = {}
+    job['name'] = satellite.name
+    job['render_type'] = satellite.render_type
+    job['isolated'] = IsIsolatedSatellite(satellite)
+    job['destination'] = destination
+    job['partial'] = parts is not None
+    job['parts'] = parts if parts is not None else GetSatelliteParts(satellite)
+    job['resolution'] = GetSatelliteResolution(satellite)
+    job['render_destination'] = GetSatelliteRenderOutput(satellite, destination)[0]
+    job['tile_size'] = satellite.tile_size
+
+    # An image still being compressed from an earlier render would replace this one.
+    if batch['encode_queue'] is not None:
+        with TimePhase(batch['timings'], 'write'):
+            WaitForPathEncodes(batch['encode_queue'], GetSatelliteOutputFiles(satellite, destination))
+
+    # Skyboxes that only render the world and isolated Direct Cameras are
+    # rendered in a scene of their own.
+    render_scene = batch['scene']
+    if IsWorldOnlySkybox(satellite) is True or job['isolated'] is True:
+        render_scene = GetRigScene(self, context, batch)
+
+    ApplySatelliteRenderSettings(self, context, satellite, batch, destination, render_scene)
+
+    # Everything changed is recorded in the job just before it's changed, so a 
+    # setup that fails part way can put back whatever it got to.
+    try:
+        if satellite.render_type == 'Skybox':
+            SetupSkybox(self, context, satellite, batch, job)
+        elif job['isolated'] is True:
+            SetupIsolatedCamera(self, context, satellite, batch, job)
+        elif satellite.render_type == 'Direct Camera':
+            SetupDirectCamera(self, context, satellite, batch, job)
     
-    if render_options.replacement_material is not None:
-        for mat_data in saved_object_mats:
-            RestoreObjectMaterialSlots(self, context, mat_data)
-            
+    except Exception:
+        CleanupSatellite(self, context, job)
+        raise
 
-    report  = {}
-    report['status'] = 'FINISHED'
-    report['destination'] = destination
-    return report
+    return job
+
+
+def FinalizeSatellite(self, context, satellite, destination, encode_queue = None):
+    """
+    Turns the images rendered for every part of a Satellite into it's final output.
+    This only needs the files already rendered, so it can run once all the parts
+    are done even if they were rendered somewhere else.
+
+    If an encode queue is given, images rendered uncompressed for it are queued to
+    be compressed in the background.
+    """
+
+    if encode_queue is not None and CanEncodeInBackground(satellite) is True:
+        image_format = GetSatelliteImageFormat(satellite)
+        filepath = GetOutputFilepath(destination, image_format['file_format'])
+        QueueImageEncode(encode_queue, filepath, LoadImagePixels(filepath), image_format)
+
+    render_destination, render_format = GetSatelliteRenderOutput(satellite, destination)
+
+    if IsSatelliteTiled(satellite) is True:
+        width, height = GetSatelliteResolution(satellite)
+        AssembleTiles(render_destination, width, height, satellite.tile_size, 
+            GetTileImageFormat(render_format), render_format)
+
+    if HasOutputVariants(satellite) is True:
+        SaveOutputVariants(destination, GetSatelliteImageFormat(satellite), 
+            satellite.data_camera.output_variants, GetSatelliteViewSettings(satellite))
+
+    if satellite.render_type == 'Skybox':
+        render_options = satellite.data_skybox
+        RunSkyboxStages(self, context, satellite, destination)
+
+        # This removes the individual faces, so it has to happen after the stages that use them.
+        if render_options.projection == 'CUBEMAP' and render_options.cubemap_layout != 'FACES':
+            AssembleCubemap(destination, render_options.cubemap_layout)
+
+
+def CleanupSatellite(self, context, job):
+    """
+    Restores the scene after a Satellite job has finished.  Render settings are
+    left for the next Satellite, and are restored once the batch has finished.
+    """
+
+    if job['render_type'] == 'Skybox':
+        CleanupSkybox(self, context, job)
+    elif job['isolated'] is True:
+        CleanupIsolatedCamera(self, context, job)
+    elif job['render_type'] == 'Direct Camera':
+        CleanupDirectCamera(self, context, job)
 
-    pass
 
 # /////////////////////////////////////////////////////////////////////////
 # /////////////////////////////////////////////////////////////////////////
 
 
-def VerifyRenderSettings(self, context, verify_all):
-    """Checks that all settings have been correctly set before rendering"""
+def VerifySatellite(self, context, sat):
+    """Checks that a single Satellite has been correctly set before rendering"""
 
     report = {}
+    scene = context.scene
+
+    # check output directories
+    if sat.output_dir == "":
+        report['status'] = 'FAILED'
+        report['info'] = "The Satellite " + sat.name + " needs an Output Directory set before rendering."
+        return report
+
+    if sat.output_name == "":
+        report['status'] = 'FAILED'
+        report['info'] = "The Satellite " + sat.name + " needs an Output Name set before rendering."
+        return report
+    
+    # check for cameras
+    if sat.render_type == 'Direct Camera':
+        sat_settings = sat.data_camera
+
+        if sat_settings.target_camera is None:
+            report['status'] = 'FAILED'
+            report['info'] = "The Satellite " + sat.name + " needs a Target Camera set before rendering."
+            return report
+
+        elif sat_settings.target_camera.type != 'CAMERA':
+            report['status'] = 'FAILED'
+            report['info'] = "The Satellite " + sat.name + " doesn't have a Camera-type object specified in Target Camera, this needs to be set before rendering."
+            return report
+
+        # Variants sharing a file name would overwrite each other (or the main output).
+        suffixes = set()
+        for variant in sat_settings.output_variants:
+            if variant.suffix == "":
+                report['status'] = 'FAILED'
+                report['info'] = "The Satellite " + sat.name + " has an Output Variant without a Suffix, each one needs a Suffix before rendering."
+                return report
+
+            if variant.suffix == MASTER_SUFFIX:
+                report['status'] = 'FAILED'
+                report['info'] = "The Satellite " + sat.name + " has an Output Variant with the Suffix " + MASTER_SUFFIX + ", which Satellite uses for the image variants are made from.  Please pick another Suffix."
+                return report
+
+            if variant.suffix in suffixes:
+                report['status'] = 'FAILED'
+                report['info'] = "The Satellite " + sat.name + " has more than one Output Variant with the Suffix " + variant.suffix + ", each one needs a Suffix of it's own."
+                return report
+
+            suffixes.add(variant.suffix)
+    
+    if sat.render_type == 'Skybox':
+        sat_settings = sat.data_skybox
+    
+    if sat_settings.view_layer != "":
+        vl = sat_settings.view_layer
+        if scene.view_layers.find(vl) == -1:
+            report['status'] = 'FAILED'
+            report['info'] = "The Satellite " + sat.name + "'s Target View Layer doesn't exist, please double-check the name provided."
+            return report
+
+    report['status'] = 'SUCCESS'
+    return report
+
+
+def VerifyRenderSettings(self, context, verify_all):
+    """Checks that all settings have been correctly set before rendering"""
 
     scene = context.scene
     sat_data = scene.SATL_SceneData
@@ -631,48 +1590,120 @@ def VerifyRenderSettings(self, context, verify_all):
     if verify_all is True:
         for sat in satellites:
             if sat.is_active is True:
-                satellite_queue.append(satellites)
+                satellite_queue.append(sat)
     else:
         satellite_queue.append(satellites[sat_selected])
 
     for sat in satellite_queue:
-
-        # check output directories
-        if sat.output_dir == "":
-            report['status'] = 'FAILED'
-            report['info'] = "The Satellite " + sat.name + " needs an Output Directory set before rendering."
+        report = VerifySatellite(self, context, sat)
+        if report['status'] != 'SUCCESS':
             return report
+    
+    report = {}
+    report['status'] = 'SUCCESS'
+    return report
 
-        if sat.output_name == "":
-            report['status'] = 'FAILED'
-            report['info'] = "The Satellite " + sat.name + " needs an Output Name set before rendering."
-            return report
-        
-        # check for cameras
-        if sat.render_type == 'Direct Camera':
-            sat_settings = sat.data_camera
 
-            if sat_settings.target_camera.type is None:
-                report['status'] = 'FAILED'
-                report['info'] = "The Satellite " + sat.name + " needs a Target Camera set before rendering."
-                return report
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
 
-            elif sat_settings.target_camera.type != 'CAMERA':
-                report['status'] = 'FAILED'
-                report['info'] = "The Satellite " + sat.name + " doesn't have a Camera-type object specified in Target Camera, this needs to be set before rendering."
-                return report
+def RenderSatellites(self, context, satellites, output_root = None, use_cache = False, force = False,
+        parts = None, timings_path = None):
+    """
+    Renders a list of Satellites one after another, returning a report for each.
+    This doesn't rely on any UI context so it can be used by operators and
+    background (command-line) renders alike.
+
+    Parts can be given as a dictionary of Satellite names to the parts that should
+    be rendered.  Those Satellites are left unfinished for whoever asked for them.
+    Every report includes how long each phase of the Satellite took.
+    """
+
+    reports = []
+    batch = BeginRenderBatch(self, context, output_root, use_cache, force, timings_path)
+    timings = batch['timings']
+
+    if parts is None:
+        parts = {}
+
+    for satellite in satellites:
+        satellite_parts = parts.get(satellite.name, None)
+        BeginSatelliteTimings(timings, satellite.name)
+
+        with TimePhase(timings, 'verify'):
+            report = VerifySatellite(self, context, satellite)
+        report['name'] = satellite.name
+
+        if report['status'] != 'SUCCESS':
+            if satellite_parts is not None:
+                report['parts'] = satellite_parts
+            EndSatelliteTimings(timings, report)
+            reports.append(report)
+            continue
+
+        try:
+            fingerprint = None
+
+            # Only a whole Satellite can be checked against (and added to) the cache.
+            if satellite_parts is None:
+                fingerprint, cached_report = CheckSatelliteCache(self, context, satellite, batch)
+
+                if cached_report is not None:
+                    cached_report['name'] = satellite.name
+                    EndSatelliteTimings(timings, cached_report)
+                    reports.append(cached_report)
+                    batch['rendered'].append(satellite.name)
+                    continue
+
+            job = SetupSatellite(self, context, satellite, batch, satellite_parts)
+
+            try:
+                with TimePhase(timings, 'render'):
+                    RenderJob(self, context, job)
+            finally:
+                with TimePhase(timings, 'restore'):
+                    CleanupSatellite(self, context, job)
             
-            if sat_settings.view_layer != "":
-                vl = sat_settings.view_layer
-                if scene.view_layers.find(vl) == -1:
-                    report['status'] = 'FAILED'
-                    report['info'] = "The Satellite " + sat.name + "'s Target View Layer doesn't exist, please double-check the name provided."
-                    return report
+            report = {}
+            report['status'] = 'FINISHED'
+            report['destination'] = job['destination']
+
+            if job['partial'] is False:
+                with TimePhase(timings, 'write'):
+                    FinalizeSatellite(self, context, satellite, job['destination'], batch['encode_queue'])
+                    
+                    if fingerprint is not None:
+                        WriteRenderFingerprint(job['destination'], fingerprint)
                 
+                batch['rendered'].append(satellite.name)
+        
+        except Exception as error:
+            traceback.print_exc()
+            report = {}
+            report['status'] = 'FAILED'
+            report['info'] = "The Satellite " + satellite.name + " failed to render - " + str(error)
+        
+        report['name'] = satellite.name
+        if satellite_parts is not None:
+            report['parts'] = satellite_parts
+        
+        EndSatelliteTimings(timings, report)
+        reports.append(report)
+    
+    EndRenderBatch(self, context, batch)
+    return reports
+
+
+def GetTimingsPath(context):
+    """
+    Returns where the scene wants batch timings saved, or None if it doesn't.
+    """
 
+    timings_path = context.scene.SATL_SceneData.timings_path
+    if timings_path == "":
+        return None
     
-    report['status'] = 'SUCCESS'
-    return report
+    return timings_path
 
 
 # /////////////////////////////////////////////////////////////////////////
@@ -694,68 +1725,20 @@ class SATELLITE_OT_RenderSelected(Operator):
             self.report({'WARNING'}, verify_settings['info'])
             return {'FINISHED'}
 
-        # ////////////////////////////////////////////////////////////////////////////
-        # SAVE CONTEXT STATE
-
-        # ENSURE WE ARE IN THE RIGHT CONTEXT
-        old_region = bpy.context.area.type
-        bpy.context.area.type = 'VIEW_3D'
-        old_mode = ''
-        if context.active_object is not None:
-            old_mode = context.active_object.mode
-            bpy.ops.object.mode_set(mode='OBJECT')
-
-        # SAVE SELECTED AND ACTIVE OBJECTS FIRST
-        old_selected_objects = context.selected_objects
-        old_active_object = context.active_object
-
-        # store old properties for later
-        old_render_settings = SaveRenderSettings(self, context)
-
         # Get the selected render preset and check it's type
         sat_data = context.scene.SATL_SceneData
         selected_render_index = sat_data.sat_selected_list_index
         satellite = sat_data.sat_presets[selected_render_index]
 
-        # ////////////////////////////////////////////////////////////////////////////
-        # EDIT COLOR SETTINGS
-        # this is shared between render modes so it can be done here
-        color = context.scene.view_settings
-        color.view_transform = satellite.color_view_transform
-        color.look = satellite.color_look
-        color.exposure = satellite.color_exposure
-        color.gamma = satellite.color_gamma
-
         # ////////////////////////////////////////////////////////////////////////////
         # RENDER!
-        report = None
-
-        if satellite.render_type == 'Skybox':
-            report = RenderSkybox(self, context, satellite)
-        elif satellite.render_type == 'Direct Camera':
-            report = RenderDirectCamera(self, context, satellite)
-
-        # ////////////////////////////////////////////////////////////////////////////
-        # RESTORE CONTEXT STATE
+        report = RenderSatellites(self, context, [satellite], timings_path = GetTimingsPath(context))[0]
 
-        # Ensure render settings have been restored.
-        RestoreRenderSettings(self, context, old_render_settings)
-
-        # Restore selected and active objects
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.context.view_layer.objects.active = old_active_object
-
-        for sel_obj in old_selected_objects:
-            sel_obj.select_set(state=True)
-
-        # Restore context
-        if old_mode != '':
-            bpy.ops.object.mode_set(mode=old_mode)
-        bpy.context.area.type = old_region
-        
         # TODO: Add a status bar and some flexible info dumps.
             
-        if report != None:
+        if report['status'] != 'FINISHED':
+            self.report({'WARNING'}, report['info'])
+        else:
             self.report({'INFO'}, "The Skybox has been saved to " + report['destination'] + ".")
 
         return {'FINISHED'}
@@ -767,6 +1750,12 @@ class SATELLITE_OT_RenderAllActive(Operator):
     bl_idname = "satl.render_all"
     bl_label = "Render All Active"
 
+    force: BoolProperty(
+        name = "Force",
+        description = "Renders every active Satellite, even if Skip Unchanged is enabled and nothing has changed",
+        default = False,
+    )
+
     def execute(self, context):
 
         scene = bpy.context.scene
@@ -783,78 +1772,42 @@ class SATELLITE_OT_RenderAllActive(Operator):
             return {'FINISHED'}
         
         # Perform some safety checks to ensure we have what we need
-        verify_settings = VerifyRenderSettings(self, context, False)
+        verify_settings = VerifyRenderSettings(self, context, True)
         if verify_settings['status'] != 'SUCCESS':
             self.report({'WARNING'}, verify_settings['info'])
             return {'FINISHED'}
 
-        # ////////////////////////////////////////////////////////////////////////////
-        # SAVE CONTEXT STATE
-
-        # ENSURE WE ARE IN THE RIGHT CONTEXT
-        old_region = bpy.context.area.type
-        bpy.context.area.type = 'VIEW_3D'
-        old_mode = context.active_object.mode
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-        # SAVE SELECTED AND ACTIVE OBJECTS FIRST
-        old_selected_objects = context.selected_objects
-        old_active_object = context.active_object
-
-        # Get the selected render preset and check it's type
-        selected_render_index = sat_data.sat_selected_list_index
-        satellite = sat_data.sat_presets[selected_render_index]
-
         # ////////////////////////////////////////////////////////////////////////////
         # STEP STEP STEP
-        report = None
-
-        for satellite in sat_data.sat_presets:
-            if satellite.is_active is True:
-                # store old properties for later
-                old_render_settings = SaveRenderSettings(self, context)
-
-                # ////////////////////////////////////////////////////////////////////////////
-                # EDIT COLOR SETTINGS
-                # this is shared between render modes so it can be done here
-                color = context.scene.view_settings
-                color.view_transform = satellite.color_view_transform
-                color.look = satellite.color_look
-                color.exposure = satellite.color_exposure
-                color.gamma = satellite.color_gamma
-                
-                # ////////////////////////////////////////////////////////////////////////////
-                # RENDER!
-                if satellite.render_type == 'Skybox':
-                    report = RenderSkybox(self, context, satellite)
-                elif satellite.render_type == 'Direct Camera':
-                    report = RenderDirectCamera(self, context, satellite)
-
-                RestoreRenderSettings(self, context, old_render_settings)
+        active_satellites = [sat for sat in sat_data.sat_presets if sat.is_active is True]
 
-        # ////////////////////////////////////////////////////////////////////////////
-        # RESTORE CONTEXT STATE
-
-        # Restore selected and active objects
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.context.view_layer.objects.active = old_active_object
+        if sat_data.optimize_order is True:
+            active_satellites, schedule = ScheduleSatellites(active_satellites)
+            PrintSchedule(schedule)
 
-        for sel_obj in old_selected_objects:
-            sel_obj.select_set(state=True)
+        reports = RenderSatellites(self, context, active_satellites, 
+            use_cache = sat_data.skip_unchanged, force = self.force, 
+            timings_path = GetTimingsPath(context))
+        report = reports[-1]
 
-        # Restore context
-        bpy.ops.object.mode_set(mode=old_mode)
-        bpy.context.area.type = old_region
-        
         # TODO: Add a status bar and some flexible info dumps.
+        failed = [r for r in reports if r['status'] not in ('FINISHED', 'CACHED')]
+        cached = [r for r in reports if r['status'] == 'CACHED']
+
+        if len(failed) > 0:
+            self.report({'WARNING'}, failed[0]['info'])
             
-        if report != None and enabled_count <= 1:
+        elif enabled_count <= 1 and len(cached) == 0:
             self.report({'INFO'}, "The Skybox has been saved to " + report['destination'] + ".")
         
         else:
             info_txt = "Rendered "
-            info_txt += str(enabled_count)
+            info_txt += str(enabled_count - len(cached))
             info_txt += " Satellites"
+            if len(cached) > 0:
+                info_txt += ", skipped "
+                info_txt += str(len(cached))
+                info_txt += " unchanged Satellites"
             self.report({'INFO'}, info_txt)
 
         return {'FINISHED'}
\ No newline at end of file
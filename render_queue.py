@@ -0,0 +1,342 @@
+import bpy
+from bpy.types import Operator
+
+import time
+import traceback
+
+from .render import (
+    VerifySatellite,
+    VerifyRenderSettings,
+    BeginRenderBatch,
+    SetupSatellite,
+    SetupJobPart,
+    CleanupSatellite,
+    FinalizeSatellite,
+    EndRenderBatch,
+    PauseRenderBatch,
+    ResumeRenderBatch,
+    CheckSatelliteCache,
+    GetTimingsPath,
+)
+from .cache import WriteRenderFingerprint
+from .timings import BeginSatelliteTimings, EndSatelliteTimings, TimePhase, AddPhaseTime
+from .scheduler import ScheduleSatellites, PrintSchedule
+
+
+class SATELLITE_OT_RenderAllModal(Operator):
+    """Renders all active Satellites one at a time without freezing Blender.  Press Escape to stop once the current Satellite has finished"""
+
+    bl_idname = "satl.render_all_modal"
+    bl_label = "Render All Active (Interactive)"
+
+    def invoke(self, context, event):
+
+        sat_data = context.scene.SATL_SceneData
+        active_satellites = [sat for sat in sat_data.sat_presets if sat.is_active is True]
+
+        if len(active_satellites) == 0:
+            self.report({'WARNING'}, "No Satellites are currently active.  Please tick at least one Satellite from the list to make it active")
+            return {'CANCELLED'}
+
+        # Perform some safety checks to ensure we have what we need
+        verify_settings = VerifyRenderSettings(self, context, True)
+        if verify_settings['status'] != 'SUCCESS':
+            self.report({'WARNING'}, verify_settings['info'])
+            return {'CANCELLED'}
+
+        if sat_data.optimize_order is True:
+            active_satellites, schedule = ScheduleSatellites(active_satellites)
+            PrintSchedule(schedule)
+
+        # Satellites are found by name each time as the preset list may change while we wait.
+        self.queue = [sat.name for sat in active_satellites]
+        self.total = len(self.queue)
+        self.reports = []
+
+        self.job = None
+        self.job_state = None
+        self.job_error = None
+        self.stop_requested = False
+        self.render_start = None
+        self.batch = BeginRenderBatch(self, context, use_cache = sat_data.skip_unchanged,
+            timings_path = GetTimingsPath(context))
+
+        bpy.app.handlers.render_complete.append(self.OnRenderComplete)
+        bpy.app.handlers.render_cancel.append(self.OnRenderCancel)
+
+        window_manager = context.window_manager
+        self.timer = window_manager.event_timer_add(0.2, window = context.window)
+        window_manager.modal_handler_add(self)
+        window_manager.progress_begin(0, self.total)
+        self.UpdateStatus(context)
+
+        return {'RUNNING_MODAL'}
+
+
+    def OnRenderComplete(self, *args):
+        # Handlers shouldn't change scene data, so cleanup waits for the next timer event.
+        if self.job_state == 'RENDERING':
+            self.job_state = 'COMPLETE'
+            self.StopRenderTimer()
+
+    def OnRenderCancel(self, *args):
+        if self.job_state == 'RENDERING':
+            self.job_state = 'CANCELLED'
+            self.StopRenderTimer()
+
+    def StopRenderTimer(self):
+        # Renders run while the operator waits, so they can't be timed as a phase.
+        if self.render_start is not None:
+            AddPhaseTime(self.batch['timings'], 'render', time.perf_counter() - self.render_start)
+            self.render_start = None
+
+
+    def modal(self, context, event):
+
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self.stop_requested = True
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        if self.job is not None:
+            if self.job_state == 'RENDERING':
+                return {'PASS_THROUGH'}
+
+            # Parts of the same Satellite are rendered without setting the scene up again.
+            if self.job_state == 'COMPLETE' and self.stop_requested is False:
+                if self.job['part_index'] < len(self.job['parts']):
+                    self.StartPart(context)
+                    return {'PASS_THROUGH'}
+
+            self.FinishJob(context)
+
+        # The user can keep working between Satellites, so the scene is theirs until the next one starts.
+        if self.job is None:
+            PauseRenderBatch(self, context, self.batch)
+
+        if self.stop_requested is True or len(self.queue) == 0:
+            return self.FinishQueue(context)
+
+        self.StartJob(context)
+
+        if self.job is None:
+            PauseRenderBatch(self, context, self.batch)
+
+        return {'PASS_THROUGH'}
+
+
+    def StartJob(self, context):
+        """
+        Sets up the next Satellite in the queue and starts rendering it without blocking.
+        """
+
+        name = self.queue.pop(0)
+        sat_data = context.scene.SATL_SceneData
+        timings = self.batch['timings']
+        BeginSatelliteTimings(timings, name)
+        ResumeRenderBatch(self, context, self.batch)
+
+        index = sat_data.sat_presets.find(name)
+
+        if index == -1:
+            report = {}
+            report['status'] = 'FAILED'
+            report['info'] = "The Satellite " + name + " was removed before it could be rendered."
+            self.AddReport(context, name, report)
+            return
+
+        satellite = sat_data.sat_presets[index]
+
+        with TimePhase(timings, 'verify'):
+            report = VerifySatellite(self, context, satellite)
+
+        if report['status'] != 'SUCCESS':
+            self.AddReport(context, name, report)
+            return
+
+        try:
+            fingerprint, cached_report = CheckSatelliteCache(self, context, satellite, self.batch)
+
+            if cached_report is not None:
+                self.AddReport(context, name, cached_report)
+                return
+
+            self.job = SetupSatellite(self, context, satellite, self.batch)
+            self.job['fingerprint'] = fingerprint
+            self.job['part_index'] = 0
+
+        except Exception as error:
+            traceback.print_exc()
+            self.job_state = 'FAILED'
+            self.job_error = str(error)
+
+            if self.job is None:
+                report = {}
+                report['status'] = 'FAILED'
+                report['info'] = "The Satellite " + name + " failed to render - " + self.job_error
+                self.AddReport(context, name, report)
+            return
+
+        self.StartPart(context)
+
+
+    def StartPart(self, context):
+        """
+        Starts rendering the next part of the current Satellite without blocking.
+        """
+
+        job = self.job
+        part = job['parts'][job['part_index']]
+        job['part_index'] += 1
+
+        try:
+            SetupJobPart(self, context, job, part)
+            self.job_state = 'RENDERING'
+            self.render_start = time.perf_counter()
+
+            result = bpy.ops.render.render('INVOKE_DEFAULT', animation = False, write_still = True,
+                layer = job['layer'], scene = job['scene'].name)
+
+            if 'RUNNING_MODAL' not in result:
+                self.job_state = 'FAILED'
+                self.render_start = None
+
+        except Exception as error:
+            traceback.print_exc()
+            self.job_state = 'FAILED'
+            self.job_error = str(error)
+            self.render_start = None
+
+
+    def FinishJob(self, context):
+        """
+        Restores the scene after the current Satellite has finished rendering.
+        """
+
+        job = self.job
+        name = job['name']
+        timings = self.batch['timings']
+        report = {}
+
+        try:
+            with TimePhase(timings, 'restore'):
+                CleanupSatellite(self, context, job)
+        except Exception as error:
+            traceback.print_exc()
+            self.job_state = 'FAILED'
+            self.job_error = str(error)
+
+        # Stopping between parts leaves the Satellite unfinished.
+        if self.job_state == 'COMPLETE' and job['part_index'] < len(job['parts']):
+            self.job_state = 'CANCELLED'
+
+        if self.job_state == 'COMPLETE':
+            sat_presets = context.scene.SATL_SceneData.sat_presets
+
+            try:
+                with TimePhase(timings, 'write'):
+                    if sat_presets.find(name) != -1:
+                        FinalizeSatellite(self, context, sat_presets[name], job['destination'], 
+                            self.batch['encode_queue'])
+            except Exception as error:
+                traceback.print_exc()
+                self.job_state = 'FAILED'
+                self.job_error = str(error)
+
+        if self.job_state == 'COMPLETE':
+            report['status'] = 'FINISHED'
+            report['destination'] = job['destination']
+
+            if job['fingerprint'] is not None:
+                with TimePhase(timings, 'write'):
+                    WriteRenderFingerprint(job['destination'], job['fingerprint'])
+
+        elif self.job_state == 'CANCELLED':
+            report['status'] = 'CANCELLED'
+            report['info'] = "The render for " + name + " was cancelled."
+            self.stop_requested = True
+
+        else:
+            report['status'] = 'FAILED'
+            report['info'] = "The Satellite " + name + " failed to render"
+            if self.job_error is not None:
+                report['info'] += " - " + self.job_error
+
+        self.job = None
+        self.job_state = None
+        self.job_error = None
+        self.AddReport(context, name, report)
+
+
+    def AddReport(self, context, name, report):
+        report['name'] = name
+        EndSatelliteTimings(self.batch['timings'], report)
+        self.reports.append(report)
+
+        if report['status'] in ('FINISHED', 'CACHED'):
+            self.batch['rendered'].append(name)
+
+        if report['status'] == 'FINISHED':
+            self.report({'INFO'}, "The Satellite " + name + " has been saved to " + report['destination'] + ".")
+        elif report['status'] == 'CACHED':
+            self.report({'INFO'}, "The Satellite " + name + " hasn't changed since it was last rendered.")
+        else:
+            self.report({'WARNING'}, report['info'])
+
+        context.window_manager.progress_update(len(self.reports))
+        self.UpdateStatus(context)
+
+
+    def UpdateStatus(self, context):
+        status_txt = "Satellite - Rendered "
+        status_txt += str(len(self.reports))
+        status_txt += " of "
+        status_txt += str(self.total)
+        status_txt += " (Esc to stop after the current render)"
+        context.workspace.status_text_set(status_txt)
+
+
+    def FinishQueue(self, context):
+        """
+        Removes everything the operator added to Blender and reports on the batch.
+        """
+
+        self.RemoveHandlers(context)
+
+        finished = [r for r in self.reports if r['status'] in ('FINISHED', 'CACHED')]
+
+        info_txt = "Rendered "
+        info_txt += str(len(finished))
+        info_txt += " of "
+        info_txt += str(self.total)
+        info_txt += " Satellites"
+
+        if len(finished) < self.total:
+            self.report({'WARNING'}, info_txt)
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, info_txt)
+        return {'FINISHED'}
+
+
+    def RemoveHandlers(self, context):
+        EndRenderBatch(self, context, self.batch)
+
+        if self.OnRenderComplete in bpy.app.handlers.render_complete:
+            bpy.app.handlers.render_complete.remove(self.OnRenderComplete)
+        if self.OnRenderCancel in bpy.app.handlers.render_cancel:
+            bpy.app.handlers.render_cancel.remove(self.OnRenderCancel)
+
+        window_manager = context.window_manager
+        window_manager.event_timer_remove(self.timer)
+        window_manager.progress_end()
+        context.workspace.status_text_set(None)
+
+
+    def cancel(self, context):
+        # Blender is stopping the operator for us (e.g. a new file is being loaded).
+        if self.job is not None:
+            self.FinishJob(context)
+
+        self.RemoveHandlers(context)
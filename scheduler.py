@@ -0,0 +1,129 @@
+import bpy
+
+# How expensive it is to switch each setting between two Satellites.  Switching
+# render engine forces shaders to recompile and the scene to be re-synced, while
+# the others invalidate only part of it.
+SWITCH_COSTS = {
+    'render_engine': 8.0,
+    'view_layer': 4.0,
+    'replacement_material': 3.0,
+    'world_material': 2.0,
+}
+
+
+def GetSatelliteState(satellite):
+    """
+    Returns the settings of a Satellite that are expensive to switch between renders.
+    """
+
+    if satellite.render_type == 'Skybox':
+        render_options = satellite.data_skybox
+        replacement_material = ""
+    else:
+        render_options = satellite.data_camera
+        replacement_material = getattr(render_options.replacement_material, 'name', "")
+
+    # An empty View Layer means something different for each render type.
+    view_layer = render_options.view_layer
+    if view_layer == "":
+        view_layer = satellite.render_type + " Default"
+
+    state = {}
+    state['render_engine'] = render_options.render_engine
+    state['view_layer'] = view_layer
+    state['replacement_material'] = replacement_material
+    state['world_material'] = getattr(render_options.world_material, 'name', "")
+
+    return state
+
+
+def GetSwitchCost(state_a, state_b):
+    """
+    Returns the weighted cost and the number of settings switched between two Satellite states.
+    """
+
+    cost = 0.0
+    switches = 0
+
+    for key, weight in SWITCH_COSTS.items():
+        if state_a[key] != state_b[key]:
+            cost += weight
+            switches += 1
+
+    return cost, switches
+
+
+def GetOrderCost(states):
+    """
+    Returns the total cost and number of switches needed to render states in order.
+    """
+
+    total_cost = 0.0
+    total_switches = 0
+
+    for state_a, state_b in zip(states, states[1:]):
+        cost, switches = GetSwitchCost(state_a, state_b)
+        total_cost += cost
+        total_switches += switches
+
+    return total_cost, total_switches
+
+
+def ScheduleSatellites(satellites, output_root = None):
+    """
+    Reorders Satellites so that ones sharing expensive settings are rendered one
+    after another, returning the new order and a report describing it.
+
+    Satellites that write to the same destination keep their original order,
+    so the files left behind are identical to rendering in list order.
+    """
+
+    satellites = list(satellites)
+    states = [GetSatelliteState(sat) for sat in satellites]
+    destinations = [(output_root or sat.output_dir, sat.output_name) for sat in satellites]
+
+    # A Satellite can't be picked while an earlier one writing to the same place is waiting.
+    waits_for = []
+    for i, destination in enumerate(destinations):
+        waits_for.append([j for j in range(i) if destinations[j] == destination])
+
+    remaining = list(range(len(satellites)))
+    order = []
+
+    while len(remaining) > 0:
+        waiting = set(remaining)
+        candidates = [i for i in remaining if not any(j in waiting for j in waits_for[i])]
+
+        if len(order) == 0:
+            pick = candidates[0]
+        else:
+            last_state = states[order[-1]]
+            # Ties go to the earliest Satellite in the list.
+            pick = min(candidates, key = lambda i: (GetSwitchCost(last_state, states[i])[0], i))
+
+        order.append(pick)
+        remaining.remove(pick)
+
+    cost_before, switches_before = GetOrderCost(states)
+    cost_after, switches_after = GetOrderCost([states[i] for i in order])
+
+    schedule = {}
+    schedule['order'] = [satellites[i].name for i in order]
+    schedule['cost_before'] = cost_before
+    schedule['cost_after'] = cost_after
+    schedule['switches_before'] = switches_before
+    schedule['switches_after'] = switches_after
+    schedule['switches_avoided'] = switches_before - switches_after
+
+    return [satellites[i] for i in order], schedule
+
+
+def PrintSchedule(schedule):
+    """
+    Prints the order chosen by the scheduler and how many switches it should avoid.
+    """
+
+    print("Satellite - Render order: " + ", ".join(schedule['order']))
+    print("Satellite - Reordering avoids an estimated " + str(schedule['switches_avoided'])
+        + " setting switches (cost " + str(schedule['cost_before']) + " -> "
+        + str(schedule['cost_after']) + ")")
@@ -0,0 +1,93 @@
+"""
+Checks that replacing and restoring materials leaves a scene as it was found.
+
+Run it from the folder Satellite is installed in with a background Blender:
+
+    blender -b --factory-startup --python tests/test_material_restore.py
+"""
+
+import bpy
+
+import os
+import sys
+import unittest
+import importlib
+
+# Satellite is imported as a package using the name of the folder it's in.
+ADDON_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ADDON_PATH))
+render = importlib.import_module(os.path.basename(ADDON_PATH) + ".render")
+
+
+def CreateMaterialNodeGroup():
+    """
+    Returns a new Geometry Nodes group with a single Material input.
+    """
+
+    node_group = bpy.data.node_groups.new("Satellite Test Nodes", 'GeometryNodeTree')
+
+    # Blender 4.0 moved a node group's inputs into it's interface.
+    if hasattr(node_group, 'interface'):
+        node_group.interface.new_socket(name = "Material", in_out = 'INPUT',
+            socket_type = 'NodeSocketMaterial')
+    else:
+        node_group.inputs.new('NodeSocketMaterial', "Material")
+
+    node_group.nodes.new('NodeGroupInput')
+
+    return node_group
+
+
+class MaterialRestoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh = bpy.data.meshes.new("Satellite Test Mesh")
+        self.obj = bpy.data.objects.new("Satellite Test Object", self.mesh)
+        bpy.context.scene.collection.objects.link(self.obj)
+
+        self.node_group = CreateMaterialNodeGroup()
+        self.md = self.obj.modifiers.new("Satellite Test Modifier", 'NODES')
+        self.md.node_group = self.node_group
+
+        self.target_mat = bpy.data.materials.new("Satellite Test Replacement")
+
+    def tearDown(self):
+        bpy.data.objects.remove(self.obj)
+        bpy.data.meshes.remove(self.mesh)
+        bpy.data.node_groups.remove(self.node_group)
+
+        for material in list(bpy.data.materials):
+            if material.name.startswith("Satellite Test"):
+                bpy.data.materials.remove(material)
+
+    def test_empty_modifier_input_is_emptied(self):
+        keys = render.GetModifierMaterialInputs(self.md)
+        self.assertEqual(len(keys), 1)
+        self.assertIsNone(self.md[keys[0]])
+
+        mat_data = render.ReplaceMaterialSlots(None, bpy.context, [self.obj], self.target_mat)
+        self.assertEqual(self.md[keys[0]], self.target_mat)
+
+        render.RestoreMaterialSlots(None, bpy.context, mat_data)
+        self.assertIsNone(self.md[keys[0]])
+
+    def test_modifier_input_is_restored(self):
+        material = bpy.data.materials.new("Satellite Test Material")
+        keys = render.GetModifierMaterialInputs(self.md)
+        self.md[keys[0]] = material
+
+        mat_data = render.ReplaceMaterialSlots(None, bpy.context, [self.obj], self.target_mat)
+        render.RestoreMaterialSlots(None, bpy.context, mat_data)
+        self.assertEqual(self.md[keys[0]], material)
+
+    def test_slotless_data_is_emptied(self):
+        mat_data = render.ReplaceMaterialSlots(None, bpy.context, [self.obj], self.target_mat)
+        self.assertEqual(len(self.mesh.materials), 1)
+
+        render.RestoreMaterialSlots(None, bpy.context, mat_data)
+        self.assertEqual(len(self.mesh.materials), 0)
+
+
+if __name__ == "__main__":
+    result = unittest.main(argv = [sys.argv[0]], exit = False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,104 @@
+import os
+import numpy
+import tempfile
+
+from .cache import GetOutputFilepath
+from .imaging import LoadImagePixels, SaveImagePixels
+
+TILE_PART_PREFIX = "tile_"
+
+
+def GetTileGrid(width, height, tile_size):
+    """
+    Returns the number of tile rows and columns needed to cover an image.
+    """
+
+    return -(-height // tile_size), -(-width // tile_size)
+
+
+def GetTileParts(width, height, tile_size):
+    """
+    Returns the part name of every tile covering an image, row by row from the top left.
+    """
+
+    rows, columns = GetTileGrid(width, height, tile_size)
+    return [TILE_PART_PREFIX + str(row) + "_" + str(column)
+        for row in range(rows) for column in range(columns)]
+
+
+def IsTilePart(part):
+    return part is not None and part.startswith(TILE_PART_PREFIX)
+
+
+def GetTileRect(part, width, height, tile_size):
+    """
+    Returns the pixels a tile covers as (left, top, right, bottom), counting from
+    the top left of the image.  Right and bottom are exclusive.
+    """
+
+    row, column = (int(i) for i in part[len(TILE_PART_PREFIX):].split("_"))
+
+    left = column * tile_size
+    top = row * tile_size
+    return left, top, min(left + tile_size, width), min(top + tile_size, height)
+
+
+def GetTileBorder(part, width, height, tile_size):
+    """
+    Returns the render border that renders only a tile, as (min_x, max_x, min_y, max_y).
+    Blender measures the border from the bottom left and rounds down to whole pixels,
+    so each edge is nudged half a pixel to make sure it lands on the pixel we want.
+    """
+
+    left, top, right, bottom = GetTileRect(part, width, height, tile_size)
+
+    min_x = (left + 0.5) / width
+    max_x = min(1.0, (right + 0.5) / width)
+    min_y = (height - bottom + 0.5) / height
+    max_y = min(1.0, (height - top + 0.5) / height)
+
+    return min_x, max_x, min_y, max_y
+
+
+def GetTileDestination(destination, part):
+    """
+    Returns the path a single tile is rendered to (without a file extension).
+    """
+
+    return destination + "_" + part
+
+
+def AssembleTiles(destination, width, height, tile_size, tile_format, image_format):
+    """
+    Combines rendered tiles into the final image, removing the tiles once it's been saved.
+
+    Tiles are copied into a memory-mapped image on disk one at a time, which is then
+    streamed into the final file a few rows at a time, so neither the full image
+    nor it's encoded copy have to fit in memory.
+    """
+
+    tile_paths = [GetOutputFilepath(GetTileDestination(destination, part), tile_format['file_format'])
+        for part in GetTileParts(width, height, tile_size)]
+
+    buffer_file, buffer_path = tempfile.mkstemp(prefix = "satellite_tiles_", suffix = ".raw",
+        dir = os.path.dirname(GetOutputFilepath(destination, image_format['file_format'])) or None)
+    os.close(buffer_file)
+
+    try:
+        assembled = numpy.memmap(buffer_path, dtype = numpy.float32, mode = 'w+',
+            shape = (height, width, 4))
+
+        for part, tile_path in zip(GetTileParts(width, height, tile_size), tile_paths):
+            left, top, right, bottom = GetTileRect(part, width, height, tile_size)
+            pixels = LoadImagePixels(tile_path)
+            assembled[top : bottom, left : right] = pixels[: bottom - top, : right - left]
+
+        assembled.flush()
+        SaveImagePixels(GetOutputFilepath(destination, image_format['file_format']), assembled, image_format)
+        del assembled
+
+    finally:
+        os.remove(buffer_path)
+
+    for tile_path in tile_paths:
+        os.remove(tile_path)
@@ -0,0 +1,216 @@
+import bpy
+
+import os
+import json
+import time
+from contextlib import contextmanager
+
+# The phases a Satellite's time is split between, in the order they happen.
+PHASES = (
+    'verify',           # checking the Satellite and fingerprinting it
+    'save_settings',    # saving and applying render settings
+    'visibility',       # applying a View Layer's render visibility
+    'material_swap',    # replacing materials
+    'scene_sync',       # preparing the scene, camera and world
+    'render',           # Blender rendering
+    'write',            # saving and post-processing the images rendered
+    'restore',          # putting the scene back
+)
+
+# What a Satellite changed in the scene to render.
+COUNTERS = (
+    'settings_written',
+    'objects_touched',
+    'materials_swapped',
+)
+
+TIMINGS_VERSION = 1
+
+
+def CreateTimingsEntry(name = None):
+    entry = {}
+    entry['name'] = name
+    entry['status'] = None
+    entry['timings'] = {phase: 0.0 for phase in PHASES}
+    entry['counts'] = {counter: 0 for counter in COUNTERS}
+
+    return entry
+
+
+def CreateBatchTimings():
+    """
+    Creates the timings for a batch.  Anything timed while no Satellite is being
+    rendered (like restoring the scene once the batch ends) is kept separately.
+    """
+
+    timings = {}
+    timings['started'] = time.time()
+    timings['start'] = time.perf_counter()
+    timings['finish'] = None
+    timings['batch'] = CreateTimingsEntry()
+    timings['satellites'] = []
+    timings['current'] = timings['batch']
+
+    # The phases being timed, with the innermost last.
+    timings['stack'] = []
+
+    return timings
+
+
+def BeginSatelliteTimings(timings, name):
+    """
+    Starts timing a Satellite, which everything is timed against until it ends.
+    """
+
+    entry = CreateTimingsEntry(name)
+    timings['satellites'].append(entry)
+    timings['current'] = entry
+
+
+def EndSatelliteTimings(timings, report):
+    """
+    Stops timing the current Satellite, adding it's timings and counts to it's report.
+    """
+
+    entry = timings['current']
+    entry['status'] = report['status']
+    timings['current'] = timings['batch']
+
+    report['timings'] = dict(entry['timings'])
+    report['counts'] = dict(entry['counts'])
+
+
+def AddPhaseTime(timings, phase, seconds):
+    timings['current']['timings'][phase] += seconds
+
+
+def CountChanges(timings, counter, amount):
+    timings['current']['counts'][counter] += amount
+
+
+@contextmanager
+def TimePhase(timings, phase):
+    """
+    Times everything done inside it as a phase.  Phases can be timed inside one
+    another, with the time spent in the inner phase only counted towards it.
+    """
+
+    stack = timings['stack']
+    now = time.perf_counter()
+
+    if len(stack) > 0:
+        AddPhaseTime(timings, stack[-1][0], now - stack[-1][1])
+
+    stack.append([phase, now])
+
+    try:
+        yield
+
+    finally:
+        now = time.perf_counter()
+        phase, start = stack.pop()
+        AddPhaseTime(timings, phase, now - start)
+
+        if len(stack) > 0:
+            stack[-1][1] = now
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+def GetEntryTotal(entry):
+    return sum(entry['timings'].values())
+
+
+def CreateTimingsReport(timings, scene):
+    """
+    Returns everything timed in a batch in a form that can be saved as JSON.
+    """
+
+    if timings['finish'] is None:
+        timings['finish'] = time.perf_counter()
+
+    entries = [timings['batch']] + timings['satellites']
+
+    totals = CreateTimingsEntry()
+    for entry in entries:
+        for phase in PHASES:
+            totals['timings'][phase] += entry['timings'][phase]
+        for counter in COUNTERS:
+            totals['counts'][counter] += entry['counts'][counter]
+
+    report = {}
+    report['version'] = TIMINGS_VERSION
+    report['blend'] = bpy.data.filepath
+    report['scene'] = scene.name
+    report['started'] = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(timings['started']))
+    report['duration'] = timings['finish'] - timings['start']
+    report['phases'] = list(PHASES)
+
+    report['satellites'] = []
+    for entry in timings['satellites']:
+        satellite = {}
+        satellite['name'] = entry['name']
+        satellite['status'] = entry['status']
+        satellite['total'] = GetEntryTotal(entry)
+        satellite['timings'] = entry['timings']
+        satellite['counts'] = entry['counts']
+        report['satellites'].append(satellite)
+
+    report['batch'] = {}
+    report['batch']['total'] = GetEntryTotal(timings['batch'])
+    report['batch']['timings'] = timings['batch']['timings']
+    report['batch']['counts'] = timings['batch']['counts']
+
+    report['totals'] = {}
+    report['totals']['total'] = GetEntryTotal(totals)
+    report['totals']['timings'] = totals['timings']
+    report['totals']['counts'] = totals['counts']
+
+    return report
+
+
+def WriteTimingsReport(filepath, report):
+    """
+    Saves a timings report as JSON, replacing any report from an earlier batch.
+    """
+
+    filepath = bpy.path.abspath(filepath)
+    report_dir = os.path.dirname(filepath)
+    if report_dir != "":
+        os.makedirs(report_dir, exist_ok = True)
+
+    with open(filepath, 'w') as report_file:
+        json.dump(report, report_file, indent = 4)
+
+
+def FormatTimingsTable(report):
+    """
+    Returns a timings report as a table of milliseconds, with a row for every
+    Satellite, one for the batch itself and one for the totals.
+    """
+
+    name_width = max([len("Satellite")] + [len(sat['name']) for sat in report['satellites']])
+    columns = report['phases'] + ['total'] + list(COUNTERS)
+    widths = [max(len(column), 9) for column in columns]
+
+    def FormatRow(name, entry):
+        values = ["{:.1f}".format(entry['timings'][phase] * 1000) for phase in report['phases']]
+        values.append("{:.1f}".format(entry['total'] * 1000))
+        values += [str(entry['counts'][counter]) for counter in COUNTERS]
+
+        return "  ".join([name.ljust(name_width)] +
+            [value.rjust(width) for value, width in zip(values, widths)])
+
+    lines = []
+    lines.append("SATELLITE - Batch timings in milliseconds, finished in {:.2f} seconds".format(report['duration']))
+    lines.append("  ".join(["Satellite".ljust(name_width)] +
+        [column.rjust(width) for column, width in zip(columns, widths)]))
+
+    for satellite in report['satellites']:
+        lines.append(FormatRow(satellite['name'], satellite))
+
+    lines.append(FormatRow("(batch)", report['batch']))
+    lines.append(FormatRow("(total)", report['totals']))
+
+    return "\n".join(lines)
@@ -84,6 +84,49 @@ class SATELLITE_OT_Duplicate(Operator):
         return {'FINISHED'}
 
 
+class SATELLITE_OT_AddOutputVariant(Operator):
+    """Add a new output variant to the selected Satellite"""
+
+    bl_idname = "satl.add_output_variant"
+    bl_label = "Add Output Variant"
+
+    def execute(self, context):
+        sat_data = context.scene.SATL_SceneData
+        render_format = sat_data.sat_presets[sat_data.sat_selected_list_index].data_camera
+
+        new_variant = render_format.output_variants.add()
+        new_variant.suffix = "_variant" + str(len(render_format.output_variants))
+        render_format.output_variants_index = len(render_format.output_variants) - 1
+
+        return {'FINISHED'}
+
+class SATELLITE_OT_RemoveOutputVariant(Operator):
+    """Remove the selected output variant"""
+
+    bl_idname = "satl.remove_output_variant"
+    bl_label = "Remove Output Variant"
+
+    def execute(self, context):
+        sat_data = context.scene.SATL_SceneData
+        render_format = sat_data.sat_presets[sat_data.sat_selected_list_index].data_camera
+
+        if len(render_format.output_variants) == 0:
+            return {'FINISHED'}
+
+        render_format.output_variants.remove(render_format.output_variants_index)
+        render_format.output_variants_index = max(0, render_format.output_variants_index - 1)
+
+        return {'FINISHED'}
+
+
+class SATELLITE_UL_OutputVariantList(UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname):
+
+        layout.prop(item, "suffix", text="", emboss=False)
+        layout.label(text=item.file_format)
+        layout.label(text=str(round(item.scale * 100)) + "%")
+
+
 class SATELLITE_UL_PresetList(UIList):
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname):
 
@@ -115,6 +158,29 @@ class SATELLITE_UL_MainMenu(bpy.types.Panel):
         ui_list_column.separator()
         ui_list_column.operator("satl.render_selected", icon = "EXPORT")
         ui_list_column.operator("satl.render_all", icon = "EXPORT")
+        ui_list_column.operator("satl.render_all_modal", icon = "EXPORT")
+        ui_list_column.prop(sat_data, "optimize_order")
+        ui_list_column.prop(sat_data, "skip_unchanged")
+        ui_list_column.prop(sat_data, "encode_in_background")
+        ui_list_column.prop(sat_data, "timings_path")
+        ui_list_column.prop(sat_data, "print_timings")
+
+        if sat_data.skip_unchanged is True:
+            force_render = ui_list_column.operator("satl.render_all", text = "Force Render All Active", icon = "FILE_REFRESH")
+            force_render.force = True
+        ui_list_column.separator()
+
+        ui_farm_row = ui_list_column.row(align = True)
+        ui_farm_row.operator("satl.render_farm", icon = "EXPORT")
+        ui_farm_row.prop(sat_data, "farm_workers", text = "")
+        ui_list_column.separator()
+
+        ui_watch_row = ui_list_column.row(align = True)
+        ui_watch_row.operator("satl.render_dirty", icon = "FILE_REFRESH")
+        ui_watch_row.prop(sat_data, "watch_mode", text = "", icon = "HIDE_OFF")
+
+        if sat_data.watch_mode is True:
+            ui_list_column.prop(sat_data, "watch_delay")
 
         ui_list_column.separator()
 
@@ -187,7 +253,50 @@ class SATELLITE_UL_MainMenu(bpy.types.Panel):
                 # Render Engine Settings
                 render_format_options.prop(render_format, "render_engine")
                 render_format_options.separator()
-                render_format_options.prop(render_format, "resolution")
+                render_format_options.prop(render_format, "projection")
+
+                render_format_list_convert = render_format_options.column(align=True, 
+                    heading="Save Other Projection")
+                render_format_list_convert.prop(render_format, "convert_projection", text="")
+
+                # Converted cubemaps use the cubemap settings too.
+                if render_format.projection == 'CUBEMAP' or render_format.convert_projection is True:
+                    render_format_options.prop(render_format, "cubemap_layout")
+                    render_format_options.prop(render_format, "face_resolution")
+                
+                if render_format.projection == 'EQUIRECTANGULAR' or render_format.convert_projection is True:
+                    render_format_options.prop(render_format, "resolution")
+
+                # Cubemaps are already rendered a face at a time.
+                if render_format.projection == 'EQUIRECTANGULAR':
+                    render_format_list_tiling = render_format_options.column(align=True, 
+                        heading="Render in Tiles")
+                    render_format_list_tiling.prop(render_selected, "use_tiling", text="")
+
+                    if render_selected.use_tiling is True:
+                        render_format_options.prop(render_selected, "tile_size")
+                
+                render_format_options.separator()
+                render_format_list_lighting = render_format_options.column(align=True, 
+                    heading="Generate")
+                render_format_list_lighting.prop(render_format, "generate_specular")
+                render_format_list_lighting.prop(render_format, "generate_irradiance")
+                render_format_list_lighting.prop(render_format, "generate_harmonics")
+
+                if render_format.generate_harmonics is True:
+                    render_format_options.prop(render_format, "harmonics_format")
+
+                if render_format.generate_specular is True:
+                    render_format_options.prop(render_format, "specular_resolution")
+                    render_format_options.prop(render_format, "specular_mip_count")
+                
+                if render_format.generate_irradiance is True:
+                    render_format_options.prop(render_format, "irradiance_resolution")
+                
+                if render_format.generate_specular is True or render_format.generate_irradiance is True:
+                    render_format_options.prop(render_format, "lighting_samples")
+                
+
                 render_format_options.prop(render_format, "samples")
                 render_format_options.separator()
 
@@ -242,9 +351,12 @@ class SATELLITE_UL_MainMenu(bpy.types.Panel):
                 # Scene Settings
                 render_format_options.prop(render_format, "target_camera")
                 render_format_options.prop(render_format, "view_layer")
+                render_format_options.prop(render_format, "use_isolated_scene")
                 render_format_options.separator()
                 render_format_options.prop(render_format, "world_material")
                 render_format_options.prop(render_format, "replacement_material")
+                if render_format.replacement_material is not None and render_format.use_isolated_scene is False:
+                    render_format_options.prop(render_format, "replacement_method")
                 render_format_options.separator()
                 render_format_options.separator()
                 render_format_options.separator()
@@ -255,6 +367,14 @@ class SATELLITE_UL_MainMenu(bpy.types.Panel):
                 render_format_options.separator()
                 render_format_options.prop(render_format, "resolution_x")
                 render_format_options.prop(render_format, "resolution_y")
+
+                render_format_list_tiling = render_format_options.column(align=True, 
+                    heading="Render in Tiles")
+                render_format_list_tiling.prop(render_selected, "use_tiling", text="")
+
+                if render_selected.use_tiling is True:
+                    render_format_options.prop(render_selected, "tile_size")
+
                 render_format_options.prop(render_format, "samples")
                 render_format_options.separator()
                 
@@ -304,6 +424,39 @@ class SATELLITE_UL_MainMenu(bpy.types.Panel):
                 render_format_options.separator()
                 render_format_options.separator()
 
+                # Output Variants
+                render_format_variants = render_format_options.row(align=True)
+                render_format_variants.template_list("SATELLITE_UL_OutputVariantList", "default", 
+                    render_format, "output_variants", render_format, "output_variants_index", rows=2, maxrows=4)
+
+                render_format_variants_ops = render_format_variants.column(align=True)
+                render_format_variants_ops.operator("satl.add_output_variant", text="", icon="ADD")
+                render_format_variants_ops.operator("satl.remove_output_variant", text="", icon="REMOVE")
+
+                variant_index = render_format.output_variants_index
+                if 0 <= variant_index < len(render_format.output_variants):
+                    variant = render_format.output_variants[variant_index]
+                    render_format_options.separator()
+                    render_format_options.prop(variant, "file_format")
+                    render_format_options.prop(variant, "scale")
+
+                    render_format_col_mode = render_format_options.row(align=True)
+                    render_format_col_mode.prop(variant, "color_mode", expand=True)
+
+                    if variant.file_format in ['PNG', 'OPEN_EXR']:
+                        render_format_col_depth = render_format_options.row(align=True)
+                        render_format_col_depth.prop(variant, "color_depth", expand=True)
+
+                    if variant.file_format in ['PNG']:
+                        render_format_options.prop(variant, "compression")
+
+                    if variant.file_format in ['JPEG']:
+                        render_format_options.prop(variant, "quality")
+
+                render_format_options.separator()
+                render_format_options.separator()
+                render_format_options.separator()
+
                 # Color Settings
                 render_format_options.prop(render_selected, "color_view_transform")
                 render_format_options.prop(render_selected, "color_look")
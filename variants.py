@@ -0,0 +1,121 @@
+import os
+import numpy
+
+from .cache import GetOutputFilepath
+from .imaging import LoadImagePixels, SaveImagePixels, IterateRowChunks, STREAM_CHUNK_PIXELS
+
+# Satellites with output variants are first rendered to a linear, full precision
+# image that every output is made from.  It's removed once they've been saved.
+MASTER_SUFFIX = "_master"
+MASTER_FORMAT = {
+    'file_format': 'OPEN_EXR',
+    'color_depth': '32',
+    'color_mode': 'RGBA',
+}
+
+
+def GetMasterDestination(destination):
+    return destination + MASTER_SUFFIX
+
+
+def GetVariantDestination(destination, variant):
+    return destination + variant.suffix
+
+
+def GetVariantImageFormat(variant):
+    """
+    Returns the image format an output variant is saved with.
+    """
+
+    image_format = {}
+    image_format['file_format'] = variant.file_format
+    image_format['color_depth'] = variant.color_depth
+    image_format['color_mode'] = variant.color_mode
+    image_format['quality'] = variant.quality
+    image_format['compression'] = variant.compression
+
+    return image_format
+
+
+def GetVariantResolution(width, height, scale):
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+def ResampleAxis(pixels, size, axis):
+    """
+    Shrinks an image along one axis with an area filter, where every new pixel is
+    the average of the old pixels it covers (including fractions of pixels at its edges).
+
+    The running total of the pixels along the axis is read at the edges of every
+    new pixel, so the cost is the same regardless of how much it shrinks.
+    """
+
+    length = pixels.shape[axis]
+    if size == length:
+        return pixels
+
+    totals = numpy.cumsum(pixels, axis = axis, dtype = numpy.float64)
+    zeros = numpy.zeros_like(numpy.take(totals, [0], axis = axis))
+    totals = numpy.concatenate((zeros, totals), axis = axis)
+
+    edges = numpy.linspace(0.0, length, size + 1)
+    lower = numpy.minimum(numpy.floor(edges).astype(numpy.int64), length)
+    upper = numpy.minimum(lower + 1, length)
+
+    # Reshapes the edge fractions so they line up with the axis being resampled.
+    shape = [1] * pixels.ndim
+    shape[axis] = size + 1
+    fraction = (edges - lower).reshape(shape)
+
+    covered = (numpy.take(totals, lower, axis = axis) * (1.0 - fraction)
+        + numpy.take(totals, upper, axis = axis) * fraction)
+
+    return (numpy.diff(covered, axis = axis) * (size / length)).astype(numpy.float32)
+
+
+def ResizeImage(pixels, width, height):
+    """
+    Shrinks an image to the given size with an area filter.  The image is resized
+    a few rows (and then a few columns) at a time to limit the memory used.
+    """
+
+    narrowed = numpy.concatenate([ResampleAxis(rows, width, 1)
+        for rows in IterateRowChunks(pixels)], axis = 0)
+
+    chunk_columns = max(1, STREAM_CHUNK_PIXELS // narrowed.shape[0])
+    return numpy.concatenate([ResampleAxis(narrowed[:, start : start + chunk_columns], height, 0)
+        for start in range(0, width, chunk_columns)], axis = 1)
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+def SaveOutputVariants(destination, image_format, variants, view_settings):
+    """
+    Saves the main output and every output variant from the master image rendered
+    for them, then removes the master.  Color management is applied as each one is
+    saved, exactly as it would be when rendering to that format directly.
+    """
+
+    master_path = GetOutputFilepath(GetMasterDestination(destination), MASTER_FORMAT['file_format'])
+    master = LoadImagePixels(master_path)
+    height, width = master.shape[:2]
+
+    SaveImagePixels(GetOutputFilepath(destination, image_format['file_format']), master,
+        image_format, view_settings)
+
+    # Variants sharing a scale share a resized image.
+    resized = {}
+
+    for variant in variants:
+        size = GetVariantResolution(width, height, variant.scale)
+        if size not in resized:
+            resized[size] = ResizeImage(master, *size)
+
+        SaveImagePixels(GetOutputFilepath(GetVariantDestination(destination, variant), variant.file_format),
+            resized[size], GetVariantImageFormat(variant), view_settings)
+
+    os.remove(master_path)
@@ -0,0 +1,125 @@
+import bpy
+from bpy.types import Operator
+from bpy.app.handlers import persistent
+
+from .render import VerifyRenderSettings, RenderSatellites, GetTimingsPath
+from .scheduler import ScheduleSatellites, PrintSchedule
+from .dirty import GetDirtySatellites
+
+
+def GetActiveDirtySatellites(self, context):
+    """
+    Returns the active Satellites that have changed since they were last rendered.
+    """
+
+    return [sat for sat in GetDirtySatellites(self, context) if sat.is_active is True]
+
+
+def RenderDirtySatellites(self, context):
+    """
+    Renders every active Satellite that has changed, returning a report for each.
+    """
+
+    sat_data = context.scene.SATL_SceneData
+    dirty_satellites = GetActiveDirtySatellites(self, context)
+
+    if len(dirty_satellites) == 0:
+        return []
+
+    if sat_data.optimize_order is True:
+        dirty_satellites, schedule = ScheduleSatellites(dirty_satellites)
+        PrintSchedule(schedule)
+
+    return RenderSatellites(self, context, dirty_satellites, use_cache = sat_data.skip_unchanged,
+        timings_path = GetTimingsPath(context))
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+def RunWatchRender():
+    """
+    Timer that renders changed Satellites once the user has stopped saving.
+    """
+
+    context = bpy.context
+    if context.scene is None or context.scene.SATL_SceneData.watch_mode is False:
+        return None
+
+    # Wait for any render the user started themselves.
+    if hasattr(bpy.app, 'is_job_running') and bpy.app.is_job_running('RENDER'):
+        return 1.0
+
+    verify_settings = VerifyRenderSettings(None, context, True)
+    if verify_settings['status'] != 'SUCCESS':
+        print("Satellite - Watch Mode couldn't render - " + verify_settings['info'])
+        return None
+
+    reports = RenderDirtySatellites(None, context)
+
+    for report in reports:
+        if report['status'] not in ('FINISHED', 'CACHED'):
+            print("Satellite - " + report['info'])
+
+    if len(reports) > 0:
+        print("Satellite - Watch Mode rendered " + str(len(reports)) + " changed Satellites.")
+
+    return None
+
+
+@persistent
+def OnSavePost(*args):
+    """
+    Queues a Watch Mode render after every save, restarting the wait if one is already queued.
+    """
+
+    scene = bpy.context.scene
+    if scene is None or scene.SATL_SceneData.watch_mode is False:
+        return
+
+    if bpy.app.timers.is_registered(RunWatchRender):
+        bpy.app.timers.unregister(RunWatchRender)
+
+    bpy.app.timers.register(RunWatchRender, first_interval = scene.SATL_SceneData.watch_delay)
+
+
+def register():
+    bpy.app.handlers.save_post.append(OnSavePost)
+
+def unregister():
+    bpy.app.handlers.save_post.remove(OnSavePost)
+
+    if bpy.app.timers.is_registered(RunWatchRender):
+        bpy.app.timers.unregister(RunWatchRender)
+
+
+# /////////////////////////////////////////////////////////////////////////
+# /////////////////////////////////////////////////////////////////////////
+
+class SATELLITE_OT_RenderDirty(Operator):
+    """Renders the active Satellites that have changed since they were last rendered.  Satellites that haven't been rendered since the file was opened count as changed"""
+
+    bl_idname = "satl.render_dirty"
+    bl_label = "Render Changed"
+
+    def execute(self, context):
+
+        if len(GetActiveDirtySatellites(self, context)) == 0:
+            self.report({'INFO'}, "No active Satellites have changed since they were last rendered")
+            return {'FINISHED'}
+
+        # Perform some safety checks to ensure we have what we need
+        verify_settings = VerifyRenderSettings(self, context, True)
+        if verify_settings['status'] != 'SUCCESS':
+            self.report({'WARNING'}, verify_settings['info'])
+            return {'FINISHED'}
+
+        reports = RenderDirtySatellites(self, context)
+        failed = [r for r in reports if r['status'] not in ('FINISHED', 'CACHED')]
+
+        if len(failed) > 0:
+            self.report({'WARNING'}, failed[0]['info'])
+        else:
+            self.report({'INFO'}, "Rendered " + str(len(reports)) + " changed Satellites")
+
+        return {'FINISHED'}